@@ -0,0 +1,331 @@
+"""
+Embedded DuckDB query path over the processed data lake.
+
+Registers the hourly datasets in data/processed/{category}/YYYY/MM/DD
+(hourly_{category}[_{CC}], see processing/normalize_resolution.py) as DuckDB
+views and builds the same rollup_* relations the loader maintains in
+PostgreSQL. The views in sql_queries/ then run unchanged on top of them,
+so dashboards and ad-hoc history scans read local CSV/Parquet files with a
+vectorized engine instead of competing with the nightly loads.
+
+Pruning happens before anything is read: only the day directories in the
+requested range are listed (plus the next one, whose first hour belongs to
+the last UTC day), and per-country files of other countries are skipped.
+Row filters on country and time are pushed down into the Parquet scans.
+
+Usage:
+    python analytics/duckdb_engine.py daily_summary --start 2026-02-01 --end 2026-02-07
+    python analytics/duckdb_engine.py hourly_profitability --country FR --country DE \\
+        --start 2026-02-01 --end 2026-02-28 --output solar_hours.parquet
+"""
+
+import argparse
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from processing.storage import (
+    SUPPORTED_FORMATS,
+    dataset_name,
+    locate_country_datasets,
+    locate_dataset,
+)
+
+BASE_PATH = PROJECT_ROOT / "data" / "processed"
+VIEW_DIR = PROJECT_ROOT / "sql_queries"
+
+# Columns read from the hourly datasets
+LAKE_COLUMNS = {
+    "generation": {
+        "country": "VARCHAR",
+        "psr_type": "VARCHAR",
+        "interval_start": "TIMESTAMPTZ",
+        "points": "INTEGER",
+        "quantity_mw": "DOUBLE",
+    },
+    "prices": {
+        "country": "VARCHAR",
+        "interval_start": "TIMESTAMPTZ",
+        "points": "INTEGER",
+        "price_eur": "DOUBLE",
+        "price_min_eur": "DOUBLE",
+        "price_max_eur": "DOUBLE",
+    },
+}
+
+# Same aggregates as processing/rollups.py (UTC days, PSR type B16 = Solar)
+ROLLUP_VIEWS = {
+    "rollup_daily_generation": """
+        SELECT country, interval_start::date AS day,
+               SUM(quantity_mw) AS total_gen_mw,
+               SUM(quantity_mw) FILTER (WHERE psr_type = 'B16') AS total_solar_mw,
+               SUM(points) AS points
+        FROM lake_generation
+        GROUP BY 1, 2
+    """,
+    "rollup_hourly_generation": """
+        SELECT country, interval_start::date AS day,
+               hour(interval_start)::smallint AS hour_of_day,
+               SUM(quantity_mw) AS total_gen_mw,
+               SUM(quantity_mw) FILTER (WHERE psr_type = 'B16') AS solar_mw,
+               SUM(points) AS points
+        FROM lake_generation
+        GROUP BY 1, 2, 3
+    """,
+    "rollup_daily_prices": """
+        SELECT country, interval_start::date AS day,
+               AVG(price_eur) AS avg_price_eur,
+               MIN(price_min_eur) AS min_price_eur,
+               MAX(price_max_eur) AS max_price_eur,
+               SUM(points) AS points
+        FROM lake_prices
+        GROUP BY 1, 2
+    """,
+}
+
+# Report name -> view defined in sql_queries/ (and its sort order)
+REPORTS = {
+    "daily_summary": ("daily_energy_summary", "country, day"),
+    "solar_revenue": ("view_daily_solar_revenue", "country, day"),
+    "hourly_profitability": ("view_hourly_solar_profitability", "country, day, hour_of_day"),
+    "solar_profitability": ("view_solar_profitability_analysis", "country, day, hour_of_day"),
+}
+
+
+def _sql_list(values) -> str:
+    return "[" + ", ".join("'" + str(v).replace("'", "''") + "'" for v in values) + "]"
+
+
+def partition_days(base_path: Path, category: str, start=None, end=None) -> list[date]:
+    """Day partitions of a category in start..end, from the directory names alone."""
+    days = []
+    for day_dir in (Path(base_path) / category).glob("[0-9]*/[0-9]*/[0-9]*"):
+        try:
+            day = datetime.strptime("/".join(day_dir.parts[-3:]), "%Y/%m/%d").date()
+        except ValueError:
+            continue
+        if (start is None or day >= start) and (end is None or day <= end):
+            days.append(day)
+    return sorted(days)
+
+
+def partition_files(
+    base_path: Path,
+    category: str,
+    start=None,
+    end=None,
+    countries=None,
+    fmt: str | None = None,
+) -> tuple[list[Path], list[date]]:
+    """
+    Hourly datasets covering the UTC days start..end. A day's combined
+    hourly_{category} file is used when present, otherwise its per-country
+    files (only those of the requested countries). Also returns the days
+    that have enriched data but were never normalized.
+    """
+    last = end + timedelta(days=1) if end else None  # holds end's last UTC hour(s)
+    files, missing = [], []
+    for day in partition_days(base_path, category, start, last):
+        day_dir = Path(base_path) / category / day.strftime("%Y/%m/%d")
+        combined = locate_dataset(day_dir, dataset_name("hourly", category), fmt)
+        if combined.exists():
+            files.append(combined)
+            continue
+
+        per_country = locate_country_datasets(day_dir, "hourly", category, fmt)
+        prefix = dataset_name("hourly", category) + "_"
+        files.extend(
+            path
+            for path in per_country
+            if not countries or path.stem[len(prefix) :] in countries
+        )
+        enriched = locate_dataset(day_dir, dataset_name("enriched", category), fmt)
+        if not per_country and (
+            enriched.exists() or locate_country_datasets(day_dir, "enriched", category)
+        ):
+            missing.append(day)
+    return files, missing
+
+
+def scan_sql(category: str, files: list[Path]) -> str:
+    """One SELECT over all files of a category (Parquet and CSV scanned natively)."""
+    columns = LAKE_COLUMNS[category]
+    projection = ", ".join(f"{name}::{kind} AS {name}" for name, kind in columns.items())
+    parquet = [path for path in files if path.suffix == ".parquet"]
+    csv = [path for path in files if path.suffix == ".csv"]
+
+    scans = []
+    if parquet:
+        scans.append(
+            f"SELECT {projection} FROM read_parquet({_sql_list(parquet)}, "
+            "union_by_name = true)"
+        )
+    if csv:
+        types = "{" + ", ".join(f"'{name}': '{kind}'" for name, kind in columns.items()) + "}"
+        scans.append(
+            f"SELECT {projection} FROM read_csv({_sql_list(csv)}, header = true, "
+            f"union_by_name = true, types = {types})"
+        )
+    if not scans:
+        nulls = ", ".join(f"NULL AS {name}" for name in columns)
+        return f"SELECT {projection} FROM (SELECT {nulls}) WHERE false"
+    return " UNION ALL ".join(scans)
+
+
+def load_views() -> dict[str, str]:
+    """{view name: CREATE VIEW statement} for sql_queries/view_*.sql."""
+    views = {}
+    for path in sorted(VIEW_DIR.glob("view_*.sql")):
+        sql = path.read_text(encoding="utf-8")
+        match = re.search(r"CREATE\s+OR\s+REPLACE\s+VIEW\s+(\w+)", sql, re.IGNORECASE)
+        if match:
+            views[match.group(1)] = sql
+    return views
+
+
+class LakeEngine:
+    """
+    In-memory DuckDB database whose lake_* views scan the selected hourly
+    datasets, with the rollup_* and sql_queries/ views on top of them.
+
+        engine = LakeEngine(start=date(2026, 2, 1), end=date(2026, 2, 7), countries=["FR"])
+        df = engine.report("daily_summary")
+    """
+
+    def __init__(
+        self,
+        start: date | None = None,
+        end: date | None = None,
+        countries=None,
+        base_path: Path = BASE_PATH,
+        fmt: str | None = None,
+        threads: int | None = None,
+    ):
+        self.start = start
+        self.end = end
+        self.countries = sorted(countries) if countries else None
+        self.connection = duckdb.connect()
+        self.connection.execute("SET TimeZone = 'UTC'")  # days/hours in UTC, like DAY_EXPR
+        if threads:
+            self.connection.execute(f"SET threads = {int(threads)}")
+
+        self.files = {}
+        for category in LAKE_COLUMNS:
+            files, missing = partition_files(
+                base_path, category, start, end, self.countries, fmt
+            )
+            if missing:
+                print(
+                    f"⚠️ {len(missing)} {category} partition(s) have no hourly data "
+                    f"(run processing/normalize_resolution.py): "
+                    + ", ".join(day.isoformat() for day in missing[:5])
+                )
+            self.files[category] = files
+            self.connection.execute(
+                f"CREATE VIEW lake_{category} AS "
+                f"SELECT * FROM ({scan_sql(category, files)}) {self._where()}"
+            )
+
+        for name, sql in ROLLUP_VIEWS.items():
+            self.connection.execute(f"CREATE VIEW {name} AS {sql}")
+        for sql in load_views().values():
+            self.connection.execute(sql)
+
+    def _where(self) -> str:
+        conditions = []
+        if self.countries:
+            conditions.append(f"country IN (SELECT unnest({_sql_list(self.countries)}))")
+        if self.start:
+            conditions.append(f"interval_start >= TIMESTAMPTZ '{self.start} 00:00:00+00'")
+        if self.end:
+            after = self.end + timedelta(days=1)
+            conditions.append(f"interval_start < TIMESTAMPTZ '{after} 00:00:00+00'")
+        return "WHERE " + " AND ".join(conditions) if conditions else ""
+
+    def query(self, sql: str, params=None) -> pd.DataFrame:
+        """Runs any SQL against the lake_*, rollup_* and view_* relations."""
+        return self.connection.execute(sql, params or []).df()
+
+    def report(self, name: str) -> pd.DataFrame:
+        """One of REPORTS, i.e. the matching sql_queries/ view, sorted."""
+        view, order_by = REPORTS[name]
+        return self.query(f"SELECT * FROM {view} ORDER BY {order_by}")
+
+    def daily_summary(self) -> pd.DataFrame:
+        return self.report("daily_summary")
+
+    def solar_revenue(self) -> pd.DataFrame:
+        return self.report("solar_revenue")
+
+    def hourly_profitability(self) -> pd.DataFrame:
+        return self.report("hourly_profitability")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Query the processed data lake with DuckDB (no PostgreSQL)."
+    )
+    parser.add_argument("report", choices=sorted(REPORTS), help="Which view to compute")
+    parser.add_argument("--start", type=parse_date, help="First UTC day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=parse_date, help="Last UTC day, inclusive (YYYY-MM-DD)")
+    parser.add_argument(
+        "--country", action="append", help="Only this country code (repeatable)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=SUPPORTED_FORMATS,
+        help="Preferred dataset format when both exist (default: PROCESSED_FORMAT)",
+    )
+    parser.add_argument("--threads", type=int, help="DuckDB worker threads")
+    parser.add_argument("--output", help="Write the result to a .csv or .parquet file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with LakeEngine(
+        args.start, args.end, args.country, fmt=args.format, threads=args.threads
+    ) as engine:
+        file_count = sum(len(files) for files in engine.files.values())
+        print(f"🦆 {args.report}: scanning {file_count} hourly dataset(s)")
+        started = time.perf_counter()
+        result = engine.report(args.report)
+        seconds = time.perf_counter() - started
+
+    print(f"✅ {len(result)} rows in {seconds:.2f}s")
+    if args.output:
+        output = Path(args.output)
+        if output.suffix == ".parquet":
+            result.to_parquet(output, index=False)
+        else:
+            result.to_csv(output, index=False)
+        print(f"💾 Saved to: {output.absolute()}")
+    else:
+        with pd.option_context("display.width", 160, "display.max_columns", None):
+            print(result.to_string(max_rows=40))
+
+
+if __name__ == "__main__":
+    main()
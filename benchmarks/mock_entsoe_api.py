@@ -0,0 +1,216 @@
+"""
+Local stand-in for the ENTSO-E API (BASE_URL) used by the benchmarks.
+
+Answers documentType=A75/A44 requests for any bidding zone with synthetic
+documents (benchmarks/synthetic_xml.py) covering periodStart..periodEnd.
+Each response is delayed by a configurable latency (+/- jitter), and a
+configurable share of requests is answered with 429 Too Many Requests and
+a Retry-After header, exercising the client's throttling and retries.
+Generation actuals are only served up to the current time, so intraday
+polls (processing/run_intraday.py) see data being published, and a window
+opening mid-day gets Periods that start at the requested hour, so each
+poll frames the same interval with another start_time and position.
+
+Usage:
+    python benchmarks/mock_entsoe_api.py --port 8766 --latency 0.2 --error-rate 0.05
+    ENTSOE_BASE_URL=http://127.0.0.1:8766/api python ingestion/fetch_entsoe_data.py 2026-02-01
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from benchmarks.synthetic_xml import (
+    RESOLUTIONS,
+    generation_document,
+    prices_document,
+    psr_type_codes,
+)
+
+
+class MockEntsoeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        retry_after=0,
+        resolution="PT15M",
+        psr_types=None,
+        seed=0,
+    ):
+        super().__init__(address, MockEntsoeHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.resolution = resolution
+        self.psr_types = tuple(psr_types or psr_type_codes())
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "ok": 0, "throttled": 0, "bad_request": 0}
+
+        # Documents are built once per request window, so generation time
+        # does not leak into the simulated latency of repeated runs
+        self.document = lru_cache(maxsize=4096)(self._build_document)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def count(self, outcome: str):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats[outcome] += 1
+
+    def draw(self):
+        """(delay in seconds, throttle this request?) for the next request."""
+        with self.lock:
+            delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+            throttled = self.random.random() < self.error_rate
+        return max(delay, 0.0), throttled
+
+    def published_until(self, end: datetime) -> datetime | None:
+        """Current time on the resolution grid when the window reaches it (else None)."""
+        now = datetime.now(timezone.utc)
+        if end <= now:
+            return None
+        minutes = RESOLUTIONS[self.resolution]  # 15, 30 or 60
+        return now.replace(minute=now.minute - now.minute % minutes, second=0, microsecond=0)
+
+    def _build_document(self, doc_type, bidding_zone, start, days, until=None, since=None):
+        if doc_type == "A75":
+            return generation_document(
+                bidding_zone,
+                start,
+                days,
+                self.resolution,
+                list(self.psr_types),
+                until,
+                since,
+            ).encode("utf-8")
+        return prices_document(bidding_zone, start, days, self.resolution).encode("utf-8")
+
+
+class MockEntsoeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_GET(self):
+        server = self.server
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        delay, throttled = server.draw()
+        if delay:
+            time.sleep(delay)
+
+        if throttled:
+            server.count("throttled")
+            self.respond(429, b"Too Many Requests", {"Retry-After": str(server.retry_after)})
+            return
+
+        try:
+            doc_type = params["documentType"]
+            bidding_zone = params["in_Domain"]
+            start = datetime.strptime(params["periodStart"], "%Y%m%d%H%M").replace(
+                tzinfo=timezone.utc
+            )
+            end = datetime.strptime(params["periodEnd"], "%Y%m%d%H%M").replace(
+                tzinfo=timezone.utc
+            )
+            if doc_type not in ("A75", "A44") or "securityToken" not in params:
+                raise KeyError(doc_type)
+        except (KeyError, ValueError):
+            server.count("bad_request")
+            self.respond(400, b"<Acknowledgement_MarketDocument/>")
+            return
+
+        days = max((end - start).days, 1)
+        until = server.published_until(end) if doc_type == "A75" else None
+        # Daily windows start at midnight; intraday polls at a watermark hour
+        since = start if doc_type == "A75" and (start.hour or start.minute) else None
+        body = server.document(doc_type, bidding_zone, start, days, until, since)
+        server.count("ok")
+        self.respond(200, body, {"Content-Type": "text/xml"})
+
+    def respond(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # One line per request would dominate the benchmark output
+
+
+@contextmanager
+def running_server(host="127.0.0.1", port=0, **options):
+    """Runs a MockEntsoeServer in a background thread (port 0 = any free port)."""
+    server = MockEntsoeServer((host, port), **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve synthetic ENTSO-E API responses.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of latency")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests answered with 429"
+    )
+    parser.add_argument(
+        "--retry-after", type=int, default=0, help="Retry-After seconds sent with a 429"
+    )
+    parser.add_argument("--resolution", choices=sorted(RESOLUTIONS), default="PT15M")
+    parser.add_argument(
+        "--psr-types", type=int, default=None, help="Number of PSR types (default: all)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = MockEntsoeServer(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        resolution=args.resolution,
+        psr_types=psr_type_codes(args.psr_types),
+    )
+    print(f"🛰️ Mock ENTSO-E API on {server.base_url}")
+    print(f"   export ENTSOE_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n📊 {server.stats}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+"""
+Reproducible benchmarks for the pipeline stages.
+
+Generates a synthetic workload (benchmarks/synthetic_xml.py) in a scratch
+directory and times:
+
+    fetch           fetch_daily / fetch_range against the local mock API
+    parse_records   parse_xml_to_records (row dicts) over every raw file
+    parse_stream    parse_xml_to_frame (streaming iterparse) over every raw file
+    enrich          enrich_dataset on the day's parsed datasets
+    load            load_csv_to_postgres into a throw-away schema
+
+Each benchmark runs in a fresh (spawned) interpreter so its peak RSS is
+its own; the baseline RSS after imports is reported next to it. Results
+are printed and written to benchmarks/results/{timestamp}_{commit}.json,
+which --compare can diff against a run from another commit.
+
+The load benchmark creates and drops the schema "bench_<pid>" in the
+database configured in .env; the real tables are never touched.
+
+Usage:
+    python benchmarks/pipeline_benchmarks.py --zones 10 --days 1 --resolution PT15M
+    python benchmarks/pipeline_benchmarks.py --only parse_stream,enrich \\
+        --compare benchmarks/results/20260201T120000_abc1234.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from benchmarks.mock_entsoe_api import running_server
+from benchmarks.synthetic_xml import (
+    RESOLUTIONS,
+    psr_type_codes,
+    synthetic_zones,
+    write_raw_tree,
+)
+from data.reference.countries import COUNTRIES
+from ingestion.raw_archive import RAW_FORMATS, compress_tree, list_raw_documents
+from processing.instrumentation import peak_rss_bytes
+
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+BENCHMARKS = ["fetch", "parse_records", "parse_stream", "enrich", "load"]
+CATEGORIES = ["generation", "prices"]
+
+
+# ======================================================
+# Benchmarks (each runs in its own process)
+# ======================================================
+def _timed_runs(repeat, body):
+    """Runs body() repeat times with stdout silenced; returns (seconds per run, last result)."""
+    seconds, result = [], None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = body()
+            seconds.append(time.perf_counter() - started)
+    return seconds, result
+
+
+def bench_fetch(options):
+    from ingestion import fetch_entsoe_data as fetcher
+    from ingestion.entsoe_client import RateLimiter, build_session
+    from processing.instrumentation import StageRun
+
+    baseline = peak_rss_bytes()
+    fetcher.RAW_BASE_DIR = Path(options["workdir"]) / "fetched"
+    countries = {code: fetcher.COUNTRIES[code] for code in options["fetch_zones"]}
+    start = datetime.strptime(options["start"], "%Y-%m-%d")
+    end = start + timedelta(days=options["days"] - 1)
+    units = []
+
+    def body():
+        session = build_session(options["workers"])
+        limiter = RateLimiter(options["rpm"])
+        metrics = StageRun("fetch")
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            if options["days"] == 1:
+                fetcher.fetch_daily(
+                    start,
+                    executor,
+                    session,
+                    limiter,
+                    None,
+                    countries=countries,
+                    metrics=metrics,
+                    raw_format=options["raw_format"],
+                )
+            else:
+                fetcher.fetch_range(
+                    start,
+                    end,
+                    executor,
+                    session,
+                    limiter,
+                    None,
+                    countries=countries,
+                    metrics=metrics,
+                    raw_format=options["raw_format"],
+                )
+        units[:] = metrics.measurements
+
+    seconds, _ = _timed_runs(options["repeat"], body)
+    http = sorted(unit.phases["http"] for unit in units)
+    return {
+        "seconds": seconds,
+        "units": len(units),
+        "bytes": sum(unit.bytes for unit in units),
+        "failed": sum(unit.status != "success" for unit in units),
+        "retries": sum(max(unit.extra["attempts"] - 1, 0) for unit in units),
+        "http_p50_seconds": round(statistics.median(http), 4) if http else None,
+        "baseline_rss": baseline,
+        "peak_rss": peak_rss_bytes(),
+    }
+
+
+def _raw_files(options):
+    raw_dir = Path(options["workdir"]) / "raw"
+    return [
+        (path, category)
+        for category in CATEGORIES
+        for day_dir in sorted((raw_dir / category).glob("*/*/*"))
+        for path in list_raw_documents(day_dir)
+    ]
+
+
+def bench_parse_records(options):
+    from processing.parse_generation_xml import parse_xml_to_records
+
+    baseline = peak_rss_bytes()
+    files = _raw_files(options)
+
+    def body():
+        return sum(len(parse_xml_to_records(path, category)) for path, category in files)
+
+    seconds, rows = _timed_runs(options["repeat"], body)
+    return {
+        "seconds": seconds,
+        "rows": rows,
+        "bytes": sum(path.stat().st_size for path, _ in files),
+        "baseline_rss": baseline,
+        "peak_rss": peak_rss_bytes(),
+    }
+
+
+def bench_parse_stream(options):
+    from processing.parse_generation_xml import parse_xml_to_frame
+
+    baseline = peak_rss_bytes()
+    files = _raw_files(options)
+
+    def body():
+        return sum(len(parse_xml_to_frame(path, category)) for path, category in files)
+
+    seconds, rows = _timed_runs(options["repeat"], body)
+    return {
+        "seconds": seconds,
+        "rows": rows,
+        "bytes": sum(path.stat().st_size for path, _ in files),
+        "baseline_rss": baseline,
+        "peak_rss": peak_rss_bytes(),
+    }
+
+
+def _parsed_datasets(options):
+    """{category: parsed dataset path}, written once by prepare_parsed()."""
+    processed = Path(options["workdir"]) / "processed"
+    return {
+        category: next((processed / category).glob("parsed_*"))
+        for category in CATEGORIES
+        if (processed / category).exists()
+    }
+
+
+def prepare_parsed(options):
+    """Parses every raw file into one parsed dataset per category (enrich/load input)."""
+    import pandas as pd
+
+    from processing.parse_generation_xml import parse_xml_to_frame
+    from processing.storage import write_dataset
+
+    processed = Path(options["workdir"]) / "processed"
+    for category in CATEGORIES:
+        frames = [
+            parse_xml_to_frame(path, category)
+            for path, file_category in _raw_files(options)
+            if file_category == category
+        ]
+        write_dataset(
+            pd.concat(frames, ignore_index=True),
+            processed / category,
+            f"parsed_{category}",
+            options["format"],
+        )
+    return {}
+
+
+def bench_enrich(options):
+    from processing.enrich_generation_data import enrich_dataset
+
+    baseline = peak_rss_bytes()
+    datasets = _parsed_datasets(options)
+
+    def body():
+        return sum(
+            enrich_dataset(
+                path, category, options["format"], chunksize=options["chunksize"]
+            )
+            for category, path in datasets.items()
+        )
+
+    seconds, rows = _timed_runs(options["repeat"], body)
+    return {
+        "seconds": seconds,
+        "rows": rows,
+        "bytes": sum(path.stat().st_size for path in datasets.values()),
+        "baseline_rss": baseline,
+        "peak_rss": peak_rss_bytes(),
+    }
+
+
+def bench_load(options):
+    import psycopg2
+
+    from processing.load_generation_to_postgres import DB_CONFIG, load_csv_to_postgres
+
+    baseline = peak_rss_bytes()
+    processed = Path(options["workdir"]) / "processed"
+    datasets = {
+        category: next((processed / category).glob("enriched_*"))
+        for category in CATEGORIES
+    }
+    schema = f"bench_{os.getpid()}"
+    conn = psycopg2.connect(**DB_CONFIG, options=f"-c search_path={schema}")
+
+    def reset_schema():
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema};")
+        conn.commit()
+
+    def body():
+        reset_schema()
+        rows = 0
+        for category, path in datasets.items():
+            counts = load_csv_to_postgres(
+                conn, path, category, options["method"], options["schema"]
+            )
+            rows += sum(counts.values())
+        return rows
+
+    try:
+        seconds, rows = _timed_runs(options["repeat"], body)
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.commit()
+        conn.close()
+
+    return {
+        "seconds": seconds,
+        "rows": rows,
+        "bytes": sum(path.stat().st_size for path in datasets.values()),
+        "baseline_rss": baseline,
+        "peak_rss": peak_rss_bytes(),
+    }
+
+
+BENCHMARK_FUNCTIONS = {
+    "fetch": bench_fetch,
+    "parse_records": bench_parse_records,
+    "parse_stream": bench_parse_stream,
+    "enrich": bench_enrich,
+    "load": bench_load,
+}
+
+
+def run_isolated(function, options):
+    """Runs function(options) in a freshly spawned interpreter."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(function, options).result()
+
+
+# ======================================================
+# Reporting
+# ======================================================
+def summarize(raw):
+    seconds = statistics.median(raw["seconds"])
+    result = {
+        "seconds_median": round(seconds, 4),
+        "seconds_min": round(min(raw["seconds"]), 4),
+        "runs": len(raw["seconds"]),
+        "peak_rss_mb": round(raw["peak_rss"] / 2**20, 1),
+        "rss_delta_mb": round((raw["peak_rss"] - raw["baseline_rss"]) / 2**20, 1),
+    }
+    if raw.get("rows"):
+        result["rows"] = raw["rows"]
+        result["rows_per_second"] = round(raw["rows"] / seconds, 1)
+    if raw.get("bytes"):
+        result["mb_per_second"] = round(raw["bytes"] / 2**20 / seconds, 2)
+    extras = set(raw) - {"seconds", "rows", "bytes", "baseline_rss", "peak_rss"}
+    result.update({key: raw[key] for key in sorted(extras)})
+    result["bytes"] = raw.get("bytes", 0)
+    return result
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def print_results(results, previous=None):
+    print(
+        f"\n{'benchmark':<15}{'median s':>10}{'rows/s':>14}"
+        f"{'MB/s':>9}{'peak MB':>9}{'Δ MB':>8}"
+    )
+    for name, result in results.items():
+        line = (
+            f"{name:<15}{result['seconds_median']:>10.3f}"
+            f"{result.get('rows_per_second', 0):>14,.0f}"
+            f"{result.get('mb_per_second', 0):>9.1f}"
+            f"{result['peak_rss_mb']:>9.0f}{result['rss_delta_mb']:>8.0f}"
+        )
+        before = (previous or {}).get(name)
+        if before:
+            speedup = before["seconds_median"] / result["seconds_median"]
+            memory = result["peak_rss_mb"] - before["peak_rss_mb"]
+            line += f"   {speedup:.2f}x time, {memory:+.0f} MB peak"
+        print(line)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the ENTSO-E pipeline stages.")
+    parser.add_argument("--only", help=f"Comma-separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--zones", type=int, default=10, help="Number of zones")
+    parser.add_argument(
+        "--psr-types", type=int, default=None, help="PSR types per zone (default: all)"
+    )
+    parser.add_argument("--resolution", choices=sorted(RESOLUTIONS), default="PT15M")
+    parser.add_argument("--days", type=int, default=1, help="Days of data")
+    parser.add_argument("--start", default="2026-02-01", help="First day (YYYY-MM-DD)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument(
+        "--raw-format",
+        choices=RAW_FORMATS,
+        default="xml",
+        help="Raw documents as plain XML or as the zstd archive (fetch and parse)",
+    )
+    parser.add_argument("--chunksize", type=int, help="Benchmark chunked enrichment")
+    parser.add_argument("--method", choices=["copy", "revise", "batch"], default="copy")
+    parser.add_argument("--schema", choices=["flat", "partitioned"], default="flat")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent fetch requests")
+    parser.add_argument("--rpm", type=float, default=6000, help="Fetch requests per minute")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock API latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Mock API jitter (s)")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of mock responses that are 429"
+    )
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/...)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--workdir", help="Scratch directory (default: a temporary one)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    selected = args.only.split(",") if args.only else BENCHMARKS
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        sys.exit(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    zones = synthetic_zones(args.zones)
+    psr_types = psr_type_codes(args.psr_types)
+    start = datetime.strptime(args.start, "%Y-%m-%d")
+
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory())
+        options = {
+            **vars(args),
+            "workdir": workdir,
+            # The fetcher only knows the reference countries
+            "fetch_zones": [code for code in zones if code in COUNTRIES],
+        }
+
+        print(
+            f"🧪 Workload: {len(zones)} zone(s) x {len(psr_types)} PSR type(s) x "
+            f"{args.days} day(s) at {args.resolution} → {workdir}"
+        )
+        paths = write_raw_tree(
+            Path(workdir) / "raw", zones, start, args.days, args.resolution, psr_types
+        )
+        size = sum(path.stat().st_size for path in paths)
+        print(f"   {len(paths)} documents, {size / 1e6:.1f} MB")
+        if args.raw_format == "zst":
+            _, _, archived = compress_tree(Path(workdir) / "raw")
+            print(f"   archived as .xml.zst: {archived / 1e6:.1f} MB")
+
+        # Child processes must not touch the real metrics log or API key
+        os.environ["PIPELINE_METRICS_LOG"] = ""
+        os.environ["ENTSOE_API_KEY"] = "benchmark"
+
+        results = {}
+        if "fetch" in selected:
+            with running_server(
+                latency=args.latency,
+                jitter=args.jitter,
+                error_rate=args.error_rate,
+                resolution=args.resolution,
+                psr_types=psr_types,
+            ) as server:
+                os.environ["ENTSOE_BASE_URL"] = server.base_url
+                print("⏱️ fetch")
+                results["fetch"] = summarize(run_isolated(bench_fetch, options))
+                results["fetch"]["server"] = dict(server.stats)
+
+        if {"enrich", "load"} & set(selected):
+            run_isolated(prepare_parsed, options)
+        if "load" in selected and "enrich" not in selected:
+            run_isolated(bench_enrich, {**options, "repeat": 1})
+
+        for name in BENCHMARKS[1:]:
+            if name in selected:
+                print(f"⏱️ {name}")
+                raw = run_isolated(BENCHMARK_FUNCTIONS[name], options)
+                results[name] = summarize(raw)
+
+    previous = None
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())["results"]
+    print_results(results, previous)
+
+    revision = git_revision()
+    report = {
+        "commit": revision,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "compare", "workdir")
+        },
+        "results": results,
+    }
+    output = Path(
+        args.output
+        or RESULTS_DIR / f"{datetime.now():%Y%m%dT%H%M%S}_{revision}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n💾 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
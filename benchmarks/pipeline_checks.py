@@ -0,0 +1,212 @@
+"""
+End-to-end consistency checks for the pipeline.
+
+Each check runs in a fresh (spawned) interpreter against the local mock
+API (benchmarks/mock_entsoe_api.py), writes its raw and processed files to
+a scratch directory and loads into the schema "check_<pid>" of the
+database configured in .env, created and dropped around the check; the
+real data/ tree and tables are never touched.
+
+    split_days            a multi-day document split by day parses to the
+                          same rows as a single-day document
+    intraday_then_daily   two intraday polls, then the daily load of the
+                          same day: one row per series and interval
+
+A failed check prints what differed and makes the script exit non-zero.
+
+Usage:
+    python benchmarks/pipeline_checks.py
+    python benchmarks/pipeline_checks.py --only split_days --resolution PT60M
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from benchmarks.mock_entsoe_api import running_server
+from benchmarks.synthetic_xml import generation_document, psr_type_codes
+
+CHECKS = ["split_days", "intraday_then_daily"]
+
+
+# ======================================================
+# Checks (each runs in its own process)
+# ======================================================
+@contextlib.contextmanager
+def scratch_schema():
+    """Points every pooled connection of this process at a throw-away schema."""
+    import psycopg2
+
+    from processing.db import DB_CONFIG, close_pool
+
+    schema = f"check_{os.getpid()}"
+    os.environ["PGOPTIONS"] = f"-c search_path={schema}"
+    with psycopg2.connect(**DB_CONFIG) as conn, conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema};")
+    try:
+        yield schema
+    finally:
+        close_pool()
+        with psycopg2.connect(**DB_CONFIG) as conn, conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE;")
+
+
+def duplicated_intervals(cur, table, key):
+    """Number of surplus rows per key in table (0 when the key is unique)."""
+    cur.execute(f"SELECT COUNT(*) - COUNT(DISTINCT ({key})) FROM {table};")
+    return cur.fetchone()[0]
+
+
+def _parsed_rows(xml_text, country_code):
+    from processing.parse_generation_xml import batch_to_frame, parse_document_to_chunk
+    from processing.resolve_timestamps import add_interval_start
+
+    chunk = parse_document_to_chunk(xml_text, "generation", country_code)
+    return add_interval_start(batch_to_frame(chunk, "generation"))
+
+
+def check_split_days(options):
+    from ingestion.fetch_entsoe_data import COUNTRIES
+    from ingestion.xml_partitioning import split_document_by_day
+
+    country_code = options["country"]
+    bidding_zone = COUNTRIES[country_code]["bidding_zone"]
+    psr_types = psr_type_codes(options["psr_types"])
+    first = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    day = first + timedelta(days=1)
+
+    # Three market days in one response, like a range fetch
+    pieces = split_document_by_day(
+        generation_document(bidding_zone, first, 3, options["resolution"], psr_types)
+    )
+    split = _parsed_rows(pieces[day.date()], country_code)
+    # The same day requested on its own, from its first UTC interval
+    single = _parsed_rows(
+        generation_document(
+            bidding_zone, day, 1, options["resolution"], psr_types, since=day
+        ),
+        country_code,
+    )
+
+    key = ["psr_type", "interval_start"]
+    compared = ["start_time", "resolution", "position", "value"]
+    merged = single.merge(split, on=key, how="left", suffixes=("", "_split"))
+    failures = []
+    missing = merged["value_split"].isna().sum()
+    if missing:
+        failures.append(f"{missing} interval(s) of the single-day document not in the split")
+    for column in compared:
+        differs = (merged[column].astype(str) != merged[f"{column}_split"].astype(str)).sum()
+        if differs:
+            failures.append(f"{column}: {differs} row(s) differ from the single-day document")
+    return failures
+
+
+def check_intraday_then_daily(options):
+    from ingestion import fetch_entsoe_data as fetcher
+    from processing import parse_generation_xml, run_pipeline
+    from processing.db import connection
+    from processing.run_intraday import run_intraday
+
+    workdir = Path(options["workdir"])
+    fetcher.RAW_BASE_DIR = workdir / "raw"
+    parse_generation_xml.PROCESSED_BASE_DIR = workdir / "processed"
+    run_pipeline.PROCESSED_BASE_DIR = workdir / "processed"
+    today = datetime.now(timezone.utc)
+    failures = []
+
+    with scratch_schema(), contextlib.redirect_stdout(io.StringIO()):
+        # The second poll resumes at the watermark hour: the mock frames
+        # those intervals with another Period start_time and positions
+        for _ in range(2):
+            run_intraday(options["country"], workers=2, rpm=6000)
+        loaded = run_pipeline.run_pipeline(
+            f"{today:%Y-%m-%d}", workers=2, rpm=6000, use_cache=False
+        )
+
+        with connection() as conn, conn.cursor() as cur:
+            for table, key in (
+                ("energy_generation", "country, psr_type, interval_start"),
+                ("energy_generation_hourly", "country, psr_type, interval_start"),
+            ):
+                surplus = duplicated_intervals(cur, table, key)
+                if surplus:
+                    failures.append(f"{table}: {surplus} duplicated interval row(s)")
+
+            cur.execute("SELECT COUNT(*) FROM energy_generation;")
+            stored = cur.fetchone()[0]
+
+    # The daily run covers every interval the polls loaded
+    if stored != loaded.get("generation"):
+        failures.append(
+            f"energy_generation: {stored} rows, the daily load parsed "
+            f"{loaded.get('generation')}"
+        )
+    return failures
+
+
+CHECK_FUNCTIONS = {
+    "split_days": check_split_days,
+    "intraday_then_daily": check_intraday_then_daily,
+}
+
+
+def run_isolated(function, options):
+    """Runs function(options) in a freshly spawned interpreter."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(function, options).result()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--only", help=f"Comma-separated subset of {','.join(CHECKS)}")
+    parser.add_argument("--country", default="FR", help="Zone of the checked documents")
+    parser.add_argument(
+        "--psr-types", type=int, default=3, help="Number of PSR types served by the mock"
+    )
+    parser.add_argument("--resolution", default="PT15M", help="Resolution served by the mock")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    selected = args.only.split(",") if args.only else CHECKS
+    unknown = set(selected) - set(CHECKS)
+    if unknown:
+        sys.exit(f"Unknown check(s): {', '.join(sorted(unknown))}")
+
+    # Child processes must not touch the real metrics log or API key
+    os.environ["PIPELINE_METRICS_LOG"] = ""
+    os.environ["ENTSOE_API_KEY"] = "check"
+
+    failed = []
+    with tempfile.TemporaryDirectory() as workdir, running_server(
+        resolution=args.resolution, psr_types=psr_type_codes(args.psr_types)
+    ) as server:
+        os.environ["ENTSOE_BASE_URL"] = server.base_url
+        for name in selected:
+            options = {**vars(args), "workdir": str(Path(workdir) / name)}
+            failures = run_isolated(CHECK_FUNCTIONS[name], options)
+            print(f"{'❌' if failures else '✅'} {name}")
+            for failure in failures:
+                print(f"   {failure}")
+            if failures:
+                failed.append(name)
+
+    if failed:
+        sys.exit(f"{len(failed)} check(s) failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Synthetic ENTSO-E documents for benchmarks.
+
+Builds A75 (actual generation per production type) and A44 (day-ahead
+prices) documents with the namespaces and the TimeSeries / Period / Point
+layout of real API responses: one TimeSeries per PSR type and day for
+generation, one per day for prices. Values are deterministic (seeded per
+zone, PSR type and day), so the same parameters always produce the same
+bytes and benchmark runs stay comparable across commits.
+
+Usage (writes data/raw-style partitions under --output):
+    python benchmarks/synthetic_xml.py --zones 10 --psr-types 12 --days 7 \\
+        --resolution PT15M --output /tmp/entsoe-bench/raw
+"""
+
+import argparse
+import math
+import random
+import sys
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from data.reference.registry import get_registry
+
+COUNTRIES = get_registry().countries
+
+GENERATION_NAMESPACE = "urn:iec62325.351:tc57wg16:451-6:generationloaddocument:3:0"
+PRICES_NAMESPACE = "urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:3"
+
+RESOLUTIONS = {"PT15M": 15, "PT30M": 30, "PT60M": 60}
+CATEGORIES = {"generation": "A75", "prices": "A44"}
+
+# CET: the ENTSO-E market day starts at 23:00 UTC the day before
+DAY_START_OFFSET = timedelta(hours=-1)
+TIME_FORMAT = "%Y-%m-%dT%H:%MZ"
+
+
+def psr_type_codes(limit: int | None = None) -> list[str]:
+    """PSR type codes from the reference registry (B01, B02, ...), optionally the first N."""
+    codes = list(get_registry().psr_types)
+    return codes[:limit] if limit else codes
+
+
+def synthetic_zones(count: int) -> dict[str, str]:
+    """
+    {country code: bidding zone} for count zones: the real reference
+    countries first, then made-up codes (Z0, Z1, ...) for larger runs.
+    """
+    zones = {code: meta["bidding_zone"] for code, meta in sorted(COUNTRIES.items())}
+    index = 0
+    while len(zones) < count:
+        zones[f"Z{index}"] = f"10YSYNTH{index:04d}---X"
+        index += 1
+    return dict(list(zones.items())[:count])
+
+
+def _rng(*key) -> random.Random:
+    return random.Random(zlib.crc32("|".join(map(str, key)).encode()))
+
+
+def _day_windows(start: datetime, days: int):
+    """(start, end) of each market day, in UTC."""
+    first = datetime(start.year, start.month, start.day, tzinfo=timezone.utc)
+    first += DAY_START_OFFSET
+    for offset in range(days):
+        day_start = first + timedelta(days=offset)
+        yield day_start, day_start + timedelta(days=1)
+
+
+def _header(root: str, namespace: str, doc_type: str, start: datetime, days: int):
+    end = start + timedelta(days=days)
+    interval_tag = (
+        "time_Period.timeInterval" if doc_type == "A75" else "period.timeInterval"
+    )
+    process = (
+        "<process.processType>A16</process.processType>" if doc_type == "A75" else ""
+    )
+    return [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        f'<{root} xmlns="{namespace}">',
+        f"<mRID>{zlib.crc32(f'{doc_type}{start}{days}'.encode()):08x}</mRID>",
+        "<revisionNumber>1</revisionNumber>",
+        f"<type>{doc_type}</type>",
+        process,
+        '<sender_MarketParticipant.mRID codingScheme="A01">10X1001A1001A450'
+        "</sender_MarketParticipant.mRID>",
+        "<sender_MarketParticipant.marketRole.type>A32"
+        "</sender_MarketParticipant.marketRole.type>",
+        '<receiver_MarketParticipant.mRID codingScheme="A01">10X1001A1001A450'
+        "</receiver_MarketParticipant.mRID>",
+        "<receiver_MarketParticipant.marketRole.type>A33"
+        "</receiver_MarketParticipant.marketRole.type>",
+        f"<createdDateTime>{start:%Y-%m-%dT%H:%M:%SZ}</createdDateTime>",
+        f"<{interval_tag}><start>{start:{TIME_FORMAT}}</start>"
+        f"<end>{end:{TIME_FORMAT}}</end></{interval_tag}>",
+    ]
+
+
+def _period(day_start, day_end, resolution, values, value_tag, until=None, since=None):
+    step = timedelta(minutes=RESOLUTIONS[resolution])
+    if until is not None:
+        # Only the intervals that have ended by `until` are published
+        values = values[: max(int((until - day_start) / step), 0)]
+    if since is not None and since > day_start:
+        # A window opening mid-day: the Period starts at its first interval
+        skipped = min(int((since - day_start) / step), len(values))
+        values = values[skipped:]
+        day_start += skipped * step
+    parts = [
+        f"<Period><timeInterval><start>{day_start:{TIME_FORMAT}}</start>"
+        f"<end>{day_end:{TIME_FORMAT}}</end></timeInterval>"
+        f"<resolution>{resolution}</resolution>"
+    ]
+    parts.extend(
+        f"<Point><position>{position}</position>"
+        f"<{value_tag}>{value}</{value_tag}></Point>"
+        for position, value in enumerate(values, start=1)
+    )
+    parts.append("</Period>")
+    return parts
+
+
+def generation_values(zone, psr_type, day_start, points):
+    """A plausible daily profile: solar follows the sun, other types hover around a base load."""
+    rng = _rng(zone, psr_type, day_start.date())
+    base = rng.uniform(50, 5000)
+    values = []
+    for index in range(points):
+        hour = 24 * index / points
+        if psr_type == "B16":  # Solar
+            shape = max(0.0, math.sin(math.pi * (hour - 6) / 14)) if 6 <= hour <= 20 else 0.0
+            values.append(round(base * shape * rng.uniform(0.85, 1.0)))
+        else:
+            values.append(round(base * rng.uniform(0.9, 1.1)))
+    return values
+
+
+def price_values(zone, day_start, points):
+    """Evening/morning peaks around a daily level, occasionally negative at noon."""
+    rng = _rng(zone, "price", day_start.date())
+    level = rng.uniform(40, 140)
+    values = []
+    for index in range(points):
+        hour = 24 * index / points
+        peak = 25 * math.exp(-((hour - 8) ** 2) / 4) + 35 * math.exp(-((hour - 19) ** 2) / 5)
+        dip = 45 * math.exp(-((hour - 13) ** 2) / 6)
+        values.append(f"{level + peak - dip + rng.uniform(-5, 5):.2f}")
+    return values
+
+
+def generation_document(
+    bidding_zone: str,
+    start: datetime,
+    days: int = 1,
+    resolution: str = "PT15M",
+    psr_types: list[str] | None = None,
+    until: datetime | None = None,
+    since: datetime | None = None,
+) -> str:
+    """
+    A75 document for one zone: one TimeSeries per PSR type and market day.
+    With until (UTC), Points of intervals ending later are left out, like
+    actuals that are not published yet. With since (UTC), Periods start at
+    the first interval from since on and number their Points from 1, like
+    the response to a window that opens mid-day.
+    """
+    points = 24 * 60 // RESOLUTIONS[resolution]
+    psr_types = psr_types or psr_type_codes()
+    windows = list(_day_windows(start, days))
+    parts = _header("GL_MarketDocument", GENERATION_NAMESPACE, "A75", windows[0][0], days)
+
+    series_id = 0
+    for psr_type in psr_types:
+        for day_start, day_end in windows:
+            series_id += 1
+            parts.append(
+                f"<TimeSeries><mRID>{series_id}</mRID>"
+                "<businessType>A01</businessType>"
+                "<objectAggregation>A08</objectAggregation>"
+                f'<inBiddingZone_Domain.mRID codingScheme="A01">{bidding_zone}'
+                "</inBiddingZone_Domain.mRID>"
+                "<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name>"
+                "<curveType>A01</curveType>"
+                f"<MktPSRType><psrType>{psr_type}</psrType></MktPSRType>"
+            )
+            values = generation_values(bidding_zone, psr_type, day_start, points)
+            parts.extend(
+                _period(day_start, day_end, resolution, values, "quantity", until, since)
+            )
+            parts.append("</TimeSeries>")
+
+    parts.append("</GL_MarketDocument>")
+    return "".join(parts)
+
+
+def prices_document(
+    bidding_zone: str,
+    start: datetime,
+    days: int = 1,
+    resolution: str = "PT60M",
+) -> str:
+    """A44 document for one zone: one TimeSeries per market day."""
+    points = 24 * 60 // RESOLUTIONS[resolution]
+    windows = list(_day_windows(start, days))
+    parts = _header(
+        "Publication_MarketDocument", PRICES_NAMESPACE, "A44", windows[0][0], days
+    )
+
+    for series_id, (day_start, day_end) in enumerate(windows, start=1):
+        parts.append(
+            f"<TimeSeries><mRID>{series_id}</mRID>"
+            "<auction.type>A01</auction.type>"
+            "<businessType>A62</businessType>"
+            f'<in_Domain.mRID codingScheme="A01">{bidding_zone}</in_Domain.mRID>'
+            f'<out_Domain.mRID codingScheme="A01">{bidding_zone}</out_Domain.mRID>'
+            "<contract_MarketAgreement.type>A01</contract_MarketAgreement.type>"
+            "<currency_Unit.name>EUR</currency_Unit.name>"
+            "<price_Measure_Unit.name>MWH</price_Measure_Unit.name>"
+            "<curveType>A01</curveType>"
+        )
+        values = price_values(bidding_zone, day_start, points)
+        parts.extend(_period(day_start, day_end, resolution, values, "price.amount"))
+        parts.append("</TimeSeries>")
+
+    parts.append("</Publication_MarketDocument>")
+    return "".join(parts)
+
+
+def build_document(
+    category: str,
+    bidding_zone: str,
+    start: datetime,
+    days: int = 1,
+    resolution: str = "PT15M",
+    psr_types: list[str] | None = None,
+) -> str:
+    if category == "generation":
+        return generation_document(bidding_zone, start, days, resolution, psr_types)
+    return prices_document(bidding_zone, start, days, resolution)
+
+
+def write_raw_tree(
+    output_dir: Path,
+    zones: dict[str, str],
+    start: datetime,
+    days: int,
+    resolution: str = "PT15M",
+    psr_types: list[str] | None = None,
+    categories=tuple(CATEGORIES),
+) -> list[Path]:
+    """
+    Writes one document per category, zone and day in the data/raw layout:
+    {output_dir}/{category}/{YYYY}/{MM}/{DD}/{category}_{CC}.xml
+    """
+    written = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        for category in categories:
+            day_dir = Path(output_dir) / category / day.strftime("%Y/%m/%d")
+            day_dir.mkdir(parents=True, exist_ok=True)
+            for country_code, bidding_zone in zones.items():
+                path = day_dir / f"{category}_{country_code}.xml"
+                path.write_text(
+                    build_document(category, bidding_zone, day, 1, resolution, psr_types),
+                    encoding="utf-8",
+                )
+                written.append(path)
+    return written
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Write synthetic ENTSO-E XML documents.")
+    parser.add_argument("--output", required=True, help="Root of the raw partition tree")
+    parser.add_argument("--start", default="2026-02-01", help="First day (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=1, help="Number of days")
+    parser.add_argument("--zones", type=int, default=len(COUNTRIES), help="Number of zones")
+    parser.add_argument(
+        "--psr-types", type=int, default=None, help="Number of PSR types (default: all)"
+    )
+    parser.add_argument("--resolution", choices=sorted(RESOLUTIONS), default="PT15M")
+    parser.add_argument("--category", choices=sorted(CATEGORIES), help="Only this category")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = datetime.strptime(args.start, "%Y-%m-%d")
+    categories = [args.category] if args.category else list(CATEGORIES)
+    paths = write_raw_tree(
+        Path(args.output),
+        synthetic_zones(args.zones),
+        start,
+        args.days,
+        args.resolution,
+        psr_type_codes(args.psr_types),
+        categories,
+    )
+    size = sum(path.stat().st_size for path in paths)
+    print(f"✅ Wrote {len(paths)} documents ({size / 1e6:.1f} MB) under {args.output}")
+
+
+if __name__ == "__main__":
+    main()
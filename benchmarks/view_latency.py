@@ -0,0 +1,155 @@
+"""
+View latency benchmark for the analytics indexes.
+
+Times the views in sql_queries/ and the source-table queries behind them
+(the per-day rollup refresh and a direct daily solar aggregate) first with
+the loader's indexes in place, then with those indexes dropped inside a
+transaction that is rolled back afterwards. Nothing is changed permanently,
+but the DROP INDEX holds an exclusive lock on the tables while it runs, so
+point it at a non-production database.
+
+Usage:
+    python benchmarks/view_latency.py --days 7 --repeat 5
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from processing.load_generation_to_postgres import (
+    DB_CONFIG,
+    HOURLY_TABLE_SCHEMAS,
+    TABLE_SCHEMAS,
+    ensure_table,
+)
+from processing.rollups import DAY_EXPR, ROLLUP_SCHEMA_SQL, refresh_rollups
+
+VIEW_DIR = PROJECT_ROOT / "sql_queries"
+SCHEMAS = [*TABLE_SCHEMAS.values(), *HOURLY_TABLE_SCHEMAS.values()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark analytics view latency.")
+    parser.add_argument("--days", type=int, default=7, help="Most recent days to refresh")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query")
+    return parser.parse_args()
+
+
+def load_views() -> dict[str, str]:
+    """Returns {view name: CREATE VIEW statement} for sql_queries/view_*.sql."""
+    views = {}
+    for path in sorted(VIEW_DIR.glob("view_*.sql")):
+        sql = path.read_text()
+        match = re.search(r"CREATE\s+OR\s+REPLACE\s+VIEW\s+(\w+)", sql, re.IGNORECASE)
+        if match:
+            views[match.group(1)] = sql
+    return views
+
+
+def time_query(cur, sql, params=None, repeat=5) -> float:
+    """Median wall time of a query in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cur.execute(sql, params)
+        if cur.description is not None:
+            cur.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def recent_pairs(cur, days: int) -> list[tuple]:
+    """(country, day) pairs of the most recent generation days."""
+    cur.execute(
+        f"""
+        SELECT DISTINCT country, {DAY_EXPR} AS day
+        FROM energy_generation
+        WHERE interval_start >= (SELECT MAX(interval_start) FROM energy_generation)
+                               - make_interval(days => %s)
+        """,
+        (days,),
+    )
+    return cur.fetchall()
+
+
+def run_suite(cur, views, pairs, repeat) -> dict[str, float]:
+    results = {}
+    for name in views:
+        results[f"SELECT * FROM {name}"] = time_query(
+            cur, f"SELECT * FROM {name};", repeat=repeat
+        )
+
+    days = sorted({day for _, day in pairs})
+    results["daily solar (energy_generation)"] = time_query(
+        cur,
+        f"""
+        SELECT country, {DAY_EXPR}, SUM(quantity_mw)
+        FROM energy_generation
+        WHERE psr_type = 'B16' AND {DAY_EXPR} = ANY(%s::date[])
+        GROUP BY 1, 2;
+        """,
+        (days,),
+        repeat=repeat,
+    )
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        refresh_rollups(cur, "generation", pairs)
+        refresh_rollups(cur, "prices", pairs)
+    results[f"rollup refresh ({len(pairs)} country-days)"] = (
+        (time.perf_counter() - started) * 1000 / repeat
+    )
+    return results
+
+
+def main():
+    args = parse_args()
+    views = load_views()
+
+    print(f"🚀 View latency benchmark ({args.repeat} runs per query)")
+    with psycopg2.connect(**DB_CONFIG) as conn:
+        with conn.cursor() as cur:
+            for schema in SCHEMAS:
+                ensure_table(cur, schema)
+            cur.execute(ROLLUP_SCHEMA_SQL)
+            for sql in views.values():
+                cur.execute(sql)
+            for schema in SCHEMAS:
+                cur.execute(f"ANALYZE {schema['table_name']};")
+            conn.commit()
+
+            pairs = recent_pairs(cur, args.days)
+            if not pairs:
+                print("ℹ️ energy_generation is empty, load some data first.")
+                return
+
+            with_indexes = run_suite(cur, views, pairs, args.repeat)
+            conn.rollback()
+
+            # Drop the analytics indexes for the duration of this transaction only
+            for schema in SCHEMAS:
+                for name in schema["indexes"]:
+                    cur.execute(f"DROP INDEX IF EXISTS {name};")
+            without_indexes = run_suite(cur, views, pairs, args.repeat)
+            conn.rollback()
+
+    width = max(len(label) for label in with_indexes)
+    print(f"\n{'query':<{width}}  {'no index':>10}  {'indexed':>10}  {'speedup':>8}")
+    for label, indexed_ms in with_indexes.items():
+        plain_ms = without_indexes[label]
+        speedup = plain_ms / indexed_ms if indexed_ms else float("inf")
+        print(
+            f"{label:<{width}}  {plain_ms:>8.1f}ms  {indexed_ms:>8.1f}ms  {speedup:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
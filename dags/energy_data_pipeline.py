@@ -1,6 +1,9 @@
 from airflow import DAG
+from airflow.decorators import task, task_group
 from airflow.operators.bash import BashOperator
+from airflow.operators.empty import EmptyOperator
 from datetime import datetime, timedelta
+import sys
 
 # ======================================================
 # CONFIGURATION
@@ -11,16 +14,81 @@ PYTHON_BIN = "/Volumes/Seagate5T/CienciaDeDadosBACKUP/__MyProjectsDataAnalyse/eu
 # Absolute path to the project root directory on the Seagate drive
 PROJECT_DIR = "/Volumes/Seagate5T/CienciaDeDadosBACKUP/__MyProjectsDataAnalyse/eu-energy-data-pipeline"
 
+# Country list comes from the same reference file the fetcher uses
+if PROJECT_DIR not in sys.path:
+    sys.path.append(PROJECT_DIR)
+from data.reference.countries import COUNTRIES
+
+# Airflow pool capping concurrent ENTSO-E requests across all runs. Create once:
+#   airflow pools set entsoe_api 8 "ENTSO-E API calls"
+ENTSOE_POOL = "entsoe_api"
+
+# One mapped task group instance per (country, document type). The order must
+# stay stable: depends_on_past on mapped tasks compares the same map index
+# of the previous run.
+ZONES = [
+    {"country": country, "category": category}
+    for country in sorted(COUNTRIES)
+    for category in ["generation", "prices"]
+]
+
 # Default arguments for all tasks
 default_args = {
     "owner": "data_energy",
-    "depends_on_past": True,  # Ensures day 2 only runs if day 1 succeeded
+    "depends_on_past": False,  # Applied per zone below, not to the whole day
     "email_on_failure": False,
     "email_on_retry": False,
     "retries": 2,
     "retry_delay": timedelta(minutes=5),
 }
 
+
+def zone_flags(zone):
+    return f"--country {zone['country']} --category {zone['category']}"
+
+
+# ======================================================
+# PER-ZONE TASKS
+# ======================================================
+# depends_on_past=True here means: a zone only runs once the same zone
+# succeeded the day before. A failing zone no longer blocks the others.
+@task_group(group_id="zone")
+def zone_pipeline(zone):
+    # 1. EXTRACTION: one request per zone, throttled by the entsoe_api pool
+    @task.bash(task_id="download_xml", pool=ENTSOE_POOL, depends_on_past=True)
+    def download_xml(zone, ds=None):
+        return (
+            f"{PYTHON_BIN} {PROJECT_DIR}/ingestion/fetch_entsoe_data.py {ds} "
+            f"{zone_flags(zone)} --workers 1"
+        )
+
+    # 2. PARSING: writes parsed_{category}_{country}
+    @task.bash(task_id="parse_xml", depends_on_past=True)
+    def parse_xml(zone, ds=None):
+        return (
+            f"{PYTHON_BIN} {PROJECT_DIR}/processing/parse_generation_xml.py {ds} "
+            f"{zone_flags(zone)}"
+        )
+
+    # 3. ENRICHMENT: writes enriched_{category}_{country}
+    @task.bash(task_id="enrich_data", depends_on_past=True)
+    def enrich_data(zone, ds=None):
+        return (
+            f"{PYTHON_BIN} {PROJECT_DIR}/processing/enrich_generation_data.py {ds} "
+            f"{zone_flags(zone)}"
+        )
+
+    # 4. NORMALIZATION: writes hourly_{category}_{country}
+    @task.bash(task_id="normalize_data", depends_on_past=True)
+    def normalize_data(zone, ds=None):
+        return (
+            f"{PYTHON_BIN} {PROJECT_DIR}/processing/normalize_resolution.py {ds} "
+            f"{zone_flags(zone)}"
+        )
+
+    download_xml(zone) >> parse_xml(zone) >> enrich_data(zone) >> normalize_data(zone)
+
+
 # ======================================================
 # DAG DEFINITION
 # ======================================================
@@ -31,36 +99,25 @@ with DAG(
     schedule_interval="0 3 * * *",  # Runs at 03:00 AM daily
     start_date=datetime(2026, 2, 1),  # Historical start date
     catchup=True,  # Enables processing missing dates
-    max_active_runs=1,  # CRITICAL: Prevents hitting API rate limits
+    max_active_runs=3,  # API load is capped by the entsoe_api pool instead
     tags=["energy", "entsoe"],
 ) as dag:
-    # 1. EXTRACTION: Download XML files from ENTSO-E API
-    # The dynamic date is passed via {{ ds }}
-    fetch_data = BashOperator(
-        task_id="download_xml",
-        bash_command=f"{PYTHON_BIN} {PROJECT_DIR}/ingestion/fetch_entsoe_data.py {{{{ ds }}}}",
-    )
+    zones = zone_pipeline.expand(zone=ZONES)
 
-    # 2. PARSING: Convert raw XML files to structured CSV
-    parse_task = BashOperator(
-        task_id="parse_xml_to_csv",
-        bash_command=f"{PYTHON_BIN} {PROJECT_DIR}/processing/parse_generation_xml.py {{{{ ds }}}}",
-    )
-
-    # 3. ENRICHMENT: Map country codes, PSR types and calculate final metrics
-    enrich_task = BashOperator(
-        task_id="enrich_data",
-        bash_command=f"{PYTHON_BIN} {PROJECT_DIR}/processing/enrich_generation_data.py {{{{ ds }}}}",
-    )
-
-    # 4. LOADING: Upload the final enriched data to PostgreSQL
+    # 5. LOADING (fan-in): loads whatever zones finished, even if some failed.
+    # revise replaces the preliminary values loaded by entsoe_intraday_pipeline
     load_task = BashOperator(
         task_id="load_to_postgres",
-        bash_command=f"{PYTHON_BIN} {PROJECT_DIR}/processing/load_generation_to_postgres.py {{{{ ds }}}}",
+        bash_command=f"{PYTHON_BIN} {PROJECT_DIR}/processing/load_generation_to_postgres.py {{{{ ds }}}} --per-country --method revise",
+        trigger_rule="all_done",
     )
 
+    # Leaf that fails the run when any zone failed, since the load above
+    # succeeds on partial data
+    zones_check = EmptyOperator(task_id="all_zones_succeeded")
+
     # ======================================================
     # DATA PIPELINE FLOW
     # ======================================================
-    # download -> parse -> enrich -> load
-    fetch_data >> parse_task >> enrich_task >> load_task
+    # zone[download -> parse -> enrich -> normalize] x N -> load
+    zones >> [load_task, zones_check]
@@ -0,0 +1,58 @@
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime, timedelta
+import sys
+
+# ======================================================
+# CONFIGURATION
+# ======================================================
+# Absolute path to the project root directory on the Seagate drive
+PROJECT_DIR = "/Volumes/Seagate5T/CienciaDeDadosBACKUP/__MyProjectsDataAnalyse/eu-energy-data-pipeline"
+
+# Default arguments for all tasks
+default_args = {
+    "owner": "data_energy",
+    "depends_on_past": True,  # Ensures day 2 only runs if day 1 succeeded
+    "email_on_failure": False,
+    "email_on_retry": False,
+    "retries": 2,
+    "retry_delay": timedelta(minutes=5),
+}
+
+
+def run_daily_pipeline(ds, **_):
+    """
+    Runs fetch → parse → enrich → normalize → load in the task's own interpreter.
+    Imported here so the scheduler does not load pandas (or need the API key)
+    every time it parses this file.
+    """
+    if PROJECT_DIR not in sys.path:
+        sys.path.append(PROJECT_DIR)
+    from processing.run_pipeline import run_pipeline
+
+    # revise replaces the preliminary values loaded by entsoe_intraday_pipeline
+    return run_pipeline(ds, workers=8, method="revise")
+
+
+# ======================================================
+# DAG DEFINITION
+# ======================================================
+# Same schedule as entsoe_daily_pipeline, but the five stages share one
+# process and hand data over in memory; files in data/ are checkpoints only.
+# Enable one of the two DAGs, not both.
+with DAG(
+    "entsoe_daily_pipeline_inprocess",
+    default_args=default_args,
+    description="ENTSO-E Energy Data Pipeline (single process, in-memory hand-off)",
+    schedule_interval="0 3 * * *",  # Runs at 03:00 AM daily
+    start_date=datetime(2026, 2, 1),  # Historical start date
+    catchup=True,  # Enables processing missing dates
+    max_active_runs=1,  # CRITICAL: Prevents hitting API rate limits
+    is_paused_upon_creation=True,
+    tags=["energy", "entsoe"],
+) as dag:
+    # download -> parse -> enrich -> normalize -> load, all inside one PythonOperator
+    run_pipeline_task = PythonOperator(
+        task_id="run_pipeline",
+        python_callable=run_daily_pipeline,
+    )
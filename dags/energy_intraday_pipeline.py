@@ -0,0 +1,57 @@
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime, timedelta
+import sys
+
+# ======================================================
+# CONFIGURATION
+# ======================================================
+# Absolute path to the project root directory on the Seagate drive
+PROJECT_DIR = "/Volumes/Seagate5T/CienciaDeDadosBACKUP/__MyProjectsDataAnalyse/eu-energy-data-pipeline"
+
+# Default arguments for all tasks
+default_args = {
+    "owner": "data_energy",
+    "depends_on_past": False,  # Every poll starts from the stored watermarks
+    "email_on_failure": False,
+    "email_on_retry": False,
+    "retries": 1,
+    "retry_delay": timedelta(minutes=2),
+}
+
+
+def run_intraday_poll(**_):
+    """
+    Loads the generation actuals published since the last load.
+    Imported here so the scheduler does not load pandas (or need the API key)
+    every time it parses this file.
+    """
+    if PROJECT_DIR not in sys.path:
+        sys.path.append(PROJECT_DIR)
+    from processing.run_intraday import run_intraday
+
+    return run_intraday(workers=4)
+
+
+# ======================================================
+# DAG DEFINITION
+# ======================================================
+# Runs next to the daily DAG: the polls keep today's actuals minutes behind
+# ENTSO-E, and the 03:00 run still writes the canonical daily partitions.
+with DAG(
+    "entsoe_intraday_pipeline",
+    default_args=default_args,
+    description="ENTSO-E intraday generation actuals (delta polling)",
+    schedule_interval="*/15 * * * *",  # Every 15 minutes, one PT15M interval
+    start_date=datetime(2026, 2, 1),
+    catchup=False,  # Only the latest poll matters; it covers any gap itself
+    max_active_runs=1,  # CRITICAL: Polls must not overlap (API rate limits)
+    dagrun_timeout=timedelta(minutes=14),
+    is_paused_upon_creation=True,
+    tags=["energy", "entsoe", "intraday"],
+) as dag:
+    # watermarks -> delta fetch -> parse new points -> enrich -> normalize -> load
+    poll_task = PythonOperator(
+        task_id="poll_intraday",
+        python_callable=run_intraday_poll,
+    )
@@ -1,51 +1,10 @@
 """
-List of countries and their main ENTSO-E bidding zones.
-This file acts as a single source of truth for ingestion.
+Countries and their main ENTSO-E bidding zones, as {code: {"country_name",
+"bidding_zone"}}. Kept for existing imports; the data comes from
+countries.csv through the reference registry (data/reference/registry.py),
+so new zones are added to the CSV only.
 """
 
-COUNTRIES = {
-    "FR": {
-        "country_name": "France",
-        "bidding_zone": "10YFR-RTE------C",
-    },
-    "DE": {
-        "country_name": "Germany",
-        "bidding_zone": "10Y1001A1001A83F",
-    },
-    "ES": {
-        "country_name": "Spain",
-        "bidding_zone": "10YES-REE------0",
-    },
-    "IT": {
-        "country_name": "Italy",
-        "bidding_zone": "10YIT-GRTN-----B",
-    },
-    "PT": {
-        "country_name": "Portugal",
-        "bidding_zone": "10YPT-REN------W",
-    },
-    "NL": {
-        "country_name": "Netherlands",
-        "bidding_zone": "10YNL----------L",
-    },
-    "BE": {
-        "country_name": "Belgium",
-        "bidding_zone": "10YBE----------2",
-    },
-    "AT": {
-        "country_name": "Austria",
-        "bidding_zone": "10YAT-APG------L",
-    },
-    "CH": {
-        "country_name": "Switzerland",
-        "bidding_zone": "10YCH-SWISSGRIDZ",
-    },
-    "PL": {
-        "country_name": "Poland",
-        "bidding_zone": "10YPL-PSE------S",
-    },
-    "GR": {
-        "country_name": "Greece",
-        "bidding_zone": "10YGR-HTSO-----Y",
-    },
-}
+from data.reference.registry import get_registry
+
+COUNTRIES = get_registry().countries
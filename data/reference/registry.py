@@ -0,0 +1,207 @@
+"""
+Reference-data registry: countries/bidding zones and PSR types.
+
+countries.csv and psr_types.csv are the only sources; everything else
+(data/reference/countries.py, the fetcher, the DAGs, enrichment and the
+dimension tables) reads them through get_registry(). Adding a zone means
+adding one line to countries.csv.
+
+The parsed tables and their lookup indexes are kept for the life of the
+process and pickled to data/cache/reference_registry.pickle, keyed by the
+size and mtime of both CSVs, so a new process skips the CSV parsing and
+editing either file rebuilds the cache on the next call. The module only
+needs the standard library; NumPy/pandas are imported when a code table or
+lookup Series is first requested.
+
+    registry = get_registry()
+    registry.country_for_zone("10YFR-RTE------C")  # "FR"
+    registry.generation_type("B16")                # "Solar"
+"""
+
+import csv
+import os
+import pickle
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+REFERENCE_DIR = PROJECT_ROOT / "data" / "reference"
+COUNTRIES_CSV = REFERENCE_DIR / "countries.csv"
+PSR_TYPES_CSV = REFERENCE_DIR / "psr_types.csv"
+CACHE_PATH = PROJECT_ROOT / "data" / "cache" / "reference_registry.pickle"
+
+# Bump when the pickled layout changes
+CACHE_VERSION = 1
+
+# Table -> (source file, key column, attribute columns)
+TABLES = {
+    "countries": (COUNTRIES_CSV, "country", ("country_name", "bidding_zone")),
+    "psr_types": (PSR_TYPES_CSV, "psr_type", ("generation_type",)),
+}
+
+
+class CodeTable:
+    """
+    Array-backed table of one reference file: sorted key codes plus one
+    array per attribute, the source of the lookup Series (series()).
+    """
+
+    def __init__(self, rows: dict[str, dict[str, str]], columns):
+        import numpy as np
+
+        keys = sorted(rows)
+        self.codes = np.array(keys, dtype=str)
+        self.columns = {
+            col: np.array([rows[key][col] for key in keys], dtype=object) for col in columns
+        }
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class ReferenceRegistry:
+    """Lookups over the reference tables; build with get_registry()."""
+
+    def __init__(self, signature: tuple, tables: dict[str, dict[str, dict[str, str]]]):
+        self.signature = signature
+        self.tables = tables
+        self.countries = tables["countries"]
+        self.psr_types = tables["psr_types"]
+
+        # Reverse indexes (first country wins for a shared zone or name)
+        self.zone_index = {}
+        self.name_index = {}
+        for code, meta in self.countries.items():
+            if meta["bidding_zone"]:
+                self.zone_index.setdefault(meta["bidding_zone"], code)
+            if meta["country_name"]:
+                self.name_index.setdefault(meta["country_name"].casefold(), code)
+
+        self._code_tables = {}
+        self._series = {}
+
+    def __getstate__(self):
+        # Arrays and Series are rebuilt lazily, the pickle stays pandas-free
+        state = self.__dict__.copy()
+        state["_code_tables"] = {}
+        state["_series"] = {}
+        return state
+
+    # -----------------------------
+    # Scalar lookups
+    # -----------------------------
+    def country(self, code: str) -> dict | None:
+        """{"country_name", "bidding_zone"} of a country code."""
+        return self.countries.get(code)
+
+    def country_name(self, code: str, default=None):
+        meta = self.countries.get(code)
+        return meta["country_name"] if meta else default
+
+    def bidding_zone(self, code: str, default=None):
+        meta = self.countries.get(code)
+        return meta["bidding_zone"] if meta else default
+
+    def country_for_zone(self, bidding_zone: str, default=None):
+        return self.zone_index.get(bidding_zone, default)
+
+    def country_for_name(self, name: str, default=None):
+        return self.name_index.get(name.casefold(), default)
+
+    def generation_type(self, psr_type: str, default=None):
+        meta = self.psr_types.get(psr_type)
+        return meta["generation_type"] if meta else default
+
+    # -----------------------------
+    # Vectorized lookups
+    # -----------------------------
+    def code_table(self, table: str) -> CodeTable:
+        """CodeTable of "countries" or "psr_types", built once."""
+        if table not in self._code_tables:
+            self._code_tables[table] = CodeTable(self.tables[table], TABLES[table][2])
+        return self._code_tables[table]
+
+    def series(self, column: str):
+        """
+        Code -> attribute pandas Series (country_name, bidding_zone or
+        generation_type), built once. Callers must not modify it.
+        """
+        if column not in self._series:
+            import pandas as pd
+
+            table = next(name for name, spec in TABLES.items() if column in spec[2])
+            codes = self.code_table(table)
+            index = pd.Index(codes.codes.astype(object), name=TABLES[table][1])
+            self._series[column] = pd.Series(codes.columns[column], index=index, name=column)
+        return self._series[column]
+
+
+def source_signature() -> tuple:
+    """(version, (path, mtime, size) per reference file): the cache key."""
+    files = []
+    for path, _, _ in TABLES.values():
+        stat = path.stat()
+        files.append((path.name, stat.st_mtime_ns, stat.st_size))
+    return CACHE_VERSION, tuple(files)
+
+
+def read_table(path: Path, key: str, columns) -> dict[str, dict[str, str]]:
+    """
+    {key: {column: value}} from a reference CSV. The first row of a key
+    wins; blank cells are None.
+    """
+    rows = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            code = (row.get(key) or "").strip()
+            if code and code not in rows:
+                rows[code] = {col: (row.get(col) or "").strip() or None for col in columns}
+    return rows
+
+
+def _read_cache(signature: tuple) -> ReferenceRegistry | None:
+    try:
+        with open(CACHE_PATH, "rb") as f:
+            registry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(registry, ReferenceRegistry) or registry.signature != signature:
+        return None
+    return registry
+
+
+def _write_cache(registry: ReferenceRegistry):
+    tmp_path = CACHE_PATH.with_name(f".{CACHE_PATH.name}.{os.getpid()}.tmp")
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(registry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)  # Read-only checkouts just skip the cache
+
+
+_registry: ReferenceRegistry | None = None
+
+
+def get_registry(use_cache: bool = True) -> ReferenceRegistry:
+    """
+    The process-wide registry. Each call only stats the two CSVs; the tables
+    are re-read (and the pickle rewritten) when one of them has changed.
+    """
+    global _registry
+    signature = source_signature()
+    if _registry is not None and _registry.signature == signature:
+        return _registry
+
+    registry = _read_cache(signature) if use_cache else None
+    if registry is None:
+        tables = {
+            name: read_table(path, key, columns)
+            for name, (path, key, columns) in TABLES.items()
+        }
+        registry = ReferenceRegistry(signature, tables)
+        if use_cache:
+            _write_cache(registry)
+
+    _registry = registry
+    return registry
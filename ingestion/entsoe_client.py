@@ -0,0 +1,99 @@
+"""
+Shared HTTP client for the ENTSO-E Transparency Platform API.
+Provides a pooled keep-alive session, a requests-per-minute throttle and
+retry handling for rate-limit (429) and server-side (5xx) errors.
+"""
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ENTSO-E allows 400 requests per minute per security token
+DEFAULT_REQUESTS_PER_MINUTE = 400
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """
+    Thread-safe throttle that spaces calls evenly so the number of requests
+    started in any minute never exceeds the configured budget.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def build_session(pool_size: int) -> requests.Session:
+    """Creates a session whose connection pool is large enough for every worker."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def backoff_delay(attempt: int, base: float, response=None) -> float:
+    """
+    Seconds to wait before the next attempt. Honours a numeric Retry-After
+    header, otherwise uses exponential backoff with full jitter.
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    return random.uniform(0, base * (2**attempt))
+
+
+def get_with_retry(
+    session: requests.Session,
+    url: str,
+    params: dict,
+    limiter: RateLimiter | None = None,
+    headers: dict | None = None,
+    max_retries: int = 4,
+    backoff_base: float = 1.0,
+    timeout: int = 30,
+):
+    """
+    Performs a GET request, retrying 429/5xx responses and connection errors.
+    Returns (response, latency_seconds, attempts). The response is None when
+    every attempt failed at the connection level.
+    """
+    response = None
+    started = time.perf_counter()
+
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+
+        try:
+            response = session.get(
+                url, params=params, headers=headers, timeout=timeout
+            )
+        except requests.RequestException as e:
+            response = None
+            if attempt == max_retries:
+                print(f"    ❌ Connection failed after {attempt + 1} attempts: {e}")
+                break
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                break
+
+        time.sleep(backoff_delay(attempt, backoff_base, response))
+
+    return response, time.perf_counter() - started, attempt + 1
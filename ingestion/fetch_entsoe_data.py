@@ -2,13 +2,22 @@
 ENTSO-E API Data Extraction Script.
 This version supports dynamic date execution via Airflow and uses a
 reference file for country mapping to ensure scalability.
+Requests can run concurrently on a pooled keep-alive session that respects
+the ENTSO-E requests-per-minute limit. A range mode (--start/--end) requests
+the largest window allowed per document type and splits the responses into
+daily partitions for backfills. Responses are cached on disk, so reruns only
+hit the network for documents that are missing or expired. The intraday
+mode (driven by processing/run_intraday.py) requests, per zone, only the
+hours after the watermark of what is already loaded.
 """
 
 import os
 import sys
-import requests
+import argparse
+import statistics
 from pathlib import Path
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 
 # ======================================================
@@ -18,13 +27,26 @@ from dotenv import load_dotenv
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-# Attempt to import the country mapping from your reference folder
+# Country mapping from the reference registry (data/reference/countries.csv)
 try:
-    from data.reference.countries import COUNTRIES
-except ImportError:
-    print("❌ CRITICAL: data/reference/countries.py not found!")
+    from data.reference.registry import get_registry
+
+    COUNTRIES = get_registry().countries
+except (ImportError, FileNotFoundError):
+    print("❌ CRITICAL: data/reference/countries.csv not found!")
     sys.exit(1)
 
+from ingestion.entsoe_client import (
+    DEFAULT_REQUESTS_PER_MINUTE,
+    RateLimiter,
+    build_session,
+    get_with_retry,
+)
+from ingestion.raw_archive import RAW_FORMAT, RAW_FORMATS, write_raw
+from ingestion.response_cache import ResponseCache, is_acknowledgement
+from ingestion.xml_partitioning import split_document_by_day
+from processing.instrumentation import Measurement, StageRun
+
 # ======================================================
 # 2. CONFIGURATION & ENVIRONMENT
 # ======================================================
@@ -32,56 +54,202 @@ except ImportError:
 load_dotenv(PROJECT_ROOT / ".env")
 API_KEY = os.getenv("ENTSOE_API_KEY")
 
-if not API_KEY:
-    raise ValueError("CRITICAL: ENTSOE_API_KEY not found in .env file.")
+# Overridable so benchmarks can point the fetcher at a local stand-in
+BASE_URL = os.getenv("ENTSOE_BASE_URL", "https://web-api.tp.entsoe.eu/api")
 
-BASE_URL = "https://web-api.tp.entsoe.eu/api"
+# Concurrency settings (overridable from the command line)
+MAX_WORKERS = int(os.getenv("ENTSOE_MAX_WORKERS", 1))
+REQUESTS_PER_MINUTE = float(
+    os.getenv("ENTSOE_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE)
+)
+MAX_RETRIES = int(os.getenv("ENTSOE_MAX_RETRIES", 4))
 
-# ======================================================
-# 3. DYNAMIC DATE HANDLING (AIRFLOW SUPPORT)
-# ======================================================
-# If an argument is passed (usually by Airflow), use it as the target date.
-# Otherwise, default to yesterday's date for manual runs.
-if len(sys.argv) > 1:
-    # Expected format from Airflow: YYYY-MM-DD
-    target_date = datetime.strptime(sys.argv[1], "%Y-%m-%d")
-else:
-    target_date = datetime.now() - timedelta(days=1)
-
-# TIME WINDOW FIX:
-# ENTSO-E API requires precise windows. We request from 00:00 of the target day
-# until 00:00 of the following day to ensure a full 24-hour block is captured.
-# This prevents Error 400 caused by incomplete time intervals.
-PERIOD_START = target_date.strftime("%Y%m%d0000")
-PERIOD_END = (target_date + timedelta(days=1)).strftime("%Y%m%d0000")
-
-# Partitioning variables for folder structure
-YEAR = target_date.strftime("%Y")
-MONTH = target_date.strftime("%m")
-DAY = target_date.strftime("%d")
+RAW_BASE_DIR = PROJECT_ROOT / "data" / "raw"
+CACHE_DIR = Path(os.getenv("ENTSOE_CACHE_DIR", PROJECT_ROOT / "data" / "cache" / "entsoe"))
+
+# Intraday polls never reach further back than this
+INTRADAY_LOOKBACK = timedelta(hours=int(os.getenv("ENTSOE_INTRADAY_LOOKBACK_HOURS", 24)))
+# A series whose watermark is older than this (it stopped publishing or
+# lags) no longer sets its zone's window; the daily run covers its gap
+INTRADAY_STALE_AFTER = timedelta(hours=int(os.getenv("ENTSOE_INTRADAY_STALE_HOURS", 3)))
 
 # Define categories: A75 (Generation) and A44 (Day-Ahead Prices)
+# max_window_days: largest time interval ENTSO-E accepts in one request
+# cache_ttl_seconds: how long a cached response stays fresh (None = immutable).
+# Day-ahead prices never change once published; generation actuals get revised.
+# Windows that ended less than SETTLED_AFTER ago may still be incomplete
+# (prices not published yet, late actuals), so "immutable" responses for
+# them are only cached for PENDING_CACHE_TTL_SECONDS.
+# intraday: polled during the day. Actuals are published shortly after
+# each interval; day-ahead prices once a day, so the daily run covers them.
 DATA_CONFIG = [
-    {"doc_type": "A75", "folder": "generation", "process_type": "A16"},
-    {"doc_type": "A44", "folder": "prices", "process_type": None},
+    {
+        "doc_type": "A75",
+        "folder": "generation",
+        "process_type": "A16",
+        "max_window_days": 365,
+        "cache_ttl_seconds": 6 * 3600,
+        "intraday": True,
+    },
+    {
+        "doc_type": "A44",
+        "folder": "prices",
+        "process_type": None,
+        "max_window_days": 365,
+        "cache_ttl_seconds": None,
+        "intraday": False,
+    },
 ]
 
+
+SETTLED_AFTER = timedelta(days=2)
+PENDING_CACHE_TTL_SECONDS = 3600
+
+
+def require_api_key():
+    """
+    Fails fast when no API key is configured. Checked when a run starts
+    rather than at import, so other modules (and Airflow's DAG parser) can
+    import this one without credentials.
+    """
+    if not API_KEY:
+        raise ValueError("CRITICAL: ENTSOE_API_KEY not found in .env file.")
+
+
+# ======================================================
+# 3. DYNAMIC DATE HANDLING (AIRFLOW SUPPORT)
+# ======================================================
+
+
+def build_time_window(target_date: datetime) -> tuple[str, str]:
+    """
+    TIME WINDOW FIX:
+    ENTSO-E API requires precise windows. We request from 00:00 of the target day
+    until 00:00 of the following day to ensure a full 24-hour block is captured.
+    This prevents Error 400 caused by incomplete time intervals.
+    """
+    period_start = target_date.strftime("%Y%m%d0000")
+    period_end = (target_date + timedelta(days=1)).strftime("%Y%m%d0000")
+    return period_start, period_end
+
+
+def build_range_windows(
+    start_date: datetime, end_date: datetime, max_window_days: int
+) -> list[tuple[str, str]]:
+    """
+    Splits the inclusive day range [start_date, end_date] into consecutive
+    request windows no longer than max_window_days.
+    """
+    windows = []
+    window_start = start_date
+    range_end = end_date + timedelta(days=1)
+    while window_start < range_end:
+        window_end = min(window_start + timedelta(days=max_window_days), range_end)
+        windows.append(
+            (window_start.strftime("%Y%m%d0000"), window_end.strftime("%Y%m%d0000"))
+        )
+        window_start = window_end
+    return windows
+
+
+def floor_hour(moment: datetime) -> datetime:
+    """Start of the UTC hour holding moment."""
+    return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def intraday_windows(
+    countries,
+    watermarks: dict,
+    now: datetime,
+    lookback: timedelta = INTRADAY_LOOKBACK,
+    stale_after: timedelta = INTRADAY_STALE_AFTER,
+):
+    """
+    Delta windows for one intraday poll of a category.
+    Every active series (country, PSR type) resumes at the start of the hour
+    holding its watermark (the latest interval_start loaded), so a partly
+    published hour is fetched whole and resampled again. A zone's request
+    starts at its earliest active series and ends at the next full hour.
+
+    Series whose watermark is older than now - stale_after do not hold the
+    window back: they are still in the zone's response and keep the Points
+    from the window start on, so a resumed series catches up, and the daily
+    run fills its gap. A zone without active series resumes at its most
+    recent one (at 00:00 UTC today without any watermark); no window starts
+    before now - lookback.
+    Returns ({country_code: (period_start, period_end)}, {(country_code,
+    psr_type): first interval to keep} for the active series).
+    """
+    now = now.astimezone(timezone.utc)
+    earliest = floor_hour(now - lookback)
+    default = max(now.replace(hour=0, minute=0, second=0, microsecond=0), earliest)
+    period_end = floor_hour(now) + timedelta(hours=1)
+
+    starts = {
+        (country_code, psr_type): floor_hour(latest)
+        for (country_code, psr_type), latest in watermarks.items()
+        if country_code in countries and latest >= now - stale_after
+    }
+    windows = {}
+    for country_code in countries:
+        zone_starts = [
+            start for (code, _), start in starts.items() if code == country_code
+        ]
+        if not zone_starts:
+            zone_latest = [
+                latest for (code, _), latest in watermarks.items() if code == country_code
+            ]
+            if zone_latest:
+                zone_starts = [max(floor_hour(max(zone_latest)), earliest)]
+        period_start = min(zone_starts, default=default)
+        windows[country_code] = (
+            period_start.strftime("%Y%m%d%H%M"),
+            period_end.strftime("%Y%m%d%H%M"),
+        )
+    return windows, starts
+
+
 # ======================================================
 # 4. CORE FUNCTIONS
 # ======================================================
 
 
-def fetch_xml_from_api(bidding_zone, doc_type, process_type):
+def cache_ttl_for(cache_ttl, period_end):
+    """
+    TTL for a cached response: an immutable (None) document is only
+    cached as such once its window has ended SETTLED_AFTER ago.
+    """
+    if cache_ttl is not None:
+        return cache_ttl
+    window_end = datetime.strptime(period_end, "%Y%m%d%H%M").replace(tzinfo=timezone.utc)
+    if window_end > datetime.now(timezone.utc) - SETTLED_AFTER:
+        return PENDING_CACHE_TTL_SECONDS
+    return None
+
+
+def fetch_xml_from_api(
+    bidding_zone,
+    doc_type,
+    process_type,
+    period_start,
+    period_end,
+    session=None,
+    limiter=None,
+    cache=None,
+    cache_ttl=None,
+):
     """
     Handles the HTTP GET request to the ENTSO-E API.
     Includes specific logic for Prices (A44) which requires 'out_Domain'.
+    Fresh cached responses are served from disk without a request.
+    Returns (xml_text or None, latency_seconds, attempts); attempts is 0 on a cache hit.
     """
     params = {
         "securityToken": API_KEY,
         "documentType": doc_type,
         "in_Domain": bidding_zone,
-        "periodStart": PERIOD_START,
-        "periodEnd": PERIOD_END,
+        "periodStart": period_start,
+        "periodEnd": period_end,
     }
 
     # Generation documents (A75) require a processType
@@ -92,21 +260,97 @@ def fetch_xml_from_api(bidding_zone, doc_type, process_type):
     if doc_type == "A44":
         params["out_Domain"] = bidding_zone
 
-    try:
-        response = requests.get(BASE_URL, params=params, timeout=30)
+    entry = cache.lookup(params) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry, cache_ttl_for(cache_ttl, period_end)):
+        cache.record("hit")
+        return cache.read_body(entry), 0.0, 0
+
+    if session is None:
+        session = build_session(1)
+
+    response, latency, attempts = get_with_retry(
+        session,
+        BASE_URL,
+        params,
+        limiter=limiter,
+        headers=ResponseCache.conditional_headers(entry),
+        max_retries=MAX_RETRIES,
+    )
+
+    if response is None:
+        return None, latency, attempts
+
+    if response.status_code == 304 and entry is not None:
+        cache.record("revalidated")
+        cache.refresh(entry)
+        return cache.read_body(entry), latency, attempts
+
+    if response.status_code == 200:
+        if cache is not None:
+            cache.record("miss")
+            # "No matching data" acknowledgements (also sent with 200) are
+            # not cached: the data may be published by the next run
+            if not is_acknowledgement(response.text):
+                cache.store(params, response.text, response.headers)
+        return response.text, latency, attempts
+
+    # Print error details to help debug issues like Timezone or API constraints
+    print(f"    ⚠️ API Error {response.status_code} for zone {bidding_zone}")
+    if response.status_code == 400:
+        print(f"    Debug Message: {response.text[:150]}")
+    return None, latency, attempts
+
+
+def save_xml(folder_name, country_code, day, xml_content, raw_format=None):
+    """
+    Writes one document to data/raw/{folder}/{YYYY}/{MM}/{DD}, as plain XML
+    or into the deduplicated zstd archive (see ingestion/raw_archive.py).
+    """
+    output_dir = RAW_BASE_DIR / folder_name / day.strftime("%Y/%m/%d")
+    return write_raw(
+        RAW_BASE_DIR, output_dir, f"{folder_name}_{country_code}", xml_content, raw_format
+    )
+
+
+def save_intraday_xml(folder_name, country_code, polled_at, xml_content, raw_format=None):
+    """
+    Archives one intraday response under
+    data/raw/intraday/{folder}/{YYYY}/{MM}/{DD}/{HHMM}, one directory per poll,
+    next to (not over) the daily partitions.
+    """
+    output_dir = RAW_BASE_DIR / "intraday" / folder_name / polled_at.strftime("%Y/%m/%d/%H%M")
+    return write_raw(
+        RAW_BASE_DIR, output_dir, f"{folder_name}_{country_code}", xml_content, raw_format
+    )
+
+
+def describe_fetch(latency, attempts):
+    """Short latency note for the per-country status lines."""
+    if attempts == 0:
+        return "cache hit"
+    return f"{latency:.2f}s, {attempts} attempt(s)"
+
+
+def fetch_measurement(window, folder_name, country_code, latency, attempts):
+    """Measurement for one request; the HTTP wait was timed by the worker thread."""
+    unit = Measurement(
+        "download", date=str(window), category=folder_name, country=country_code
+    )
+    unit.phases["http"] = latency
+    unit.extra.update(attempts=attempts, cache_hit=attempts == 0)
+    return unit
 
-        if response.status_code == 200:
-            return response.text
-        else:
-            # Print error details to help debug issues like Timezone or API constraints
-            print(f"    ⚠️ API Error {response.status_code} for zone {bidding_zone}")
-            if response.status_code == 400:
-                print(f"    Debug Message: {response.text[:150]}")
-            return None
 
-    except Exception as e:
-        print(f"    ❌ Connection failed: {e}")
-        return None
+def print_latency_summary(folder_name, latencies):
+    """Prints per-category request latency statistics (network requests only)."""
+    if not latencies:
+        return
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    print(
+        f"⏱️ Latency for {folder_name}: "
+        f"p50={statistics.median(ordered):.2f}s p95={p95:.2f}s max={ordered[-1]:.2f}s"
+    )
 
 
 # ======================================================
@@ -114,58 +358,404 @@ def fetch_xml_from_api(bidding_zone, doc_type, process_type):
 # ======================================================
 
 
-def main():
-    print("--- ENTSO-E INGESTION PIPELINE ---")
-    print(f"Target Date: {YEAR}-{MONTH}-{DAY}")
-    print(f"Time Window: {PERIOD_START} to {PERIOD_END}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Download ENTSO-E XML documents.")
+    # Expected format from Airflow: YYYY-MM-DD
+    parser.add_argument("date", nargs="?", help="Target date (YYYY-MM-DD)")
+    parser.add_argument("--start", help="Range mode: first day (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Range mode: last day, inclusive (YYYY-MM-DD)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help="Number of concurrent requests (1 = sequential)",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=REQUESTS_PER_MINUTE,
+        help="Requests-per-minute budget shared by all workers",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the local response cache and always call the API",
+    )
+    parser.add_argument(
+        "--raw-format",
+        choices=RAW_FORMATS,
+        default=RAW_FORMAT,
+        help="xml: plain files; zst: deduplicated zstd archive (.xml.zst)",
+    )
+    parser.add_argument("--country", help="Only fetch this country code (e.g. FR)")
+    parser.add_argument(
+        "--category",
+        choices=[config["folder"] for config in DATA_CONFIG],
+        help="Only fetch this category",
+    )
+    args = parser.parse_args()
+
+    if bool(args.start) != bool(args.end):
+        parser.error("--start and --end must be used together")
+    if args.start and args.date:
+        parser.error("use either a single date or --start/--end, not both")
+    return args
+
+
+def select_targets(country=None, category=None):
+    """Countries and DATA_CONFIG entries to fetch, optionally narrowed to one of each."""
+    countries = COUNTRIES
+    if country:
+        if country not in COUNTRIES:
+            raise ValueError(f"Unknown country code: {country}")
+        countries = {country: COUNTRIES[country]}
+
+    configs = DATA_CONFIG
+    if category:
+        configs = [config for config in DATA_CONFIG if config["folder"] == category]
+    return countries, configs
+
+
+def fetch_daily(
+    target_date,
+    executor,
+    session,
+    limiter,
+    cache,
+    collected=None,
+    countries=COUNTRIES,
+    configs=DATA_CONFIG,
+    metrics=None,
+    raw_format=None,
+):
+    """
+    Downloads one 24 h window per country and category. Returns overall success.
+    If a dict is passed as collected, every saved document is also kept in
+    it as collected[folder][country_code] = xml_text. With a StageRun as
+    metrics, every country's download is recorded (HTTP wait vs file write).
+    raw_format picks plain .xml or .xml.zst files (default: RAW_FORMAT).
+    """
+    period_start, period_end = build_time_window(target_date)
+
+    print(f"Target Date: {target_date:%Y-%m-%d}")
+    print(f"Time Window: {period_start} to {period_end}")
 
     # Track overall success to notify Airflow if a critical failure occurs
     overall_success = True
 
-    for config in DATA_CONFIG:
+    for config in configs:
         doc_type = config["doc_type"]
         folder_name = config["folder"]
         process_type = config["process_type"]
 
-        # Create partitioned directory: data/raw/{folder}/{YYYY}/{MM}/{DD}
-        output_dir = PROJECT_ROOT / "data" / "raw" / folder_name / YEAR / MONTH / DAY
-        output_dir.mkdir(parents=True, exist_ok=True)
-
         print(f"\n📂 CATEGORY: {folder_name.upper()}")
 
-        success_count = 0
-        # Iterate through all countries defined in the reference file
-        for country_code, meta in COUNTRIES.items():
-            bidding_zone = meta["bidding_zone"]
-            country_name = meta["country_name"]
+        # Submit one request per country defined in the reference file
+        futures = {
+            executor.submit(
+                fetch_xml_from_api,
+                meta["bidding_zone"],
+                doc_type,
+                process_type,
+                period_start,
+                period_end,
+                session,
+                limiter,
+                cache,
+                config["cache_ttl_seconds"],
+            ): country_code
+            for country_code, meta in countries.items()
+        }
 
-            xml_content = fetch_xml_from_api(bidding_zone, doc_type, process_type)
+        success_count = 0
+        latencies = []
+        for future in as_completed(futures):
+            country_code = futures[future]
+            country_name = COUNTRIES[country_code]["country_name"]
+            xml_content, latency, attempts = future.result()
+            if attempts:
+                latencies.append(latency)
+            unit = fetch_measurement(
+                f"{target_date:%Y/%m/%d}", folder_name, country_code, latency, attempts
+            )
 
             if xml_content:
-                file_name = f"{folder_name}_{country_code}.xml"
-                file_path = output_dir / file_name
-
-                # Save raw XML data with UTF-8 encoding
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(xml_content)
-
-                print(f"    ✅ {country_name} ({country_code}) - Success")
+                # Partitioned directory: data/raw/{folder}/{YYYY}/{MM}/{DD}
+                with unit.phase("write"):
+                    file_path = save_xml(
+                        folder_name, country_code, target_date, xml_content, raw_format
+                    )
+                unit.bytes = file_path.stat().st_size
+                if collected is not None:
+                    collected.setdefault(folder_name, {})[country_code] = xml_content
+                print(
+                    f"    ✅ {country_name} ({country_code}) - Success "
+                    f"({describe_fetch(latency, attempts)})"
+                )
                 success_count += 1
             else:
-                print(f"    ❌ {country_name} ({country_code}) - Failed")
+                unit.status = "failed"
+                print(
+                    f"    ❌ {country_name} ({country_code}) - Failed "
+                    f"({describe_fetch(latency, attempts)})"
+                )
+            if metrics is not None:
+                metrics.add(unit, wall_seconds=sum(unit.phases.values()))
 
         print(
-            f"📊 Summary for {folder_name}: {success_count}/{len(COUNTRIES)} countries saved."
+            f"📊 Summary for {folder_name}: {success_count}/{len(countries)} countries saved."
         )
+        print_latency_summary(folder_name, latencies)
 
         # If an entire category fails to download any data, mark the pipeline as failed
         if success_count == 0:
             overall_success = False
 
-    # Airflow integration: exit with code 1 to trigger a 'failed' state in the UI
-    if not overall_success:
-        print("\n❌ FATAL: At least one category failed completely.")
-        sys.exit(1)
+    return overall_success
+
+
+def fetch_range(
+    start_date,
+    end_date,
+    executor,
+    session,
+    limiter,
+    cache,
+    countries=COUNTRIES,
+    configs=DATA_CONFIG,
+    metrics=None,
+    raw_format=None,
+):
+    """
+    Backfill mode: requests the largest window allowed per document type and
+    splits every response into the daily raw partitions. Returns overall success.
+    """
+    first_day, last_day = start_date.date(), end_date.date()
+    print(f"Date Range: {first_day} to {last_day}")
+
+    overall_success = True
+
+    for config in configs:
+        doc_type = config["doc_type"]
+        folder_name = config["folder"]
+        process_type = config["process_type"]
+        windows = build_range_windows(start_date, end_date, config["max_window_days"])
+
+        print(
+            f"\n📂 CATEGORY: {folder_name.upper()} "
+            f"({len(windows)} window(s) x {len(countries)} countries)"
+        )
+
+        futures = {
+            executor.submit(
+                fetch_xml_from_api,
+                meta["bidding_zone"],
+                doc_type,
+                process_type,
+                period_start,
+                period_end,
+                session,
+                limiter,
+                cache,
+                config["cache_ttl_seconds"],
+            ): (country_code, period_start, period_end)
+            for country_code, meta in countries.items()
+            for period_start, period_end in windows
+        }
+
+        success_count = 0
+        days_written = 0
+        latencies = []
+        for future in as_completed(futures):
+            country_code, period_start, period_end = futures[future]
+            country_name = COUNTRIES[country_code]["country_name"]
+            xml_content, latency, attempts = future.result()
+            if attempts:
+                latencies.append(latency)
+            unit = fetch_measurement(
+                f"{period_start}-{period_end}", folder_name, country_code, latency, attempts
+            )
+
+            if not xml_content:
+                unit.status = "failed"
+                if metrics is not None:
+                    metrics.add(unit, wall_seconds=latency)
+                print(
+                    f"    ❌ {country_name} ({country_code}) "
+                    f"{period_start}-{period_end} - Failed ({latency:.2f}s)"
+                )
+                continue
+
+            with unit.phase("split"):
+                daily_documents = split_document_by_day(xml_content)
+            written = 0
+            for day, day_xml in daily_documents.items():
+                # Responses may overlap the window edges; keep requested days only
+                if first_day <= day <= last_day:
+                    with unit.phase("write"):
+                        file_path = save_xml(
+                            folder_name, country_code, day, day_xml, raw_format
+                        )
+                    unit.bytes += file_path.stat().st_size
+                    written += 1
+            unit.extra["days"] = written
+            if metrics is not None:
+                metrics.add(unit, wall_seconds=sum(unit.phases.values()))
+
+            print(
+                f"    ✅ {country_name} ({country_code}) {period_start}-{period_end} "
+                f"- {written} day(s) ({describe_fetch(latency, attempts)})"
+            )
+            success_count += 1
+            days_written += written
+
+        print(
+            f"📊 Summary for {folder_name}: {success_count}/{len(futures)} requests succeeded, "
+            f"{days_written} daily files saved."
+        )
+        print_latency_summary(folder_name, latencies)
+
+        if success_count == 0:
+            overall_success = False
+
+    return overall_success
+
+
+def fetch_intraday(
+    windows,
+    config,
+    executor,
+    session,
+    limiter,
+    polled_at,
+    countries=COUNTRIES,
+    metrics=None,
+    raw_format=None,
+):
+    """
+    Intraday mode: requests windows[country_code] = (period_start, period_end)
+    for one category. Not cached, since every poll asks for a different short
+    window. Returns ({country_code: xml_text}, overall success); like the
+    daily mode, the poll only fails when no zone could be downloaded.
+    """
+    doc_type = config["doc_type"]
+    folder_name = config["folder"]
+    print(f"\n📂 CATEGORY: {folder_name.upper()} (intraday, {len(windows)} zone(s))")
+
+    futures = {
+        executor.submit(
+            fetch_xml_from_api,
+            countries[country_code]["bidding_zone"],
+            doc_type,
+            config["process_type"],
+            period_start,
+            period_end,
+            session,
+            limiter,
+        ): country_code
+        for country_code, (period_start, period_end) in windows.items()
+    }
+
+    documents = {}
+    latencies = []
+    for future in as_completed(futures):
+        country_code = futures[future]
+        period_start, period_end = windows[country_code]
+        xml_content, latency, attempts = future.result()
+        if attempts:
+            latencies.append(latency)
+        unit = fetch_measurement(
+            f"{period_start}-{period_end}", folder_name, country_code, latency, attempts
+        )
+
+        if xml_content:
+            with unit.phase("write"):
+                file_path = save_intraday_xml(
+                    folder_name, country_code, polled_at, xml_content, raw_format
+                )
+            unit.bytes = file_path.stat().st_size
+            documents[country_code] = xml_content
+            print(
+                f"    ✅ {country_code} {period_start}-{period_end} "
+                f"({len(xml_content) / 1e3:.1f} kB, {describe_fetch(latency, attempts)})"
+            )
+        else:
+            unit.status = "failed"
+            print(
+                f"    ❌ {country_code} {period_start}-{period_end} - Failed "
+                f"({describe_fetch(latency, attempts)})"
+            )
+        if metrics is not None:
+            metrics.add(unit, wall_seconds=sum(unit.phases.values()))
+
+    print(f"📊 Summary for {folder_name}: {len(documents)}/{len(windows)} zones polled.")
+    print_latency_summary(folder_name, latencies)
+    return documents, bool(documents) or not windows
+
+
+def main():
+    args = parse_args()
+    require_api_key()
+
+    print("--- ENTSO-E INGESTION PIPELINE ---")
+    print(f"Workers: {args.workers} | Rate limit: {args.rpm:g} requests/min")
+
+    # One keep-alive session and one throttle shared by every request
+    session = build_session(args.workers)
+    limiter = RateLimiter(args.rpm)
+    cache = None if args.no_cache else ResponseCache(CACHE_DIR)
+    countries, configs = select_targets(args.country, args.category)
+
+    # Per-country timings go to the metrics log; an exit(1) marks the run failed
+    with StageRun(
+        "fetch",
+        primary_step="download",
+        date=args.date,
+        category=args.category,
+        country=args.country,
+    ) as metrics:
+        with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as executor:
+            if args.start:
+                start_date = datetime.strptime(args.start, "%Y-%m-%d")
+                end_date = datetime.strptime(args.end, "%Y-%m-%d")
+                overall_success = fetch_range(
+                    start_date,
+                    end_date,
+                    executor,
+                    session,
+                    limiter,
+                    cache,
+                    countries=countries,
+                    configs=configs,
+                    metrics=metrics,
+                    raw_format=args.raw_format,
+                )
+            else:
+                # If a date is passed (usually by Airflow), use it as the target date.
+                # Otherwise, default to yesterday's date for manual runs.
+                if args.date:
+                    target_date = datetime.strptime(args.date, "%Y-%m-%d")
+                else:
+                    target_date = datetime.now() - timedelta(days=1)
+                overall_success = fetch_daily(
+                    target_date,
+                    executor,
+                    session,
+                    limiter,
+                    cache,
+                    countries=countries,
+                    configs=configs,
+                    metrics=metrics,
+                    raw_format=args.raw_format,
+                )
+
+        if cache is not None:
+            print(f"\n🗄️ Response cache: {cache.summary()}")
+
+        # Airflow integration: exit with code 1 to trigger a 'failed' state in the UI
+        if not overall_success:
+            print("\n❌ FATAL: At least one category failed completely.")
+            sys.exit(1)
 
     print("\n✨ INGESTION FINISHED SUCCESSFULLY")
 
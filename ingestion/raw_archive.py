@@ -0,0 +1,253 @@
+"""
+Raw (bronze) document storage for data/raw/{folder}/YYYY/MM/DD.
+
+Documents are written as plain XML ({folder}_{CC}.xml) or, with
+RAW_FORMAT=zst in .env (or fetch_entsoe_data.py --raw-format zst), as
+zstd-compressed archives ({folder}_{CC}.xml.zst). ENTSO-E XML repeats the
+same tags for every Point, so zstd shrinks it by well over 10x.
+
+Compressed documents are content-addressed: the SHA-256 of the XML picks an
+object in data/raw/_objects/{hash[:2]}/{hash}.xml.zst, which is written
+once, and the partition file is a hard link to it. Identical downloads
+(re-fetches of an unchanged day, repeated empty acknowledgements) take the
+disk space of one copy, and re-saving an unchanged document leaves the
+partition file untouched, so parse manifests still see it as unchanged.
+
+Readers go through open_raw(), which streams the decompression into the
+consumer (e.g. iterparse) without temporary files.
+
+Compress an existing plain-XML tree, or drop unreferenced objects:
+    python ingestion/raw_archive.py --compress
+    python ingestion/raw_archive.py --prune
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import zstandard
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(PROJECT_ROOT / ".env")
+
+RAW_BASE_DIR = PROJECT_ROOT / "data" / "raw"
+OBJECTS_DIR_NAME = "_objects"
+
+RAW_FORMATS = ("xml", "zst")
+RAW_FORMAT = os.getenv("RAW_FORMAT", "xml").lower()
+RAW_SUFFIXES = {"xml": ".xml", "zst": ".xml.zst"}
+
+# Higher levels only slow the writer down; XML compresses well at any level
+ZSTD_LEVEL = int(os.getenv("RAW_ZSTD_LEVEL", 10))
+
+
+def resolve_raw_format(fmt: str | None = None) -> str:
+    fmt = (fmt or RAW_FORMAT).lower()
+    if fmt not in RAW_FORMATS:
+        raise ValueError(f"Unsupported raw format: {fmt}")
+    return fmt
+
+
+# -----------------------------
+# Names
+# -----------------------------
+def raw_name(path) -> str:
+    """Document name without its suffixes: generation_FR for generation_FR.xml(.zst)."""
+    name = Path(path).name
+    for suffix in sorted(RAW_SUFFIXES.values(), key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return Path(path).stem
+
+
+def raw_country(path) -> str:
+    """Country code of a raw document, taken from its file name."""
+    return raw_name(path).rsplit("_", 1)[-1]
+
+
+def list_raw_documents(directory: Path, country: str | None = None) -> list[Path]:
+    """
+    Raw documents of a partition in either format, one per name (the newest
+    when an .xml and an .xml.zst of the same document both exist), sorted by name.
+    """
+    pattern = f"*_{country}" if country else "*"
+    documents = {}
+    for suffix in RAW_SUFFIXES.values():
+        for path in Path(directory).glob(pattern + suffix):
+            name = raw_name(path)
+            current = documents.get(name)
+            if current is None or path.stat().st_mtime_ns > current.stat().st_mtime_ns:
+                documents[name] = path
+    return [documents[name] for name in sorted(documents)]
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+@contextmanager
+def open_raw(path):
+    """Binary stream of a raw document's XML, decompressed on the fly for .zst files."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        if path.name.endswith(RAW_SUFFIXES["zst"]):
+            with zstandard.ZstdDecompressor().stream_reader(f) as stream:
+                yield stream
+        else:
+            yield f
+
+
+def read_raw_text(path) -> str:
+    with open_raw(path) as stream:
+        return stream.read().decode("utf-8")
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+def _tmp_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def object_path(root: Path, content_hash: str) -> Path:
+    return Path(root) / OBJECTS_DIR_NAME / content_hash[:2] / f"{content_hash}.xml.zst"
+
+
+def store_object(root: Path, data: bytes) -> Path:
+    """Compresses data into the content-addressed store unless it is already there."""
+    content_hash = hashlib.sha256(data).hexdigest()
+    path = object_path(root, content_hash)
+    if not path.exists():
+        compressed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        _atomic_write_bytes(path, compressed)
+    return path
+
+
+def _link_or_copy(source: Path, target: Path):
+    """Points target at source with a hard link (a copy where links are unsupported)."""
+    tmp_path = _tmp_path(target)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def write_raw(
+    root: Path, directory: Path, name: str, xml_content: str, fmt: str | None = None
+) -> Path:
+    """
+    Saves one document as {directory}/{name}.xml or .xml.zst and removes the
+    same document in the other format. root is the raw tree holding _objects.
+    """
+    fmt = resolve_raw_format(fmt)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    file_path = directory / f"{name}{RAW_SUFFIXES[fmt]}"
+
+    if fmt == "zst":
+        stored = store_object(root, xml_content.encode("utf-8"))
+        if not (file_path.exists() and os.path.samefile(file_path, stored)):
+            _link_or_copy(stored, file_path)
+    else:
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(xml_content)
+
+    for other in RAW_FORMATS:
+        if other != fmt:
+            (directory / f"{name}{RAW_SUFFIXES[other]}").unlink(missing_ok=True)
+    return file_path
+
+
+# -----------------------------
+# Maintenance
+# -----------------------------
+def compress_tree(root: Path) -> tuple[int, int, int]:
+    """
+    Moves every plain .xml document under root into the archive.
+    Returns (files, plain bytes, compressed bytes of the distinct objects).
+    """
+    files = before = 0
+    objects = {}
+    for path in sorted(Path(root).rglob("*" + RAW_SUFFIXES["xml"])):
+        data = path.read_bytes()
+        archived = write_raw(root, path.parent, raw_name(path), data.decode("utf-8"), "zst")
+        stat = archived.stat()
+        objects[(stat.st_dev, stat.st_ino)] = stat.st_size
+        files += 1
+        before += len(data)
+    return files, before, sum(objects.values())
+
+
+def prune_objects(root: Path) -> tuple[int, int]:
+    """Deletes objects no partition links to any more. Returns (objects, bytes) removed."""
+    removed = freed = 0
+    for path in (Path(root) / OBJECTS_DIR_NAME).rglob("*.xml.zst"):
+        stat = path.stat()
+        if stat.st_nlink == 1:
+            path.unlink()
+            removed += 1
+            freed += stat.st_size
+    return removed, freed
+
+
+def archive_usage(root: Path) -> tuple[int, int]:
+    """(partition files, distinct bytes on disk) of the compressed archive."""
+    files, inodes = 0, {}
+    for path in Path(root).rglob("*" + RAW_SUFFIXES["zst"]):
+        stat = path.stat()
+        if OBJECTS_DIR_NAME not in path.parts:
+            files += 1
+        inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+    return files, sum(inodes.values())
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Maintain the compressed raw XML archive."
+    )
+    parser.add_argument(
+        "--root", default=str(RAW_BASE_DIR), help="Raw tree (default: data/raw)"
+    )
+    parser.add_argument(
+        "--compress", action="store_true", help="Convert plain .xml documents to .xml.zst"
+    )
+    parser.add_argument(
+        "--prune", action="store_true", help="Delete objects no partition file links to"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    root = Path(args.root)
+
+    if args.compress:
+        files, before, after = compress_tree(root)
+        ratio = before / after if after else 0
+        print(
+            f"🗜️ Compressed {files} document(s): {before / 1e6:,.1f} MB → "
+            f"{after / 1e6:,.1f} MB ({ratio:.1f}x)"
+        )
+    if args.prune:
+        removed, freed = prune_objects(root)
+        print(f"🧹 Pruned {removed} unreferenced object(s), {freed / 1e6:,.1f} MB")
+
+    files, stored = archive_usage(root)
+    print(f"📦 Archive: {files} partition file(s), {stored / 1e6:,.1f} MB on disk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Local cache for ENTSO-E API responses.
+Entries are keyed by the request parameters (without the security token) and
+point to content-addressed bodies, so identical documents are stored once.
+Bodies are zstd-compressed objects (the raw archive's store_object, under
+{cache_dir}/_objects); plain .xml bodies written by older versions are
+still read.
+Each entry keeps the content hash, ETag/Last-Modified validators and the time
+it was fetched; freshness is decided by a TTL per document type.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from ingestion.raw_archive import object_path, read_raw_text, store_object
+
+# Parameters that must not influence the cache key
+EXCLUDED_KEY_PARAMS = {"securityToken"}
+
+
+def is_acknowledgement(body: str) -> bool:
+    """True for an Acknowledgement_MarketDocument (e.g. "No matching data found")."""
+    return "Acknowledgement_MarketDocument" in body[:1024]
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.index_dir = self.cache_dir / "index"
+        # Plain .xml bodies of caches written before compression
+        self.legacy_objects_dir = self.cache_dir / "objects"
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    # -----------------------------
+    # Keys & paths
+    # -----------------------------
+    @staticmethod
+    def key_for(params: dict) -> str:
+        relevant = {k: v for k, v in params.items() if k not in EXCLUDED_KEY_PARAMS}
+        payload = json.dumps(relevant, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _index_path(self, key: str) -> Path:
+        return self.index_dir / f"{key}.json"
+
+    def _object_path(self, content_hash: str) -> Path:
+        path = object_path(self.cache_dir, content_hash)
+        if path.exists():
+            return path
+        legacy_path = self.legacy_objects_dir / content_hash[:2] / f"{content_hash}.xml"
+        return legacy_path if legacy_path.exists() else path
+
+    # -----------------------------
+    # Lookup
+    # -----------------------------
+    def lookup(self, params: dict) -> dict | None:
+        """Returns the cache entry for these parameters, if its body is still on disk."""
+        index_path = self._index_path(self.key_for(params))
+        if not index_path.exists():
+            return None
+        try:
+            entry = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not self._object_path(entry["content_hash"]).exists():
+            return None
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: dict, ttl_seconds: float | None) -> bool:
+        """A TTL of None means the document never changes once published."""
+        if ttl_seconds is None:
+            return True
+        return time.time() - entry["fetched_at"] < ttl_seconds
+
+    @staticmethod
+    def conditional_headers(entry: dict | None) -> dict:
+        """Validators for a conditional GET on a stale entry."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read_body(self, entry: dict) -> str:
+        return read_raw_text(self._object_path(entry["content_hash"]))
+
+    # -----------------------------
+    # Updates
+    # -----------------------------
+    def store(self, params: dict, body: str, headers) -> dict:
+        """Saves a 200 response body (compressed) and its validators."""
+        data = body.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        store_object(self.cache_dir, data)
+
+        key = self.key_for(params)
+        entry = {
+            "key": key,
+            "doc_type": params.get("documentType"),
+            "content_hash": content_hash,
+            "size_bytes": len(data),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        _atomic_write(self._index_path(key), json.dumps(entry, indent=2))
+        return entry
+
+    def refresh(self, entry: dict):
+        """Marks an entry as fresh again after a 304 Not Modified."""
+        entry["fetched_at"] = time.time()
+        _atomic_write(self._index_path(entry["key"]), json.dumps(entry, indent=2))
+
+    # -----------------------------
+    # Statistics
+    # -----------------------------
+    def record(self, outcome: str):
+        """outcome is one of 'hit', 'revalidated' or 'miss'."""
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "revalidated":
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits} hits, {self.revalidated} revalidated (304), "
+            f"{self.misses} misses"
+        )
+
+
+def _atomic_write(path: Path, text: str):
+    """Writes through a temporary file so concurrent readers never see partial data."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,127 @@
+"""
+Splits multi-day ENTSO-E XML documents into daily documents.
+Each Point is assigned to the UTC day of its actual interval
+(period start + (position - 1) x resolution). Each day's piece of a Period
+starts at its first interval and numbers its Points from 1, so the parsed
+rows are identical to the ones a single-day request would produce.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from copy import deepcopy
+from datetime import date, datetime, timedelta, timezone
+
+ENTSOE_TIME_FORMAT = "%Y-%m-%dT%H:%MZ"
+
+_DURATION_RE = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?")
+
+
+def parse_resolution(text: str) -> timedelta:
+    """Converts an ISO-8601 duration such as PT15M, PT60M or P1D into a timedelta."""
+    match = _DURATION_RE.fullmatch(text.strip())
+    if not match or not any(match.groups()):
+        raise ValueError(f"Unsupported resolution: {text}")
+    days, hours, minutes = (int(g) if g else 0 for g in match.groups())
+    return timedelta(days=days, hours=hours, minutes=minutes)
+
+
+def parse_entsoe_time(text: str) -> datetime:
+    """Parses ENTSO-E timestamps (e.g. 2026-02-01T23:00Z) as UTC datetimes."""
+    return datetime.strptime(text.strip(), ENTSOE_TIME_FORMAT).replace(
+        tzinfo=timezone.utc
+    )
+
+
+def _qualify(root: ET.Element):
+    """Returns a helper that prefixes tag names with the document namespace."""
+    if root.tag.startswith("{"):
+        namespace = root.tag[1 : root.tag.index("}")]
+        ET.register_namespace("", namespace)
+        return lambda tag: f"{{{namespace}}}{tag}"
+    return lambda tag: tag
+
+
+def split_document_by_day(xml_text: str) -> dict[date, str]:
+    """
+    Splits a (possibly year-long) document into one XML string per UTC day.
+    Header elements are copied to every daily document.
+    """
+    root = ET.fromstring(xml_text)
+    q = _qualify(root)
+
+    header = [child for child in root if child.tag != q("TimeSeries")]
+    # day -> list of TimeSeries elements for that day
+    daily_series = defaultdict(list)
+
+    for timeseries in root.findall(q("TimeSeries")):
+        series_meta = [child for child in timeseries if child.tag != q("Period")]
+        # day -> list of Period elements for this TimeSeries
+        daily_periods = defaultdict(list)
+
+        for period in timeseries.findall(q("Period")):
+            start = parse_entsoe_time(
+                period.find(f"{q('timeInterval')}/{q('start')}").text
+            )
+            step = parse_resolution(period.find(q("resolution")).text)
+            period_meta = [child for child in period if child.tag != q("Point")]
+
+            points_by_day = defaultdict(list)
+            for point in period.findall(q("Point")):
+                position = int(point.find(q("position")).text)
+                interval_start = start + (position - 1) * step
+                points_by_day[interval_start.date()].append(point)
+
+            for day, points in points_by_day.items():
+                day_period = ET.Element(period.tag, period.attrib)
+                day_period.extend(deepcopy(period_meta))
+                day_period.extend(points)
+                _rebase_period(day_period, q, start, step)
+                daily_periods[day].append(day_period)
+
+        for day, periods in daily_periods.items():
+            day_series = ET.Element(timeseries.tag, timeseries.attrib)
+            day_series.extend(deepcopy(series_meta))
+            day_series.extend(periods)
+            daily_series[day].append(day_series)
+
+    documents = {}
+    for day, series in sorted(daily_series.items()):
+        day_root = ET.Element(root.tag, root.attrib)
+        day_root.extend(deepcopy(header))
+        _set_document_interval(day_root, q, day)
+        day_root.extend(series)
+        documents[day] = ET.tostring(day_root, encoding="unicode", xml_declaration=True)
+
+    return documents
+
+
+def _rebase_period(period: ET.Element, q, start: datetime, step: timedelta):
+    """
+    Moves a Period's timeInterval to its first and last Point and renumbers
+    the Points from 1, keeping their spacing (and any gaps).
+    """
+    position_elements = [point.find(q("position")) for point in period.findall(q("Point"))]
+    positions = [int(element.text) for element in position_elements]
+    offset = min(positions) - 1
+    for element, position in zip(position_elements, positions):
+        element.text = str(position - offset)
+
+    interval = period.find(q("timeInterval"))
+    interval.find(q("start")).text = (start + offset * step).strftime(ENTSOE_TIME_FORMAT)
+    interval.find(q("end")).text = (start + max(positions) * step).strftime(
+        ENTSOE_TIME_FORMAT
+    )
+
+
+def _set_document_interval(day_root: ET.Element, q, day: date):
+    """Narrows the document-level time interval to the given UTC day."""
+    day_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    for tag in ("period.timeInterval", "time_Period.timeInterval"):
+        interval = day_root.find(q(tag))
+        if interval is None:
+            continue
+        interval.find(q("start")).text = day_start.strftime(ENTSOE_TIME_FORMAT)
+        interval.find(q("end")).text = (day_start + timedelta(days=1)).strftime(
+            ENTSOE_TIME_FORMAT
+        )
@@ -0,0 +1,186 @@
+"""
+PostgreSQL access shared by the loader, the in-process pipeline and the
+rollup rebuild.
+
+* DB_CONFIG: connection settings from .env
+* connection(): a connection from the process-wide ThreadedConnectionPool
+  (DB_POOL_SIZE connections, or more when a caller asks for them first).
+  Callers commit; anything left uncommitted is rolled back when the
+  connection goes back to the pool.
+* migrate(): applies schema migrations once per database. Each migration
+  is recorded in schema_migrations with a checksum of its definition, so a
+  load only reads that table instead of re-issuing every CREATE ... IF NOT
+  EXISTS; a changed definition is applied again.
+* run_parallel(): runs independent jobs (e.g. one per category and day) on
+  separate pooled connections and collects their results and errors.
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.pool import ThreadedConnectionPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(PROJECT_ROOT / ".env")
+
+IN_DOCKER = os.path.exists("/.dockerenv")
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "db" if IN_DOCKER else "localhost"),
+    "port": int(os.getenv("DB_PORT", 5432)),
+    "dbname": os.getenv("DB_NAME"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+}
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 4))
+
+MIGRATIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        name VARCHAR(100) PRIMARY KEY,
+        checksum CHAR(64) NOT NULL,
+        applied_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+def database_label() -> str:
+    """Identifies the target database (load manifests, log lines)."""
+    return f"{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['dbname']}"
+
+
+# -----------------------------
+# Connection pool
+# -----------------------------
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(size: int | None = None) -> ThreadedConnectionPool:
+    """
+    The process-wide pool, created on first use with max(size, DB_POOL_SIZE)
+    connections. Connections are opened lazily, one per concurrent user.
+    """
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            maxconn = max(size or 0, DB_POOL_SIZE, 1)
+            _pool = ThreadedConnectionPool(0, maxconn, **DB_CONFIG)
+            _slots = threading.BoundedSemaphore(maxconn)
+        return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+        _pool = None
+
+
+@contextmanager
+def connection():
+    """
+    A pooled connection for the block. Waits for a free one when all are
+    in use; broken connections are discarded instead of returned.
+    """
+    pool = get_pool()
+    slots = _slots
+    slots.acquire()
+    try:
+        conn = pool.getconn()
+        try:
+            yield conn
+        finally:
+            broken = bool(conn.closed)
+            if not broken:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            pool.putconn(conn, close=broken)
+    finally:
+        slots.release()
+
+
+# -----------------------------
+# Migrations
+# -----------------------------
+def checksum(definition: str) -> str:
+    return hashlib.sha256(definition.encode("utf-8")).hexdigest()
+
+
+def migrate(conn, migrations: dict) -> list[str]:
+    """
+    Applies {name: (definition, apply)} migrations that schema_migrations
+    does not list with the checksum of their definition; apply(cur) runs the
+    DDL. Call at the start of a transaction: when something is applied, the
+    migrations are serialized across processes with an advisory lock and
+    committed. Returns the names applied.
+    """
+    wanted = {name: checksum(definition) for name, (definition, _) in migrations.items()}
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL;")
+        if cur.fetchone()[0]:
+            cur.execute("SELECT name, checksum FROM schema_migrations;")
+            recorded = dict(cur.fetchall())
+            if all(recorded.get(name) == value for name, value in wanted.items()):
+                return []
+
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext('schema_migrations'));")
+        cur.execute(MIGRATIONS_TABLE_SQL)
+        cur.execute("SELECT name, checksum FROM schema_migrations;")
+        recorded = dict(cur.fetchall())
+
+        applied = []
+        for name, (_, apply) in migrations.items():
+            if recorded.get(name) == wanted[name]:
+                continue
+            apply(cur)
+            cur.execute(
+                """
+                INSERT INTO schema_migrations (name, checksum) VALUES (%s, %s)
+                ON CONFLICT (name) DO UPDATE
+                SET checksum = EXCLUDED.checksum, applied_at = CURRENT_TIMESTAMP;
+                """,
+                (name, wanted[name]),
+            )
+            applied.append(name)
+
+    conn.commit()
+    if applied:
+        print(f"🧱 Applied schema migration(s): {', '.join(applied)}")
+    return applied
+
+
+# -----------------------------
+# Parallel jobs
+# -----------------------------
+def run_parallel(jobs: dict, workers: int) -> tuple[dict, dict]:
+    """
+    Runs {label: job(conn)} on up to workers threads, each job on its own
+    pooled connection. A failing job does not stop the others.
+    Returns ({label: result}, {label: exception}).
+    """
+    get_pool(workers)
+    results, errors = {}, {}
+
+    def run(job):
+        with connection() as conn:
+            return job(conn)
+
+    with ThreadPoolExecutor(max_workers=max(min(workers, len(jobs)), 1)) as executor:
+        futures = {executor.submit(run, job): label for label, job in jobs.items()}
+        for future in as_completed(futures):
+            label = futures[future]
+            try:
+                results[label] = future.result()
+            except Exception as e:
+                errors[label] = e
+    return results, errors
@@ -1,9 +1,13 @@
 """
 Final enrichment of parsed ENTSO-E data.
 Now accepts date as an argument for Airflow dynamic scheduling.
+Also resolves the real interval_start timestamp of every point.
+Reference attributes are looked up per distinct code against cached
+reference maps and written as categoricals, without DataFrame merges.
 """
 
 from pathlib import Path
+import argparse
 import pandas as pd
 import sys
 
@@ -11,101 +15,286 @@ import sys
 # Paths Configuration
 # -----------------------------
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from data.reference.registry import COUNTRIES_CSV, PSR_TYPES_CSV, get_registry
+from processing.instrumentation import Measurement, StageRun
+from processing.manifest import PartitionManifest
+from processing.resolve_timestamps import add_interval_start
+from processing.storage import (
+    PROCESSED_FORMAT,
+    SUPPORTED_FORMATS,
+    DatasetWriter,
+    dataset_name,
+    dataset_path,
+    iter_dataset,
+    locate_dataset,
+    read_dataset,
+    write_dataset,
+)
 
-# Reference data
-COUNTRIES_CSV = PROJECT_ROOT / "data" / "reference" / "countries.csv"
-PSR_TYPES_CSV = PROJECT_ROOT / "data" / "reference" / "psr_types.csv"
 BASE_PATH = PROJECT_ROOT / "data" / "processed"
 
+# Bump when the enriched output changes so existing partitions are redone
+STAGE_VERSION = 1
+
+
+# Output layout per category
+FINAL_COLUMNS = {
+    "prices": [
+        "country",
+        "country_name",
+        "type",
+        "bidding_zone",
+        "start_time",
+        "resolution",
+        "position",
+        "interval_start",
+        "price_eur",
+    ],
+    "generation": [
+        "country",
+        "country_name",
+        "type",
+        "bidding_zone",
+        "psr_type",
+        "generation_type",
+        "start_time",
+        "resolution",
+        "position",
+        "interval_start",
+        "quantity_mw",
+    ],
+}
+
+
+# -----------------------------
+# Reference Lookups
+# -----------------------------
+def reference_maps() -> dict[str, pd.Series]:
+    """
+    Code -> attribute lookups from the reference registry. Built once per
+    process and rebuilt only when one of the reference files changes;
+    callers must not modify the returned Series.
+    """
+    registry = get_registry()
+    return {
+        column: registry.series(column)
+        for column in ("country_name", "bidding_zone", "generation_type")
+    }
+
+
+def lookup_categorical(keys: pd.Series, reference: pd.Series, default=None):
+    """
+    Maps keys through a reference Series as a Categorical. Only the distinct
+    keys are looked up; each row costs one integer take. Missing keys (and
+    NaN) get default.
+    """
+    codes, uniques = pd.factorize(keys, use_na_sentinel=False)
+    values = reference.reindex(uniques)
+    if default is not None:
+        values = values.fillna(default)
+    value_codes, categories = pd.factorize(values)
+    return pd.Categorical.from_codes(value_codes[codes], categories=categories)
+
+
+def as_category(values: pd.Series, fill_value=None) -> pd.Series:
+    """Categorical copy of a column, optionally with NaN replaced by fill_value."""
+    values = values.astype("category")
+    if fill_value is not None and values.isna().any():
+        if fill_value not in values.cat.categories:
+            values = values.cat.add_categories([fill_value])
+        values = values.fillna(fill_value)
+    return values
+
 
 # -----------------------------
 # Enrichment Logic
 # -----------------------------
+def enrich_frame(df: pd.DataFrame, category: str) -> pd.DataFrame:
+    """
+    Enriches a parsed frame with reference data and interval_start.
+    Builds a new frame column by column (no merges, the input is left
+    untouched); text columns come out as categoricals.
+    """
+    maps = reference_maps()
+    resolved = add_interval_start(df.copy(deep=False))
+
+    country = resolved["country"]
+    columns = {
+        "country": as_category(country),
+        "country_name": lookup_categorical(country, maps["country_name"], "Unknown"),
+        "type": as_category(resolved["type"]),
+        "bidding_zone": lookup_categorical(country, maps["bidding_zone"]),
+        "start_time": resolved["start_time"],
+        "resolution": as_category(resolved["resolution"]),
+        "position": resolved["position"],
+        "interval_start": resolved["interval_start"],
+    }
+
+    if category == "prices":
+        columns["price_eur"] = resolved["value"]
+    else:  # generation
+        psr_type = as_category(resolved["psr_type"], fill_value="N/A")
+        columns["psr_type"] = psr_type
+        columns["generation_type"] = lookup_categorical(
+            psr_type, maps["generation_type"], "Unknown/Other"
+        )
+        columns["quantity_mw"] = resolved["value"]
+
+    enriched_df = pd.DataFrame(columns, index=resolved.index)
+    return enriched_df[FINAL_COLUMNS[category]].reset_index(drop=True)
+
+
 def enrich_dataset(
-    file_path: Path, countries_ref: pd.DataFrame, psr_ref: pd.DataFrame, category: str
+    file_path: Path,
+    category: str,
+    output_format: str | None = None,
+    country: str | None = None,
+    chunksize: int | None = None,
+    unit: Measurement | None = None,
 ):
+    """
+    Enriches one parsed dataset. Read, enrich and write times, rows and
+    bytes are added to unit (a metrics Measurement) when one is given.
+    """
     print(f"🔄 Processing {category}: {file_path.name}")
+    if unit is None:
+        unit = Measurement("enrich")
+    unit.bytes = file_path.stat().st_size
 
-    df = pd.read_csv(file_path)
+    if chunksize:
+        output_path = enrich_dataset_chunked(
+            file_path, category, output_format, country, chunksize, unit
+        )
+    else:
+        with unit.phase("read"):
+            df = read_dataset(file_path)
+        with unit.phase("enrich"):
+            enriched_df = enrich_frame(df, category)
+        with unit.phase("write"):
+            output_path = write_dataset(
+                enriched_df,
+                file_path.parent,
+                dataset_name("enriched", category, country),
+                output_format,
+            )
+        unit.rows = len(enriched_df)
 
-    # 1. Standardize Bidding Zone
-    if "bidding_zone" in df.columns:
-        df = df.drop(columns=["bidding_zone"])
+    if output_path is not None:
+        unit.extra["output_bytes"] = output_path.stat().st_size
+        print(f"✅ Saved enriched {category} to: {output_path.absolute()}")
+    return unit.rows
 
-    df["country"] = df["country"].astype(str)
-    countries_ref["country"] = countries_ref["country"].astype(str)
-    enriched_df = df.merge(countries_ref, on="country", how="left")
-    enriched_df["country_name"] = enriched_df["country_name"].fillna("Unknown")
 
-    # 2. CATEGORY SPECIFIC LOGIC
-    if category == "prices":
-        enriched_df = enriched_df.rename(columns={"value": "price_eur"})
-        final_cols = [
-            "country",
-            "country_name",
-            "type",
-            "bidding_zone",
-            "start_time",
-            "resolution",
-            "position",
-            "price_eur",
-        ]
-    else:  # generation
-        enriched_df["psr_type"] = enriched_df["psr_type"].fillna("N/A").astype(str)
-        psr_ref["psr_type"] = psr_ref["psr_type"].astype(str)
-        enriched_df = enriched_df.merge(psr_ref, on="psr_type", how="left")
-        enriched_df["generation_type"] = enriched_df["generation_type"].fillna(
-            "Unknown/Other"
-        )
-        enriched_df = enriched_df.rename(columns={"value": "quantity_mw"})
-        final_cols = [
-            "country",
-            "country_name",
-            "type",
-            "bidding_zone",
-            "psr_type",
-            "generation_type",
-            "start_time",
-            "resolution",
-            "position",
-            "quantity_mw",
-        ]
-
-    # 3. Final selection and save
-    enriched_df = enriched_df[final_cols]
-    output_path = file_path.parent / f"enriched_{category}.csv"
-    enriched_df.to_csv(output_path, index=False)
-
-    print(f"✅ Saved enriched {category} to: {output_path.absolute()}")
-    return len(enriched_df)
+def enrich_dataset_chunked(
+    file_path: Path,
+    category: str,
+    output_format: str | None,
+    country: str | None,
+    chunksize: int,
+    unit: Measurement,
+):
+    """
+    Streaming variant: read chunk -> enrich -> append chunk, so memory is
+    bounded by chunksize rather than by the file size.
+    """
+    with DatasetWriter(
+        file_path.parent, dataset_name("enriched", category, country), output_format
+    ) as writer:
+        for chunk in unit.timed(iter_dataset(file_path, chunksize), "read"):
+            with unit.phase("enrich"):
+                enriched_chunk = enrich_frame(chunk, category)
+            with unit.phase("write"):
+                writer.write(enriched_chunk)
+            unit.add_rows(len(chunk))
+    return writer.path if writer.rows else None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Enrich parsed ENTSO-E datasets.")
+    parser.add_argument("date", nargs="?", help="Target date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--format",
+        choices=SUPPORTED_FORMATS,
+        default=PROCESSED_FORMAT,
+        help="Output format for enriched datasets",
+    )
+    parser.add_argument(
+        "--country",
+        help="Enrich parsed_{category}_{country} (per-country DAG tasks)",
+    )
+    parser.add_argument(
+        "--category", choices=["generation", "prices"], help="Only enrich this category"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-enrich partitions even if the manifest says they are up to date",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        help="Stream each file in chunks of this many rows (bounded memory)",
+    )
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+
     # Pega a data passada pelo Airflow ou usa a fixa como fallback
     # O Airflow manda no formato YYYY-MM-DD, vamos converter para YYYY/MM/DD
-    if len(sys.argv) > 1:
-        target_date_raw = sys.argv[1]
-        target_date = target_date_raw.replace("-", "/")
+    if args.date:
+        target_date = args.date.replace("-", "/")
     else:
         target_date = "2026/02/01"
 
     print(f"🧩 Starting enrichment for date: {target_date}")
 
-    # Load references
-    countries_ref = pd.read_csv(COUNTRIES_CSV)
-    psr_ref = pd.read_csv(PSR_TYPES_CSV)
-
-    categories = ["generation", "prices"]
+    categories = [args.category] if args.category else ["generation", "prices"]
     total_rows = 0
+    params = {"version": STAGE_VERSION, "format": args.format}
+
+    with StageRun(
+        "enrich", date=args.date, category=args.category, country=args.country
+    ) as metrics:
+        for cat in categories:
+            input_file = locate_dataset(
+                BASE_PATH / cat / target_date,
+                dataset_name("parsed", cat, args.country),
+                args.format,
+            )
+
+            if not input_file.exists():
+                print(f"⚠️ File not found: {input_file}")
+                continue
 
-    for cat in categories:
-        input_file = BASE_PATH / cat / target_date / f"parsed_{cat}.csv"
+            # The reference files are inputs too: editing them re-enriches
+            manifest = PartitionManifest(input_file.parent)
+            output_name = dataset_name("enriched", cat, args.country)
+            step = f"enrich:{output_name}"
+            fingerprints = manifest.fingerprints(
+                [input_file, COUNTRIES_CSV, PSR_TYPES_CSV]
+            )
+            if not args.force and manifest.is_current(step, fingerprints, params):
+                print(f"⏭️ Unchanged, skipping {input_file.name}")
+                continue
 
-        if input_file.exists():
-            rows = enrich_dataset(input_file, countries_ref, psr_ref, cat)
+            with metrics.measure(
+                "enrich",
+                progress_label=f"enrich {cat}" if args.chunksize else None,
+                date=target_date,
+                category=cat,
+                country=args.country,
+            ) as unit:
+                rows = enrich_dataset(
+                    input_file, cat, args.format, args.country, args.chunksize, unit
+                )
+            output_path = dataset_path(input_file.parent, output_name, args.format)
+            outputs = [output_path.name] if output_path.exists() else []
+            manifest.record(step, fingerprints, params, outputs, rows)
             total_rows += rows
-        else:
-            print(f"⚠️ File not found: {input_file}")
 
     print(f"\n✨ Enrichment complete! Total rows processed: {total_rows}")
 
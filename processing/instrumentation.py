@@ -0,0 +1,367 @@
+"""
+Stage timing and throughput instrumentation shared by the pipeline scripts.
+
+Each script run is one StageRun ("fetch", "parse", "enrich", "load"). Every
+unit of work in it (a country's download, a parsed file, an enriched or
+loaded dataset) is a Measurement and becomes one JSON line:
+
+    {"event": "stage_metric", "stage": "parse", "step": "parse",
+     "date": "2026/02/01", "category": "generation", "country": "FR",
+     "status": "success", "wall_seconds": 0.42, "rows": 5280,
+     "bytes": 812345, "rows_per_second": 12571.4,
+     "phase_seconds": {...}, "peak_rss_bytes": 123456789, ...}
+
+Phases split a unit's wall time (HTTP wait vs file write, read vs COPY vs
+merge, ...). When the run ends a "stage_summary" line adds the totals and
+the peak RSS of the process and of its worker processes.
+
+Lines are appended to PIPELINE_METRICS_LOG (default
+data/logs/pipeline_metrics.jsonl, empty to disable). If
+PIPELINE_METRICS_TEXTFILE_DIR is set, each run also (re)writes a
+Prometheus textfile there for node_exporter's textfile collector.
+"""
+
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(PROJECT_ROOT / ".env")
+
+DEFAULT_LOG_PATH = PROJECT_ROOT / "data" / "logs" / "pipeline_metrics.jsonl"
+METRIC_PREFIX = "entsoe_pipeline"
+
+_write_lock = threading.Lock()
+
+
+def peak_rss_bytes(children: bool = False) -> int:
+    """
+    Peak resident set size of this process (or of its finished child
+    processes, e.g. a process pool). ru_maxrss is KiB on Linux, bytes on macOS.
+    """
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(who).ru_maxrss * scale
+
+
+def metrics_log_path() -> Path | None:
+    value = os.getenv("PIPELINE_METRICS_LOG")
+    if value is None:
+        return DEFAULT_LOG_PATH
+    return Path(value) if value else None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _rate(amount: float, seconds: float) -> float:
+    return round(amount / seconds, 1) if seconds > 0 else 0.0
+
+
+class Measurement:
+    """
+    One unit of work. Set or add rows/bytes while it runs, time parts of it
+    with phase()/timed(); extra holds step-specific fields. Usable on its
+    own (nothing is emitted) when a caller has no StageRun.
+    """
+
+    def __init__(self, step=None, progress_label=None, **labels):
+        self.step = step
+        self.labels = labels
+        self.progress_label = progress_label
+        self.rows = 0
+        self.bytes = 0
+        self.extra = {}
+        self.phases = defaultdict(float)
+        self.status = "success"
+        self.started = time.perf_counter()
+        self.wall_seconds = None
+
+    def elapsed(self) -> float:
+        if self.wall_seconds is not None:
+            return self.wall_seconds
+        return time.perf_counter() - self.started
+
+    def add_rows(self, rows: int):
+        """Counts processed rows; with a progress label, prints the running throughput."""
+        self.rows += rows
+        if self.progress_label:
+            print(
+                f"   ⏳ {self.progress_label}: {self.rows:,} rows "
+                f"({_rate(self.rows, self.elapsed()):,.0f} rows/s)"
+            )
+
+    @contextmanager
+    def phase(self, name: str):
+        """Adds the time spent in the block to phase_seconds[name]."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - started
+
+    def timed(self, iterable, name: str):
+        """Yields from iterable, charging the time spent producing items to a phase."""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def finish(self, wall_seconds: float | None = None):
+        self.wall_seconds = self.elapsed() if wall_seconds is None else wall_seconds
+        if self.progress_label:
+            print(
+                f"   ⏱️ {self.progress_label}: {self.rows:,} rows in "
+                f"{self.wall_seconds:.1f}s ({_rate(self.rows, self.wall_seconds):,.0f} rows/s)"
+            )
+
+    def as_record(self) -> dict:
+        wall = self.elapsed()
+        return {
+            "step": self.step,
+            **self.labels,
+            "status": self.status,
+            "wall_seconds": round(wall, 4),
+            "rows": int(self.rows),
+            "bytes": int(self.bytes),
+            "rows_per_second": _rate(self.rows, wall),
+            "phase_seconds": {
+                name: round(seconds, 4) for name, seconds in sorted(self.phases.items())
+            },
+            **self.extra,
+        }
+
+
+class StageRun:
+    """
+    Collects the measurements of one script run and writes them out.
+    Use as a context manager; an exception marks the run as failed.
+    The summary totals count the units of primary_step (default: the stage
+    name), so e.g. parsed rows are not counted again by the write units.
+    """
+
+    def __init__(self, stage: str, primary_step: str | None = None, **labels):
+        self.stage = stage
+        self.primary_step = primary_step or stage
+        self.labels = {key: value for key, value in labels.items() if value is not None}
+        self.run_id = os.getenv("AIRFLOW_CTX_DAG_RUN_ID") or (
+            f"{stage}-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{os.getpid()}"
+        )
+        self.task_id = os.getenv("AIRFLOW_CTX_TASK_ID")
+        self.log_path = metrics_log_path()
+        self.textfile_dir = os.getenv("PIPELINE_METRICS_TEXTFILE_DIR")
+        self.measurements = []
+        self.status = "success"
+        self.started = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        failed = exc_type is not None and not (
+            exc_type is SystemExit and exc.code in (None, 0)
+        )
+        self.finish("failed" if failed else self.status)
+        return False
+
+    @contextmanager
+    def measure(self, step=None, progress_label=None, **labels):
+        """Measures the block as one unit; an exception marks it as failed."""
+        measurement = Measurement(step, progress_label, **labels)
+        try:
+            yield measurement
+        except BaseException:
+            measurement.status = "failed"
+            raise
+        finally:
+            self.add(measurement)
+
+    def add(self, measurement: Measurement, wall_seconds: float | None = None):
+        """Finishes a measurement (optionally with an externally timed duration) and logs it."""
+        measurement.finish(wall_seconds)
+        self.measurements.append(measurement)
+        self._emit(
+            {
+                "event": "stage_metric",
+                **measurement.as_record(),
+                "peak_rss_bytes": peak_rss_bytes(),
+            }
+        )
+
+    def summary(self) -> dict:
+        wall = time.perf_counter() - self.started
+        primary = [m for m in self.measurements if m.step == self.primary_step]
+        counted = primary or self.measurements
+        rows = sum(m.rows for m in counted)
+        return {
+            "event": "stage_summary",
+            **self.labels,
+            "status": self.status,
+            "wall_seconds": round(wall, 4),
+            "units": len(self.measurements),
+            "failed_units": sum(m.status != "success" for m in self.measurements),
+            "rows": int(rows),
+            "bytes": int(sum(m.bytes for m in counted)),
+            "rows_per_second": _rate(rows, wall),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "children_peak_rss_bytes": peak_rss_bytes(children=True),
+        }
+
+    def finish(self, status: str | None = None):
+        if status:
+            self.status = status
+        summary = self.summary()
+        self._emit(summary)
+        if self.textfile_dir:
+            self._write_textfile(summary)
+
+        print(
+            f"📈 {self.stage} metrics: {summary['units']} unit(s), "
+            f"{summary['rows']:,} rows, {summary['bytes'] / 1e6:,.1f} MB in "
+            f"{summary['wall_seconds']:.1f}s ({summary['rows_per_second']:,.0f} rows/s), "
+            f"peak RSS {summary['peak_rss_bytes'] / 2**20:,.0f} MiB"
+        )
+        return summary
+
+    # -----------------------------
+    # Outputs
+    # -----------------------------
+    def _emit(self, record: dict):
+        if self.log_path is None:
+            return
+        line = json.dumps(
+            {
+                "ts": _now(),
+                "run_id": self.run_id,
+                "task_id": self.task_id,
+                "stage": self.stage,
+                **record,
+            },
+            default=str,
+        )
+        with _write_lock:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _write_textfile(self, summary: dict):
+        """
+        Writes the run as gauges to {dir}/entsoe_{stage}[_{category}][_{country}].prom
+        (one file per script invocation scope, replaced atomically).
+        """
+        scope = {
+            "stage": self.stage,
+            "category": self.labels.get("category", "all"),
+            "country": self.labels.get("country", "all"),
+        }
+        lines = []
+
+        def gauge(name, help_text, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            for labels, value in samples:
+                rendered = ",".join(
+                    f'{key}="{str(val).replace(chr(34), "")}"'
+                    for key, val in labels.items()
+                )
+                lines.append(f"{METRIC_PREFIX}_{name}{{{rendered}}} {value}")
+
+        # Units summed per (step, category, country) so a range run stays compact
+        units = defaultdict(lambda: defaultdict(float))
+        for m in self.measurements:
+            key = (
+                m.step or self.stage,
+                m.labels.get("category") or scope["category"],
+                m.labels.get("country") or scope["country"],
+            )
+            totals = units[key]
+            totals["wall"] += m.elapsed()
+            totals["rows"] += m.rows
+            totals["bytes"] += m.bytes
+            totals["failed"] += m.status != "success"
+            for name, seconds in m.phases.items():
+                totals[f"phase:{name}"] += seconds
+
+        def unit_labels(key):
+            step, category, country = key
+            return {"stage": self.stage, "step": step, "category": category, "country": country}
+
+        gauge(
+            "unit_duration_seconds",
+            "Wall time of the last run per step, category and country.",
+            [(unit_labels(key), round(t["wall"], 4)) for key, t in units.items()],
+        )
+        gauge(
+            "unit_rows",
+            "Rows processed in the last run.",
+            [(unit_labels(key), int(t["rows"])) for key, t in units.items()],
+        )
+        gauge(
+            "unit_bytes",
+            "Bytes read or written in the last run.",
+            [(unit_labels(key), int(t["bytes"])) for key, t in units.items()],
+        )
+        gauge(
+            "unit_rows_per_second",
+            "Throughput of the last run.",
+            [(unit_labels(key), _rate(t["rows"], t["wall"])) for key, t in units.items()],
+        )
+        gauge(
+            "unit_failures",
+            "Failed units in the last run.",
+            [(unit_labels(key), int(t["failed"])) for key, t in units.items()],
+        )
+        gauge(
+            "phase_duration_seconds",
+            "Time spent per phase (HTTP wait, parse, write, COPY, merge, ...).",
+            [
+                ({**unit_labels(key), "phase": name.split(":", 1)[1]}, round(seconds, 4))
+                for key, t in units.items()
+                for name, seconds in t.items()
+                if name.startswith("phase:")
+            ],
+        )
+        gauge(
+            "run_duration_seconds",
+            "Wall time of the last script run.",
+            [(scope, summary["wall_seconds"])],
+        )
+        gauge(
+            "run_peak_rss_bytes",
+            "Peak RSS of the last script run (including worker processes).",
+            [(scope, max(summary["peak_rss_bytes"], summary["children_peak_rss_bytes"]))],
+        )
+        gauge(
+            "run_success",
+            "1 if the last script run succeeded, 0 otherwise.",
+            [(scope, int(summary["status"] == "success"))],
+        )
+        gauge(
+            "run_last_timestamp_seconds",
+            "Unix time the last script run finished.",
+            [(scope, round(time.time(), 3))],
+        )
+
+        directory = Path(self.textfile_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = "_".join(
+            ["entsoe", self.stage]
+            + [self.labels[key] for key in ("category", "country") if key in self.labels]
+        )
+        tmp_path = directory / f".{name}.prom.{os.getpid()}.tmp"
+        tmp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp_path, directory / f"{name}.prom")
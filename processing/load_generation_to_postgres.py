@@ -1,11 +1,33 @@
 """
 Unified Load Script for ENTSO-E Data.
 Modified to accept a target date from Airflow via command line.
+The default "copy" method streams rows with COPY FROM STDIN into a temporary
+staging table and merges them with one set-based INSERT ... ON CONFLICT.
+The "revise" method uses the same staging table but updates rows whose value
+changed (ENTSO-E revisions), bumping their revision counter and updated_at.
+With --schema partitioned, data goes to the compact, monthly partitioned
+fact tables defined in processing/partitioned_schema.py instead.
+Each enriched file is loaded together with its hourly_{category} dataset
+(processing/normalize_resolution.py) into energy_*_hourly, in the same
+transaction. The hourly rows are always upserted, whatever the method, so
+an hour completed by late points is recomputed; the daily/hourly rollups
+are then refreshed from those tables for the touched days.
+The flat tables hold one row per series and interval_start; the Period
+framing (start_time, position) depends on the requested window, so it is
+stored but not part of the key.
+Connections come from the pool in processing/db.py. The tables are created
+by schema migrations applied once per database (schema_migrations), and the
+(day, category) partitions are loaded in parallel, each on its own
+connection. Any failed load makes the script exit non-zero.
+Every load also advances ingest_watermarks, the latest interval_start
+stored per category, country and PSR type, in the same transaction; the
+intraday poller (processing/run_intraday.py) requests only what comes after.
 """
 
-import os
 import sys
-import psycopg2
+import argparse
+from datetime import datetime, timedelta
+from functools import partial
 import pandas as pd
 from pathlib import Path
 from dotenv import load_dotenv
@@ -14,24 +36,93 @@ from psycopg2.extras import execute_batch
 # 1. SETUP PATHS
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 BASE_DATA_PATH = PROJECT_ROOT / "data" / "processed"
+sys.path.append(str(PROJECT_ROOT))
+
+from processing.resolve_timestamps import add_interval_start
+from processing import partitioned_schema
+from processing.manifest import PartitionManifest
+from processing.normalize_resolution import require_normalized, resample_frame
+from processing.instrumentation import Measurement, StageRun
+from processing.rollups import DAY_EXPR, ROLLUP_SCHEMA_SQL, refresh_rollups, touched_days
+from processing.pg_copy import copy_frame
+from processing.db import (
+    DB_CONFIG,
+    connection,
+    database_label,
+    get_pool,
+    migrate,
+    run_parallel,
+)
+from processing.storage import (
+    iter_dataset,
+    locate_country_datasets,
+    locate_dataset,
+    read_dataset,
+)
 
 # Load environment variables
 load_dotenv(PROJECT_ROOT / ".env")
 
-# 2. DB CONNECTION CONFIG
-IN_DOCKER = os.path.exists("/.dockerenv")
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST", "db" if IN_DOCKER else "localhost"),
-    "port": int(os.getenv("DB_PORT", 5432)),
-    "dbname": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-}
+# Bump when the loaded representation changes so partitions are reloaded
+STAGE_VERSION = 2
+
+# 2. DB CONNECTION CONFIG (DB_CONFIG, pool, migrations): processing/db.py
+# (day, category) partitions loaded at once, one pooled connection each
+DEFAULT_WORKERS = 2
+
+# revise, not copy: a re-fetched day must replace what earlier loads stored,
+# e.g. the preliminary actuals of the intraday polls (processing/run_intraday.py)
+DEFAULT_LOAD_METHOD = "revise"
 
 # 3. TABLE DESIGNS (SCHEMAS)
+def interval_key_sql(table, key_columns, legacy_key):
+    """
+    Moves a flat table created with the Period key (start_time, position)
+    onto its interval key: backfills interval_start, keeps only the most
+    recently loaded row per interval, then swaps the unique constraints.
+    No-op on a table created with the interval key.
+    """
+    key = ", ".join(key_columns)
+    constraint = f"{table}_{'_'.join(key_columns)}_key"
+    same_interval = " AND ".join(f"newer.{col} = older.{col}" for col in key_columns)
+    return f"""
+            UPDATE {table}
+            SET interval_start = start_time + (position - 1) * resolution::interval
+            WHERE interval_start IS NULL;
+            DELETE FROM {table} AS older
+            USING {table} AS newer
+            WHERE {same_interval}
+              AND (COALESCE(newer.updated_at, '-infinity'), newer.id)
+                > (COALESCE(older.updated_at, '-infinity'), older.id);
+            ALTER TABLE {table} ALTER COLUMN interval_start SET NOT NULL;
+            ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {legacy_key};
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '{constraint}') THEN
+                    ALTER TABLE {table} ADD CONSTRAINT {constraint} UNIQUE ({key});
+                END IF;
+            END $$;
+        """
+
+
 TABLE_SCHEMAS = {
     "generation": {
         "table_name": "energy_generation",
+        "columns": [
+            "country",
+            "country_name",
+            "type",
+            "bidding_zone",
+            "psr_type",
+            "generation_type",
+            "start_time",
+            "resolution",
+            "position",
+            "interval_start",
+            "quantity_mw",
+        ],
+        "conflict_columns": ["country", "psr_type", "interval_start"],
+        "value_column": "quantity_mw",
         "create_sql": """
             CREATE TABLE IF NOT EXISTS energy_generation (
                 id SERIAL PRIMARY KEY,
@@ -44,20 +135,54 @@ TABLE_SCHEMAS = {
                 start_time TIMESTAMPTZ,
                 resolution VARCHAR(10),
                 position INT,
+                interval_start TIMESTAMPTZ NOT NULL,
                 quantity_mw NUMERIC,
                 ingested_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(country, psr_type, start_time, position)
+                revision INT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(country, psr_type, interval_start)
             );
-        """,
+            ALTER TABLE energy_generation ADD COLUMN IF NOT EXISTS interval_start TIMESTAMPTZ;
+            ALTER TABLE energy_generation ADD COLUMN IF NOT EXISTS revision INT NOT NULL DEFAULT 0;
+            ALTER TABLE energy_generation ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP;
+        """
+        + interval_key_sql(
+            "energy_generation",
+            ["country", "psr_type", "interval_start"],
+            "energy_generation_country_psr_type_start_time_position_key",
+        ),
         "insert_sql": """
             INSERT INTO energy_generation 
-            (country, country_name, type, bidding_zone, psr_type, generation_type, start_time, resolution, position, quantity_mw)
-            VALUES (%(country)s, %(country_name)s, %(type)s, %(bidding_zone)s, %(psr_type)s, %(generation_type)s, %(start_time)s, %(resolution)s, %(position)s, %(quantity_mw)s)
-            ON CONFLICT (country, psr_type, start_time, position) DO NOTHING;
+            (country, country_name, type, bidding_zone, psr_type, generation_type, start_time, resolution, position, interval_start, quantity_mw)
+            VALUES (%(country)s, %(country_name)s, %(type)s, %(bidding_zone)s, %(psr_type)s, %(generation_type)s, %(start_time)s, %(resolution)s, %(position)s, %(interval_start)s, %(quantity_mw)s)
+            ON CONFLICT (country, psr_type, interval_start) DO NOTHING;
         """,
+        # name -> definition; created with the table, aligned with the rollup queries
+        "indexes": {
+            "idx_energy_generation_country_day": f"(country, ({DAY_EXPR})) INCLUDE (quantity_mw)",
+            "idx_energy_generation_solar_day": (
+                f"(country, ({DAY_EXPR})) INCLUDE (interval_start, quantity_mw) "
+                "WHERE psr_type = 'B16'"
+            ),
+            "idx_energy_generation_start_time_brin": "USING BRIN (start_time)",
+            "idx_energy_generation_interval_start_brin": "USING BRIN (interval_start)",
+        },
     },
     "prices": {
         "table_name": "energy_prices",
+        "columns": [
+            "country",
+            "country_name",
+            "type",
+            "bidding_zone",
+            "start_time",
+            "resolution",
+            "position",
+            "interval_start",
+            "price_eur",
+        ],
+        "conflict_columns": ["country", "interval_start"],
+        "value_column": "price_eur",
         "create_sql": """
             CREATE TABLE IF NOT EXISTS energy_prices (
                 id SERIAL PRIMARY KEY,
@@ -68,67 +193,726 @@ TABLE_SCHEMAS = {
                 start_time TIMESTAMPTZ,
                 resolution VARCHAR(10),
                 position INT,
+                interval_start TIMESTAMPTZ NOT NULL,
                 price_eur NUMERIC,
                 ingested_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(country, start_time, position)
+                revision INT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(country, interval_start)
             );
-        """,
+            ALTER TABLE energy_prices ADD COLUMN IF NOT EXISTS interval_start TIMESTAMPTZ;
+            ALTER TABLE energy_prices ADD COLUMN IF NOT EXISTS revision INT NOT NULL DEFAULT 0;
+            ALTER TABLE energy_prices ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP;
+        """
+        + interval_key_sql(
+            "energy_prices",
+            ["country", "interval_start"],
+            "energy_prices_country_start_time_position_key",
+        ),
         "insert_sql": """
             INSERT INTO energy_prices 
-            (country, country_name, type, bidding_zone, start_time, resolution, position, price_eur)
-            VALUES (%(country)s, %(country_name)s, %(type)s, %(bidding_zone)s, %(start_time)s, %(resolution)s, %(position)s, %(price_eur)s)
-            ON CONFLICT (country, start_time, position) DO NOTHING;
+            (country, country_name, type, bidding_zone, start_time, resolution, position, interval_start, price_eur)
+            VALUES (%(country)s, %(country_name)s, %(type)s, %(bidding_zone)s, %(start_time)s, %(resolution)s, %(position)s, %(interval_start)s, %(price_eur)s)
+            ON CONFLICT (country, interval_start) DO NOTHING;
         """,
+        "indexes": {
+            "idx_energy_prices_country_day": f"(country, ({DAY_EXPR})) INCLUDE (price_eur)",
+            "idx_energy_prices_start_time_brin": "USING BRIN (start_time)",
+            "idx_energy_prices_interval_start_brin": "USING BRIN (interval_start)",
+        },
     },
 }
 
+# Hourly series from processing/normalize_resolution.py; the rollups read these
+HOURLY_TABLE_SCHEMAS = {
+    "generation": {
+        "table_name": "energy_generation_hourly",
+        "columns": [
+            "country",
+            "country_name",
+            "type",
+            "bidding_zone",
+            "psr_type",
+            "generation_type",
+            "interval_start",
+            "source_resolution",
+            "points",
+            "coverage",
+            "quantity_mw",
+        ],
+        "conflict_columns": ["country", "psr_type", "interval_start"],
+        "value_column": "quantity_mw",
+        "revised_columns": ["quantity_mw", "source_resolution", "points", "coverage"],
+        "create_sql": """
+            CREATE TABLE IF NOT EXISTS energy_generation_hourly (
+                id SERIAL PRIMARY KEY,
+                country CHAR(2),
+                country_name VARCHAR(50),
+                type VARCHAR(20),
+                bidding_zone VARCHAR(50),
+                psr_type VARCHAR(10),
+                generation_type VARCHAR(100),
+                interval_start TIMESTAMPTZ,
+                source_resolution VARCHAR(10),
+                points INT,
+                coverage NUMERIC,
+                quantity_mw NUMERIC,
+                ingested_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                revision INT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(country, psr_type, interval_start)
+            );
+        """,
+        "indexes": {
+            "idx_energy_generation_hourly_country_day": (
+                f"(country, ({DAY_EXPR})) INCLUDE (quantity_mw, points)"
+            ),
+            "idx_energy_generation_hourly_solar_day": (
+                f"(country, ({DAY_EXPR})) INCLUDE (interval_start, quantity_mw, points) "
+                "WHERE psr_type = 'B16'"
+            ),
+            "idx_energy_generation_hourly_interval_start_brin": "USING BRIN (interval_start)",
+        },
+    },
+    "prices": {
+        "table_name": "energy_prices_hourly",
+        "columns": [
+            "country",
+            "country_name",
+            "type",
+            "bidding_zone",
+            "interval_start",
+            "source_resolution",
+            "points",
+            "coverage",
+            "price_eur",
+            "price_min_eur",
+            "price_max_eur",
+        ],
+        "conflict_columns": ["country", "interval_start"],
+        "value_column": "price_eur",
+        "revised_columns": [
+            "price_eur",
+            "price_min_eur",
+            "price_max_eur",
+            "source_resolution",
+            "points",
+            "coverage",
+        ],
+        "create_sql": """
+            CREATE TABLE IF NOT EXISTS energy_prices_hourly (
+                id SERIAL PRIMARY KEY,
+                country CHAR(2),
+                country_name VARCHAR(50),
+                type VARCHAR(20),
+                bidding_zone VARCHAR(50),
+                interval_start TIMESTAMPTZ,
+                source_resolution VARCHAR(10),
+                points INT,
+                coverage NUMERIC,
+                price_eur NUMERIC,
+                price_min_eur NUMERIC,
+                price_max_eur NUMERIC,
+                ingested_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                revision INT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(country, interval_start)
+            );
+        """,
+        "indexes": {
+            "idx_energy_prices_hourly_country_day": (
+                f"(country, ({DAY_EXPR})) "
+                "INCLUDE (price_eur, price_min_eur, price_max_eur, points)"
+            ),
+            "idx_energy_prices_hourly_interval_start_brin": "USING BRIN (interval_start)",
+        },
+    },
+}
+
+# Latest interval_start loaded per series (prices use psr_type = '')
+WATERMARKS_SQL = """
+    CREATE TABLE IF NOT EXISTS ingest_watermarks (
+        category VARCHAR(20) NOT NULL,
+        country CHAR(2) NOT NULL,
+        psr_type VARCHAR(10) NOT NULL DEFAULT '',
+        last_interval_start TIMESTAMPTZ NOT NULL,
+        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (category, country, psr_type)
+    );
+"""
+
 
 # 4. DATA LOADING ENGINE
-def load_csv_to_postgres(conn, file_path, category):
-    """Loads a single CSV file into the database."""
+def ensure_table(cur, schema):
+    """Creates the target table (and missing columns) plus its analytics indexes."""
+    cur.execute(schema["create_sql"])
+    for name, definition in schema["indexes"].items():
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {schema['table_name']} {definition};"
+        )
+
+
+def schema_migrations(schema_mode="flat") -> dict:
+    """
+    {name: (definition, apply)} for processing.db.migrate(): the target
+    tables of the schema mode ("flat" or "partitioned"; None for neither),
+    the hourly tables and the rollups. Editing a definition re-applies it.
+    """
+    schemas = list(HOURLY_TABLE_SCHEMAS.values())
+    if schema_mode == "flat":
+        schemas = list(TABLE_SCHEMAS.values()) + schemas
+
+    migrations = {
+        f"table:{schema['table_name']}": (
+            schema["create_sql"] + repr(schema["indexes"]),
+            partial(ensure_table, schema=schema),
+        )
+        for schema in schemas
+    }
+    if schema_mode == "partitioned":
+        migrations["partitioned_schema"] = (
+            partitioned_schema.schema_definition(),
+            partitioned_schema.ensure_schema,
+        )
+    migrations["rollups"] = (ROLLUP_SCHEMA_SQL, lambda cur: cur.execute(ROLLUP_SCHEMA_SQL))
+    migrations["table:ingest_watermarks"] = (
+        WATERMARKS_SQL,
+        lambda cur: cur.execute(WATERMARKS_SQL),
+    )
+    return migrations
+
+
+def read_enriched_dataset(file_path):
+    """Reads an enriched dataset and normalizes its timestamp columns."""
+    return normalize_timestamps(read_dataset(file_path))
+
+
+def normalize_timestamps(df):
+    """Parses start_time/interval_start as UTC, deriving interval_start if absent."""
+    df["start_time"] = pd.to_datetime(df["start_time"], utc=True)
+    if "interval_start" in df.columns:
+        df["interval_start"] = pd.to_datetime(df["interval_start"], utc=True)
+    else:
+        # Files enriched before interval_start existed
+        df = add_interval_start(df)
+    return df
+
+
+def frame_watermarks(df) -> dict:
+    """{(country, psr_type): latest interval_start} of a normalized frame."""
+    psr_type = df["psr_type"].astype(str) if "psr_type" in df.columns else ""
+    latest = (
+        pd.DataFrame(
+            {
+                "country": df["country"].astype(str),
+                "psr_type": psr_type,
+                "interval_start": df["interval_start"],
+            }
+        )
+        .groupby(["country", "psr_type"])["interval_start"]
+        .max()
+    )
+    return latest.to_dict()
+
+
+def merge_watermarks(marks: dict, other: dict) -> dict:
+    for key, value in other.items():
+        if key not in marks or value > marks[key]:
+            marks[key] = value
+    return marks
+
+
+def advance_watermarks(cur, category, marks: dict):
+    """Moves the stored watermarks forward (never back) to the loaded maxima."""
+    cur.executemany(
+        """
+        INSERT INTO ingest_watermarks (category, country, psr_type, last_interval_start)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (category, country, psr_type) DO UPDATE
+        SET last_interval_start = GREATEST(
+                ingest_watermarks.last_interval_start, EXCLUDED.last_interval_start
+            ),
+            updated_at = CURRENT_TIMESTAMP;
+        """,
+        [
+            (category, country, psr_type, latest.to_pydatetime())
+            for (country, psr_type), latest in sorted(marks.items())
+        ],
+    )
+
+
+def read_watermarks(conn, category) -> dict:
+    """{(country, psr_type): last_interval_start} stored for a category."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT country, psr_type, last_interval_start
+            FROM ingest_watermarks WHERE category = %s;
+            """,
+            (category,),
+        )
+        return {(country, psr_type): latest for country, psr_type, latest in cur.fetchall()}
+
+
+def insert_frame_batch(cur, df, schema):
+    """Row-by-row path: execute_batch over INSERT ... ON CONFLICT DO NOTHING."""
+    records = df.to_dict(orient="records")
+    execute_batch(cur, schema["insert_sql"], records, page_size=1000)
+    return len(records)
+
+
+def create_staging_table(cur, schema):
+    """
+    Creates a temporary (unlogged, dropped on commit) staging table with the
+    target's load columns. Returns the staging table name.
+    """
+    staging = f"staging_{schema['table_name']}"
+    columns = ", ".join(schema["columns"])
+
+    cur.execute(
+        f"""
+        CREATE TEMP TABLE {staging} ON COMMIT DROP AS
+        SELECT {columns} FROM {schema['table_name']} WITH NO DATA;
+        """
+    )
+    return staging
+
+
+def merge_staging(cur, staging, schema, total_rows):
+    """
+    Bulk path: one INSERT ... SELECT ... ON CONFLICT DO NOTHING from the
+    staging table. Returns inserted/skipped row counts.
+    """
+    columns = ", ".join(schema["columns"])
+    conflict = ", ".join(schema["conflict_columns"])
+
+    cur.execute(
+        f"""
+        INSERT INTO {schema['table_name']} ({columns})
+        SELECT {columns} FROM {staging}
+        ON CONFLICT ({conflict}) DO NOTHING;
+        """
+    )
+    inserted = cur.rowcount
+    return {"inserted": inserted, "skipped": total_rows - inserted}
+
+
+def revise_staging(cur, staging, schema, total_rows):
+    """
+    Revision-aware path: one upsert from the staging table that inserts new
+    keys and updates only rows whose value (or revised_columns) differs from
+    the stored one. Returns new/changed/unchanged row counts.
+    """
+    table = schema["table_name"]
+    revised = schema.get("revised_columns", [schema["value_column"]])
+    columns = ", ".join(schema["columns"])
+    conflict = ", ".join(schema["conflict_columns"])
+    assignments = ",\n                ".join(f"{col} = EXCLUDED.{col}" for col in revised)
+    stored = ", ".join(f"target.{col}" for col in revised)
+    excluded = ", ".join(f"EXCLUDED.{col}" for col in revised)
+
+    cur.execute(
+        f"""
+        WITH incoming AS (
+            SELECT DISTINCT ON ({conflict}) {columns}
+            FROM {staging}
+            ORDER BY {conflict}
+        ),
+        merged AS (
+            INSERT INTO {table} AS target ({columns})
+            SELECT {columns} FROM incoming
+            ON CONFLICT ({conflict}) DO UPDATE
+            SET {assignments},
+                revision = target.revision + 1,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE ROW({stored}) IS DISTINCT FROM ROW({excluded})
+            RETURNING (xmax = 0) AS is_new
+        )
+        SELECT
+            COUNT(*) FILTER (WHERE is_new),
+            COUNT(*) FILTER (WHERE NOT is_new),
+            (SELECT COUNT(*) FROM incoming)
+        FROM merged;
+        """
+    )
+    new, changed, distinct_rows = cur.fetchone()
+    return {"new": new, "changed": changed, "unchanged": distinct_rows - new - changed}
+
+
+# copy / revise stream into a staging table and merge it; batch inserts directly
+MERGE_METHODS = {"copy": merge_staging, "revise": revise_staging}
+LOAD_METHODS = ("copy", "revise", "batch")
+
+
+def load_csv_to_postgres(
+    conn, file_path, category, method=DEFAULT_LOAD_METHOD, schema_mode="flat"
+):
+    """Loads a single enriched dataset (CSV or Parquet) into the database."""
     print(f"📖 Reading: {file_path.absolute()}")
 
-    df = pd.read_csv(file_path, parse_dates=["start_time"])
-    schema = TABLE_SCHEMAS[category]
+    df = read_enriched_dataset(file_path)
+    return load_frame_to_postgres(conn, df, category, method, schema_mode)
+
+
+def load_frame_to_postgres(
+    conn, df, category, method=DEFAULT_LOAD_METHOD, schema_mode="flat", hourly=None
+):
+    """
+    Loads an enriched frame (already in memory) and its hourly resampling
+    (computed here unless given) into the database and commits.
+    """
+    if hourly is None:
+        hourly = resample_frame(df, category)
+    return load_frames_to_postgres(
+        conn, [df], category, method, schema_mode, hourly=[hourly]
+    )
+
+
+def load_hourly_frames(cur, frames, category, unit=None):
+    """
+    Loads normalized hourly frames into energy_{category}_hourly.
+    The hours are aggregates of the raw points, so they are always upserted
+    (revise_staging), whatever method loads the raw rows: an hour whose
+    points were completed by a later load is recomputed, not kept.
+    Returns the rows read, the merge counts and the touched (country, day) pairs.
+    """
+    if unit is None:
+        unit = Measurement("load")
+    schema = HOURLY_TABLE_SCHEMAS[category]
+    staging = create_staging_table(cur, schema)
+
+    total_rows = 0
+    pairs = set()
+    for df in unit.timed(frames, "read"):
+        with unit.phase("stage_hourly"):
+            df["interval_start"] = pd.to_datetime(df["interval_start"], utc=True)
+            copy_frame(cur, df, staging, schema["columns"])
+        pairs.update(touched_days(df))
+        total_rows += len(df)
+
+    with unit.phase("merge_hourly"):
+        counts = revise_staging(cur, staging, schema, total_rows)
+
+    summary = ", ".join(f"{count} {label}" for label, count in counts.items())
+    print(f"✅ Loaded {total_rows} rows into '{schema['table_name']}': {summary}.")
+    return total_rows, counts, pairs
+
+
+def load_frames_to_postgres(
+    conn,
+    frames,
+    category,
+    method=DEFAULT_LOAD_METHOD,
+    schema_mode="flat",
+    unit=None,
+    hourly=None,
+):
+    """
+    Loads enriched frames (a whole dataset, or the chunks of streamed files)
+    in one transaction, after applying pending schema migrations: each frame
+    is COPYed into the staging table as it arrives, then everything is
+    merged, the matching hourly frames loaded and the touched rollups
+    refreshed once. Only the current frame is held
+    in memory. Rows and the time spent reading, staging, merging,
+    refreshing rollups and committing are added to unit (a metrics
+    Measurement) when one is given.
+    """
+    if unit is None:
+        unit = Measurement("load")
+    pairs = set()
+    marks = {}
+    total_rows = 0
+    migrate(conn, schema_migrations(schema_mode))
 
     with conn.cursor() as cur:
-        cur.execute(schema["create_sql"])
-        records = df.to_dict(orient="records")
-        execute_batch(cur, schema["insert_sql"], records, page_size=1000)
-        conn.commit()
+        if schema_mode == "partitioned":
+            table_name = partitioned_schema.FACT_SCHEMAS[category]["table_name"]
+            partitioned_schema.begin_load(cur, category, method)
+        else:
+            schema = TABLE_SCHEMAS[category]
+            table_name = schema["table_name"]
+            if method != "batch":
+                staging = create_staging_table(cur, schema)
+
+        for df in unit.timed(frames, "read"):
+            with unit.phase("stage"):
+                df = normalize_timestamps(df)
+                if schema_mode == "partitioned":
+                    partitioned_schema.stage_frame(cur, df, category)
+                elif method == "batch":
+                    insert_frame_batch(cur, df, schema)
+                else:
+                    copy_frame(cur, df, staging, schema["columns"])
 
-    print(f"✅ Loaded {len(df)} rows into '{schema['table_name']}'.")
+            pairs.update(touched_days(df))
+            merge_watermarks(marks, frame_watermarks(df))
+            total_rows += len(df)
+            unit.add_rows(len(df))
+
+        with unit.phase("merge"):
+            if schema_mode == "partitioned":
+                counts = partitioned_schema.finish_load(
+                    cur, category, method, total_rows
+                )
+            elif method == "batch":
+                counts = {"submitted": total_rows}
+            else:
+                counts = MERGE_METHODS[method](cur, staging, schema, total_rows)
+
+        if hourly is not None:
+            hourly_rows, hourly_counts, hourly_pairs = load_hourly_frames(
+                cur, hourly, category, unit
+            )
+            pairs.update(hourly_pairs)
+            unit.extra["hourly_rows"] = hourly_rows
+            unit.extra.update(
+                {f"hourly_{label}": count for label, count in hourly_counts.items()}
+            )
+
+        # Re-aggregate only the country-days this load touched
+        with unit.phase("rollups"):
+            refresh_rollups(cur, category, sorted(pairs))
+        advance_watermarks(cur, category, marks)
+        with unit.phase("commit"):
+            conn.commit()
+        unit.extra.update(counts)
+
+    summary = ", ".join(f"{count} {label}" for label, count in counts.items())
+    print(f"✅ Loaded {total_rows} rows into '{table_name}': {summary}.")
+    print(f"🧮 Refreshed rollups for {len(pairs)} country-day(s).")
+    return counts
+
+
+def load_day_partition(
+    conn,
+    target_date,
+    category,
+    method,
+    schema_mode,
+    metrics,
+    per_country=False,
+    force=False,
+    chunksize=None,
+    commit_rows=None,
+):
+    """
+    Loads a day's enriched_{category} file, or with per_country every
+    enriched_{category}_{CC} file (fan-in for the per-country DAG), each with
+    its hourly_* dataset, which the normalize stage must have written. A
+    missing or stale one fails the partition before anything loads; with
+    per_country only that zone is skipped and reported, the others load. Files
+    the partition manifest shows as already loaded into this database,
+    unchanged, are skipped. With chunksize, files are streamed in chunks of
+    that many rows instead of being read whole.
+
+    All files go into one transaction unless commit_rows is set: then a
+    transaction is committed (and its files recorded in the manifest) after
+    the file that brings it to commit_rows rows, so a failure only repeats
+    the files of the uncommitted batch. Each transaction is one unit of the
+    metrics StageRun. Returns the merge counts summed over the transactions.
+    """
+    day_dir = BASE_DATA_PATH / category / target_date
+    if per_country:
+        files = locate_country_datasets(day_dir, "enriched", category)
+    else:
+        files = [locate_dataset(day_dir, f"enriched_{category}")]
+    files = [path for path in files if path.exists()]
+    if not files:
+        print(f"ℹ️ No enriched {category} file in: {day_dir.absolute()}")
+        return None
+
+    manifest = PartitionManifest(day_dir)
+    params = {"version": STAGE_VERSION, "database": database_label()}
+    pending, unnormalized = [], []
+    for path in files:
+        step = f"load:{schema_mode}:{path.stem}"
+        try:
+            hourly_path = require_normalized(path)
+        except FileNotFoundError as e:
+            if not per_country:
+                raise
+            print(f"⚠️ Skipping {path.name}: {e}")
+            unnormalized.append(path.stem)
+            continue
+        fingerprints = manifest.fingerprints([path, hourly_path])
+        if not force and manifest.is_current(step, fingerprints, params):
+            print(f"⏭️ Unchanged, skipping {path.name}")
+            continue
+        pending.append((path, hourly_path, step, fingerprints))
+    if unnormalized:
+        print(
+            f"⚠️ {len(unnormalized)} of {len(files)} {category} zone(s) not loaded "
+            f"for {target_date} (not normalized): {', '.join(unnormalized)}"
+        )
+    if not pending:
+        return None
+
+    def read_chunks(path):
+        print(f"📖 Reading: {path.absolute()}")
+        return iter_dataset(path, chunksize) if chunksize else [read_dataset(path)]
+
+    def frames(batch, rows):
+        # Moves files from pending into the batch until it reaches commit_rows
+        while pending:
+            batch.append(pending.pop(0))
+            rows.append(0)
+            for chunk in read_chunks(batch[-1][0]):
+                rows[-1] += len(chunk)
+                yield chunk
+            if commit_rows and sum(rows) >= commit_rows:
+                return
+
+    def hourly_frames(batch):
+        for _, hourly_path, _, _ in batch:
+            yield from read_chunks(hourly_path)
+
+    totals = {}
+    while pending:
+        batch, rows = [], []
+        with metrics.measure(
+            "load",
+            progress_label=f"load {category}" if chunksize else None,
+            date=target_date,
+            category=category,
+        ) as unit:
+            counts = load_frames_to_postgres(
+                conn,
+                frames(batch, rows),
+                category,
+                method,
+                schema_mode,
+                unit,
+                hourly_frames(batch),
+            )
+            unit.bytes = sum(path.stat().st_size for path, _, _, _ in batch)
+            unit.extra.update(files=len(batch), method=method, schema=schema_mode)
+
+        # Recorded only after the commit in load_frames_to_postgres
+        for (_, _, step, fingerprints), row_count in zip(batch, rows):
+            manifest.record(step, fingerprints, params, [], row_count)
+        for label, count in counts.items():
+            totals[label] = totals.get(label, 0) + count
+    return totals
 
 
 # 5. MAIN LOGIC
-def main():
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load enriched data into PostgreSQL.")
+    parser.add_argument("date", nargs="?", help="Target date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--method",
+        choices=sorted(LOAD_METHODS),
+        default=DEFAULT_LOAD_METHOD,
+        help=(
+            "revise: COPY + update changed values (default, corrects intraday "
+            "and earlier loads); copy: COPY + insert-only merge; "
+            "batch: execute_batch inserts"
+        ),
+    )
+    parser.add_argument(
+        "--schema",
+        choices=["flat", "partitioned"],
+        default="flat",
+        help="flat: energy_* tables; partitioned: monthly fact_* tables with dimensions",
+    )
+    parser.add_argument("--start", help="Range mode: first day (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Range mode: last day, inclusive (YYYY-MM-DD)")
+    parser.add_argument(
+        "--per-country",
+        action="store_true",
+        help="Load the enriched_{category}_{country} files written by the mapped DAG",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reload files even if the manifest says they are already loaded",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        help="Stream each file in chunks of this many rows (bounded memory)",
+    )
+    parser.add_argument(
+        "--commit-rows",
+        type=int,
+        help="Commit a partition's files in transactions of about this many rows",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"(day, category) partitions loaded in parallel (default: {DEFAULT_WORKERS})",
+    )
+    args = parser.parse_args()
+
+    if bool(args.start) != bool(args.end):
+        parser.error("--start and --end must be used together")
+    return args
+
+
+def target_days(args) -> list[str]:
+    """Returns the YYYY/MM/DD partitions to load."""
+    if args.start:
+        first = datetime.strptime(args.start, "%Y-%m-%d")
+        last = datetime.strptime(args.end, "%Y-%m-%d")
+        return [
+            (first + timedelta(days=offset)).strftime("%Y/%m/%d")
+            for offset in range((last - first).days + 1)
+        ]
     # Dynamic Date Handling (same logic as parse and enrich scripts)
-    if len(sys.argv) > 1:
-        target_date_raw = sys.argv[1]
-        target_date = target_date_raw.replace("-", "/")
-    else:
-        # Default to a specific date for manual testing
-        target_date = "2026/02/01"
+    if args.date:
+        return [args.date.replace("-", "/")]
+    # Default to a specific date for manual testing
+    return ["2026/02/01"]
 
-    print(f"🚀 Starting ENTSO-E Data Loader for date: {target_date}")
 
-    try:
-        with psycopg2.connect(**DB_CONFIG) as conn:
-            for category in ["generation", "prices"]:
-                # Targeted file path based on date
-                csv_file = (
-                    BASE_DATA_PATH / category / target_date / f"enriched_{category}.csv"
-                )
+def main():
+    args = parse_args()
+    days = target_days(args)
 
-                if csv_file.exists():
-                    load_csv_to_postgres(conn, csv_file, category)
-                else:
-                    print(f"ℹ️ File not found for {category}: {csv_file.absolute()}")
+    print(
+        f"🚀 Starting ENTSO-E Data Loader for: {days[0]} → {days[-1]} "
+        f"({args.method}, {args.workers} worker(s))"
+    )
 
-        print("\n✨ Database update process finished.")
+    metrics = StageRun("load", date=args.date)
+    jobs = {
+        (target_date, category): partial(
+            load_day_partition,
+            target_date=target_date,
+            category=category,
+            method=args.method,
+            schema_mode=args.schema,
+            metrics=metrics,
+            per_country=args.per_country,
+            force=args.force,
+            chunksize=args.chunksize,
+            commit_rows=args.commit_rows,
+        )
+        for target_date in days
+        for category in ["generation", "prices"]
+    }
 
+    try:
+        get_pool(args.workers)
+        with connection() as conn:
+            migrate(conn, schema_migrations(args.schema))
+        _, errors = run_parallel(jobs, args.workers)
     except Exception as e:
+        metrics.finish("failed")
         print(f"❌ Database Error: {e}")
+        sys.exit(1)
+
+    # Committed partitions are skipped by the next run; only failed ones reload
+    for (target_date, category), error in sorted(errors.items()):
+        print(f"❌ Loading {category} for {target_date} failed: {error}")
+    if errors:
+        metrics.finish("failed")
+        print(f"\n❌ {len(errors)} of {len(jobs)} load(s) failed.")
+        sys.exit(1)
+
+    metrics.finish()
+    print("\n✨ Database update process finished.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+"""
+Per-partition manifests for incremental processing.
+
+Every data/processed/{category}/{YYYY}/{MM}/{DD} partition keeps a
+_manifest.json describing what each stage last did there:
+
+    {"parse:parsed_generation": {
+        "params": {"version": 1, "format": "csv"},
+        "inputs": {"data/raw/generation/.../generation_FR.xml":
+                   {"sha256": "...", "size": 123, "mtime_ns": ...}, ...},
+        "outputs": ["parsed_generation.csv"],
+        "rows": 5280,
+        "recorded_at": "2026-02-02T03:04:05+00:00"}}
+
+A step is skipped when its params (stage version, format, ...) are
+unchanged, the same input files still hash to the recorded digests and the
+recorded outputs still exist. Digests are reused while a file's size and
+mtime are unchanged, so checking a partition does not re-read its inputs.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+MANIFEST_NAME = "_manifest.json"
+LOCK_NAME = "_manifest.lock"
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def input_key(path: Path) -> str:
+    """Project-relative path, so manifests survive moving the checkout."""
+    path = Path(path).resolve()
+    try:
+        return str(path.relative_to(PROJECT_ROOT))
+    except ValueError:
+        return str(path)
+
+
+class PartitionManifest:
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.path = self.directory / MANIFEST_NAME
+        self.entries = self._read()
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def fingerprints(self, paths) -> dict:
+        """
+        {input key: {sha256, size, mtime_ns}} for the given files. A digest
+        recorded for the same size and mtime is reused instead of re-hashing.
+        """
+        known = {}
+        for entry in self.entries.values():
+            known.update(entry.get("inputs", {}))
+
+        result = {}
+        for path in paths:
+            stat = Path(path).stat()
+            key = input_key(path)
+            previous = known.get(key)
+            if (
+                previous
+                and previous["size"] == stat.st_size
+                and previous["mtime_ns"] == stat.st_mtime_ns
+            ):
+                digest = previous["sha256"]
+            else:
+                digest = file_digest(path)
+            result[key] = {
+                "sha256": digest,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+        return result
+
+    def is_current(self, step: str, fingerprints: dict, params: dict) -> bool:
+        """True when step already ran on exactly these inputs with these params."""
+        entry = self.entries.get(step)
+        if entry is None or entry["params"] != params:
+            return False
+
+        recorded = {key: value["sha256"] for key, value in entry["inputs"].items()}
+        current = {key: value["sha256"] for key, value in fingerprints.items()}
+        if recorded != current:
+            return False
+
+        return all((self.directory / name).exists() for name in entry["outputs"])
+
+    def derived_from(self, step: str, path: Path, output: str) -> bool:
+        """True when step's recorded run wrote output from path as it is now."""
+        entry = self.entries.get(step)
+        if entry is None or output not in entry["outputs"]:
+            return False
+        key = input_key(path)
+        recorded = entry["inputs"].get(key, {}).get("sha256")
+        return recorded == self.fingerprints([path])[key]["sha256"]
+
+    def record(
+        self,
+        step: str,
+        fingerprints: dict,
+        params: dict,
+        outputs: list[str],
+        rows: int,
+    ):
+        """Stores the result of a step (merged under a lock with concurrent writers)."""
+        entry = {
+            "params": params,
+            "inputs": fingerprints,
+            "outputs": sorted(outputs),
+            "rows": int(rows),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        with self._locked():
+            self.entries = self._read()
+            self.entries[step] = entry
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(
+                json.dumps(self.entries, indent=2, sort_keys=True), encoding="utf-8"
+            )
+            os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock so mapped per-country tasks can share a partition."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK_NAME, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
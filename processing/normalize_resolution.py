@@ -0,0 +1,339 @@
+"""
+Resolution normalization of enriched ENTSO-E data.
+
+Zones publish generation and prices at PT15M, PT30M or PT60M, so summing or
+averaging raw points mixes resolutions. This stage resamples every series
+(country/zone, plus PSR type for generation) onto a common grid and writes
+hourly_{category} (PT60M) and, on request, quarterhourly_{category} (PT15M)
+next to the enriched dataset, which is kept as it is:
+
+  * generation: mean MW of the points in each grid interval
+  * prices: time-weighted average price (plus min/max) per grid interval
+
+Points coarser than the grid are spread over the grid steps they cover.
+Each output row keeps the finest source resolution, the number of source
+points and the share of the interval they cover. Everything runs on NumPy
+arrays: one lexsort, then segment reductions (np.add.reduceat, ...) over
+the (series, grid interval) groups.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from processing.instrumentation import StageRun
+from processing.manifest import PartitionManifest
+from processing.resolve_timestamps import parse_start_times
+from processing.storage import (
+    PROCESSED_FORMAT,
+    SUPPORTED_FORMATS,
+    dataset_name,
+    dataset_path,
+    locate_dataset,
+    read_dataset,
+    write_dataset,
+)
+
+BASE_PATH = PROJECT_ROOT / "data" / "processed"
+
+# Bump when the normalized output changes so existing partitions are redone
+STAGE_VERSION = 1
+
+# Grid -> dataset stage name
+GRIDS = {"PT60M": "hourly", "PT15M": "quarterhourly"}
+DEFAULT_GRID = "PT60M"
+
+# Columns identifying one series, and attributes carried over from it
+SERIES_COLUMNS = {
+    "generation": ["country", "bidding_zone", "psr_type"],
+    "prices": ["country", "bidding_zone"],
+}
+CARRIED_COLUMNS = {
+    "generation": ["country_name", "type", "generation_type"],
+    "prices": ["country_name", "type"],
+}
+VALUE_COLUMNS = {"generation": "quantity_mw", "prices": "price_eur"}
+
+# Output layout per category
+NORMALIZED_COLUMNS = {
+    "generation": [
+        "country",
+        "country_name",
+        "type",
+        "bidding_zone",
+        "psr_type",
+        "generation_type",
+        "interval_start",
+        "resolution",
+        "source_resolution",
+        "points",
+        "coverage",
+        "quantity_mw",
+    ],
+    "prices": [
+        "country",
+        "country_name",
+        "type",
+        "bidding_zone",
+        "interval_start",
+        "resolution",
+        "source_resolution",
+        "points",
+        "coverage",
+        "price_eur",
+        "price_min_eur",
+        "price_max_eur",
+    ],
+}
+
+
+def series_codes(df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    """Dense integer id per distinct combination of the series columns."""
+    codes = np.zeros(len(df), dtype=np.int64)
+    for col in columns:
+        col_codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+        codes = codes * max(len(uniques), 1) + col_codes
+    return pd.factorize(codes)[0]
+
+
+def resample_frame(
+    df: pd.DataFrame, category: str, grid: str = DEFAULT_GRID
+) -> pd.DataFrame:
+    """
+    Resamples an enriched frame onto the grid (PT60M or PT15M). The frame
+    must hold whole series for the days it covers; duplicated points of a
+    series keep their first occurrence, like the loader.
+    """
+    columns = NORMALIZED_COLUMNS[category]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    grid_ns = pd.Timedelta(grid).value
+    value_column = VALUE_COLUMNS[category]
+
+    resolution_codes, resolutions = pd.factorize(df["resolution"].astype(str))
+    resolution_ns = np.array([pd.Timedelta(r).value for r in resolutions], dtype=np.int64)
+    step = resolution_ns[resolution_codes]
+    start = parse_start_times(df["interval_start"])
+    series = series_codes(df, SERIES_COLUMNS[category])
+    values = df[value_column].to_numpy(dtype=np.float64)
+    rows = np.arange(len(df))
+
+    # Spread points coarser than the grid over every grid step they cover
+    pieces = np.maximum(step // grid_ns, 1)
+    if (pieces > 1).any():
+        rows = np.repeat(rows, pieces)
+        within = np.arange(len(rows)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+        start = start[rows] + within * grid_ns
+        series, values = series[rows], values[rows]
+    duration = np.minimum(step[rows], grid_ns)
+
+    # Sort by (series, start); drop repeated points of a series
+    order = np.lexsort((start, series))
+    sorted_series, sorted_start = series[order], start[order]
+    first_point = np.ones(len(order), dtype=bool)
+    first_point[1:] = (sorted_series[1:] != sorted_series[:-1]) | (
+        sorted_start[1:] != sorted_start[:-1]
+    )
+    order = order[first_point]
+
+    # Segment boundaries of the (series, grid interval) groups
+    group_series = series[order]
+    bucket = start[order] // grid_ns * grid_ns
+    new_group = np.ones(len(order), dtype=bool)
+    new_group[1:] = (group_series[1:] != group_series[:-1]) | (bucket[1:] != bucket[:-1])
+    bounds = np.flatnonzero(new_group)
+
+    point_values = values[order]
+    point_duration = duration[order]
+    covered = np.add.reduceat(point_duration, bounds)
+    points = np.diff(np.append(bounds, len(order)))
+
+    if category == "prices":
+        # Time-weighted: a PT60M price counts four times as much as a PT15M one
+        weighted = np.add.reduceat(point_values * point_duration, bounds)
+        value = weighted / covered
+    else:
+        value = np.add.reduceat(point_values, bounds) / points
+
+    source = rows[order][bounds]  # first source row of each group
+    finest_step = np.minimum.reduceat(step[rows[order]], bounds)
+    resolution_by_step = dict(zip(resolution_ns, resolutions))
+
+    result = {
+        col: df[col].iloc[source].reset_index(drop=True)
+        for col in SERIES_COLUMNS[category] + CARRIED_COLUMNS[category]
+    }
+    result["interval_start"] = pd.to_datetime(bucket[bounds], unit="ns", utc=True)
+    result["resolution"] = pd.Categorical([grid] * len(bounds))
+    result["source_resolution"] = pd.Categorical(
+        [resolution_by_step[s] for s in finest_step]
+    )
+    result["points"] = points.astype(np.int32)
+    result["coverage"] = covered / grid_ns
+    result[value_column] = value
+    if category == "prices":
+        result["price_min_eur"] = np.minimum.reduceat(point_values, bounds)
+        result["price_max_eur"] = np.maximum.reduceat(point_values, bounds)
+
+    return pd.DataFrame(result)[columns]
+
+
+def normalize_dataset(
+    file_path: Path,
+    category: str,
+    grids=(DEFAULT_GRID,),
+    output_format: str | None = None,
+    country: str | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Writes {stage}_{category}[_{country}] for each grid next to an enriched
+    dataset. Returns {grid: normalized frame}.
+    """
+    df = read_dataset(file_path)
+    normalized = {}
+    for grid in grids:
+        resampled = resample_frame(df, category, grid)
+        output_path = write_dataset(
+            resampled,
+            file_path.parent,
+            dataset_name(GRIDS[grid], category, country),
+            output_format,
+        )
+        print(
+            f"✅ Saved {len(resampled)} {GRIDS[grid]} {category} rows "
+            f"(from {len(df)}) to: {output_path.absolute()}"
+        )
+        normalized[grid] = resampled
+    return normalized
+
+
+def normalize_step(category: str, country: str | None = None) -> str:
+    """Manifest step of the normalize stage for enriched_{category}[_{country}]."""
+    return f"normalize:{dataset_name('normalized', category, country)}"
+
+
+def normalize_params(output_format: str, grids) -> dict:
+    return {"version": STAGE_VERSION, "format": output_format, "grids": list(grids)}
+
+
+def require_normalized(enriched_path: Path, grid: str = DEFAULT_GRID) -> Path:
+    """
+    Path of the normalized dataset belonging to an enriched one (same
+    directory, country suffix and format). Raises FileNotFoundError when
+    it is missing or the partition manifest does not show it written from
+    the enriched file's current content: the normalize stage has to run
+    first (resampling here would read the whole enriched file).
+    """
+    enriched_path = Path(enriched_path)
+    fmt = enriched_path.suffix.lstrip(".")
+    suffix = enriched_path.stem[len("enriched") :]
+    path = locate_dataset(enriched_path.parent, GRIDS[grid] + suffix, fmt)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"{path.name} is missing next to {enriched_path.name}; "
+            "run processing/normalize_resolution.py for this day first"
+        )
+    manifest = PartitionManifest(enriched_path.parent)
+    if not manifest.derived_from(f"normalize:normalized{suffix}", enriched_path, path.name):
+        raise FileNotFoundError(
+            f"{path.name} was not normalized from the current {enriched_path.name}; "
+            "run processing/normalize_resolution.py for this day again"
+        )
+    return path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Resample enriched ENTSO-E datasets onto an hourly/15-min grid."
+    )
+    parser.add_argument("date", nargs="?", help="Target date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--grid",
+        action="append",
+        choices=sorted(GRIDS),
+        help="Target grid, repeatable (default: PT60M)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=SUPPORTED_FORMATS,
+        default=PROCESSED_FORMAT,
+        help="Output format for normalized datasets",
+    )
+    parser.add_argument(
+        "--country",
+        help="Normalize enriched_{category}_{country} (per-country DAG tasks)",
+    )
+    parser.add_argument(
+        "--category", choices=["generation", "prices"], help="Only this category"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-normalize partitions even if the manifest says they are up to date",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    target_date = args.date.replace("-", "/") if args.date else "2026/02/01"
+    grids = sorted(set(args.grid or [DEFAULT_GRID]), reverse=True)
+
+    print(f"📐 Normalizing resolutions for {target_date} onto {', '.join(grids)}")
+
+    categories = [args.category] if args.category else ["generation", "prices"]
+    total_rows = 0
+
+    with StageRun(
+        "normalize", date=args.date, category=args.category, country=args.country
+    ) as metrics:
+        for cat in categories:
+            input_file = locate_dataset(
+                BASE_PATH / cat / target_date,
+                dataset_name("enriched", cat, args.country),
+                args.format,
+            )
+            if not input_file.exists():
+                print(f"⚠️ File not found: {input_file}")
+                continue
+
+            manifest = PartitionManifest(input_file.parent)
+            step = normalize_step(cat, args.country)
+            params = normalize_params(args.format, grids)
+            fingerprints = manifest.fingerprints([input_file])
+            if not args.force and manifest.is_current(step, fingerprints, params):
+                print(f"⏭️ Unchanged, skipping {input_file.name}")
+                continue
+
+            with metrics.measure(
+                "normalize", date=target_date, category=cat, country=args.country
+            ) as unit:
+                unit.bytes = input_file.stat().st_size
+                normalized = normalize_dataset(
+                    input_file, cat, grids, args.format, args.country
+                )
+                unit.rows = sum(len(frame) for frame in normalized.values())
+
+            outputs = [
+                dataset_path(
+                    input_file.parent,
+                    dataset_name(GRIDS[grid], cat, args.country),
+                    args.format,
+                ).name
+                for grid in grids
+            ]
+            manifest.record(step, fingerprints, params, outputs, unit.rows)
+            total_rows += unit.rows
+
+    print(f"\n✨ Normalization complete! Rows written: {total_rows}")
+
+
+if __name__ == "__main__":
+    main()
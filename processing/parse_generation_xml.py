@@ -1,17 +1,57 @@
+import io
 import xml.etree.ElementTree as ET
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import argparse
+import sys
+import time
+import numpy as np
 import pandas as pd
 from pathlib import Path
-import sys
 
 # ======================================================
 # Paths Configuration
 # ======================================================
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from ingestion.raw_archive import list_raw_documents, open_raw, raw_country
+from ingestion.xml_partitioning import parse_entsoe_time, parse_resolution
+from processing.instrumentation import Measurement, StageRun
+from processing.manifest import PartitionManifest
+from processing.storage import (
+    PROCESSED_FORMAT,
+    SUPPORTED_FORMATS,
+    dataset_name,
+    dataset_path,
+    write_dataset,
+)
+
 RAW_BASE_DIR = PROJECT_ROOT / "data" / "raw"
 PROCESSED_BASE_DIR = PROJECT_ROOT / "data" / "processed"
 
 DATA_TYPES = ["generation", "prices"]
 
+# Bump when the parsed output changes so existing partitions are re-parsed
+STAGE_VERSION = 1
+
+# Number of points buffered before a columnar batch is emitted
+BATCH_SIZE = 100_000
+
+# Output column order (matches parse_xml_to_records)
+RECORD_COLUMNS = [
+    "country",
+    "bidding_zone",
+    "type",
+    "psr_type",
+    "start_time",
+    "resolution",
+    "position",
+    "value",
+]
+
 # ======================================================
 # Parsing Logic
 # ======================================================
@@ -19,9 +59,10 @@ DATA_TYPES = ["generation", "prices"]
 
 def parse_xml_to_records(xml_path: Path, data_type: str) -> list[dict]:
     try:
-        tree = ET.parse(xml_path)
+        with open_raw(xml_path) as source:
+            tree = ET.parse(source)
         root = tree.getroot()
-        country_code = xml_path.stem.split("_")[-1]
+        country_code = raw_country(xml_path)
         records = []
 
         for timeseries in root.findall(".//{*}TimeSeries"):
@@ -67,43 +108,441 @@ def parse_xml_to_records(xml_path: Path, data_type: str) -> list[dict]:
         return []
 
 
+# ======================================================
+# Streaming Parsing Logic
+# ======================================================
+
+# Domain tags carrying the bidding zone, in order of preference
+DOMAIN_TAGS = [
+    "in_Domain.mRID",
+    "inBiddingZone_Domain.mRID",
+    "out_Domain.mRID",
+    "outBiddingZone_Domain.mRID",
+]
+
+
+def iter_xml_batches(
+    xml_path,
+    data_type: str,
+    batch_size: int = BATCH_SIZE,
+    country_code: str | None = None,
+    since=None,
+):
+    """
+    Streams an ENTSO-E document with iterparse and yields columnar batches:
+
+        {"series": [(country, bidding_zone, psr_type, start_time, resolution), ...],
+         "counts": int64 array (points per series entry),
+         "position": int32 array,
+         "value": float64 array}
+
+    Namespaced tag names are resolved once from the root element and every
+    Point is released as soon as it has been read, so memory stays bounded
+    by batch_size regardless of the file size.
+
+    xml_path may be a plain .xml or a compressed .xml.zst document (streamed
+    through the decompressor), or a binary file object, in which case
+    country_code must be given (it is normally taken from the file name).
+
+    since(psr_type) may return a UTC datetime per series: Points whose
+    interval starts before it are skipped without being stored (intraday
+    polls only keep what is newer than the loaded watermark).
+    """
+    if isinstance(xml_path, (str, Path)):
+        with open_raw(xml_path) as source:
+            yield from iter_xml_batches(
+                source,
+                data_type,
+                batch_size,
+                country_code or raw_country(xml_path),
+                since,
+            )
+        return
+
+    context = ET.iterparse(xml_path, events=("start", "end"))
+    _, root = next(context)
+
+    namespace = root.tag[1 : root.tag.index("}")] if root.tag.startswith("{") else ""
+
+    def q(tag):
+        return f"{{{namespace}}}{tag}" if namespace else tag
+
+    TIMESERIES, PERIOD, POINT = q("TimeSeries"), q("Period"), q("Point")
+    START, RESOLUTION, PSR_TYPE = q("start"), q("resolution"), q("psrType")
+    POSITION = q("position")
+    VALUE = q("price.amount") if data_type == "prices" else q("quantity")
+    DOMAINS = {q(tag): rank for rank, tag in enumerate(DOMAIN_TAGS)}
+
+    series, counts = [], []
+    positions, values = array("i"), array("d")
+
+    domains = {}
+    psr_type = "N/A"
+    period = None
+    start_time = resolution = None
+    run_count = 0
+    position = value = None
+    first_position = None
+
+    def period_first_position():
+        """Lowest position at or after since(psr_type) in the current Period."""
+        threshold = since(psr_type) if since else None
+        if threshold is None:
+            return 0
+        step = parse_resolution(resolution)
+        return -(-(threshold - parse_entsoe_time(start_time)) // step) + 1
+
+    def close_run():
+        nonlocal run_count
+        if run_count:
+            bidding_zone = domains[min(domains)] if domains else "Unknown"
+            series.append(
+                (country_code, bidding_zone, psr_type, start_time, resolution)
+            )
+            counts.append(run_count)
+            run_count = 0
+
+    def take_batch():
+        nonlocal series, counts, positions, values
+        batch = {
+            "series": series,
+            "counts": np.asarray(counts, dtype=np.int64),
+            "position": np.frombuffer(positions, dtype=np.int32).copy(),
+            "value": np.frombuffer(values, dtype=np.float64).copy(),
+        }
+        series, counts = [], []
+        positions, values = array("i"), array("d")
+        return batch
+
+    for event, elem in context:
+        tag = elem.tag
+
+        if event == "start":
+            if tag == TIMESERIES:
+                domains, psr_type = {}, "N/A"
+            elif tag == PERIOD:
+                period = elem
+                start_time = resolution = first_position = None
+            continue
+
+        if tag == POINT:
+            if first_position is None:
+                first_position = period_first_position()
+            if value is not None and position >= first_position:
+                positions.append(position)
+                values.append(value)
+                run_count += 1
+            position = value = None
+            # Release the point immediately; the Period only keeps its header
+            period.remove(elem)
+            if len(positions) >= batch_size:
+                close_run()
+                yield take_batch()
+        elif tag == POSITION:
+            position = int(elem.text)
+        elif tag == VALUE:
+            value = float(elem.text)
+        elif period is not None and tag == START:
+            start_time = elem.text
+        elif period is not None and tag == RESOLUTION:
+            resolution = elem.text
+        elif tag == PERIOD:
+            close_run()
+            period = None
+        elif tag == PSR_TYPE:
+            psr_type = elem.text
+        elif tag in DOMAINS:
+            domains[DOMAINS[tag]] = elem.text
+        elif tag == TIMESERIES:
+            root.clear()
+
+    close_run()
+    if counts:
+        yield take_batch()
+
+
+def merge_batches(batches: list[dict]) -> dict | None:
+    """Concatenates columnar batches (from one or many files) into one chunk."""
+    if not batches:
+        return None
+    return {
+        "series": [entry for batch in batches for entry in batch["series"]],
+        "counts": np.concatenate([batch["counts"] for batch in batches]),
+        "position": np.concatenate([batch["position"] for batch in batches]),
+        "value": np.concatenate([batch["value"] for batch in batches]),
+    }
+
+
+def empty_chunk() -> dict:
+    """The chunk of a valid document without Points (acknowledgement, empty zone)."""
+    return {
+        "series": [],
+        "counts": np.empty(0, dtype=np.int64),
+        "position": np.empty(0, dtype=np.int32),
+        "value": np.empty(0, dtype=np.float64),
+    }
+
+
+def batch_to_frame(batch: dict, data_type: str) -> pd.DataFrame:
+    """Expands a columnar batch or merged chunk into the parsed-record layout."""
+    codes = np.repeat(np.arange(len(batch["series"])), batch["counts"])
+    if len(batch["series"]):
+        meta = np.array(batch["series"], dtype=object)[codes]
+    else:
+        meta = np.empty((0, 5), dtype=object)
+
+    return pd.DataFrame(
+        {
+            "country": meta[:, 0],
+            "bidding_zone": meta[:, 1],
+            "type": data_type,
+            "psr_type": meta[:, 2],
+            "start_time": meta[:, 3],
+            "resolution": meta[:, 4],
+            "position": batch["position"],
+            "value": batch["value"],
+        },
+        columns=RECORD_COLUMNS,
+    )
+
+
+def parse_file_to_chunk(xml_path: Path, data_type: str) -> dict | None:
+    """
+    Parses one file into a single columnar chunk. Used as the process-pool
+    worker: NumPy arrays and a short series table pickle far smaller than
+    per-point dicts. A document without Points gives an empty chunk; None
+    means the file could not be parsed (it is retried on the next run).
+    """
+    try:
+        return merge_batches(list(iter_xml_batches(xml_path, data_type))) or empty_chunk()
+    except Exception as e:
+        print(f"   ⚠️ Erro ao processar {xml_path.name}: {e}")
+        return None
+
+
+def parse_file_timed(xml_path: Path, data_type: str) -> tuple[dict | None, float]:
+    """parse_file_to_chunk plus the time it took, measured inside the worker."""
+    started = time.perf_counter()
+    chunk = parse_file_to_chunk(xml_path, data_type)
+    return chunk, time.perf_counter() - started
+
+
+def parse_document_to_chunk(
+    xml_text: str, data_type: str, country_code: str, since=None
+) -> dict:
+    """
+    Parses an in-memory document (e.g. straight from the fetcher) into a
+    chunk, optionally only the Points from since(psr_type) on.
+    """
+    source = io.BytesIO(xml_text.encode("utf-8"))
+    batches = iter_xml_batches(source, data_type, country_code=country_code, since=since)
+    return merge_batches(list(batches)) or empty_chunk()
+
+
+def parse_xml_to_frame(xml_path: Path, data_type: str) -> pd.DataFrame | None:
+    """Streaming counterpart of parse_xml_to_records returning a DataFrame."""
+    chunk = parse_file_to_chunk(xml_path, data_type)
+    if chunk is None:
+        return None
+    return batch_to_frame(chunk, data_type)
+
+
 # ======================================================
 # Main Execution
 # ======================================================
 
 
-def main():
+def parse_args():
+    parser = argparse.ArgumentParser(description="Parse raw ENTSO-E XML into CSV.")
+    parser.add_argument("date", nargs="?", help="Target date (YYYY-MM-DD)")
+    parser.add_argument("--start", help="Range mode: first day (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Range mode: last day, inclusive (YYYY-MM-DD)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of parser processes (1 = parse in this process)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=SUPPORTED_FORMATS,
+        default=PROCESSED_FORMAT,
+        help="Output format for parsed datasets",
+    )
+    parser.add_argument(
+        "--country",
+        help="Only parse this country's file and write parsed_{category}_{country}",
+    )
+    parser.add_argument("--category", choices=DATA_TYPES, help="Only parse this category")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-parse partitions even if the manifest says they are up to date",
+    )
+    args = parser.parse_args()
+
+    if bool(args.start) != bool(args.end):
+        parser.error("--start and --end must be used together")
+    return args
+
+
+def target_days(args) -> list[str]:
+    """Returns the YYYY/MM/DD partitions to parse."""
+    if args.start:
+        first = datetime.strptime(args.start, "%Y-%m-%d")
+        last = datetime.strptime(args.end, "%Y-%m-%d")
+        return [
+            (first + timedelta(days=offset)).strftime("%Y/%m/%d")
+            for offset in range((last - first).days + 1)
+        ]
     # Pega a data via argumento (ex: 2026-02-01) ou usa fallback
-    if len(sys.argv) > 1:
-        target_date_raw = sys.argv[1]
-        target_date = target_date_raw.replace("-", "/")
-    else:
-        target_date = "2026/02/01"
+    if args.date:
+        return [args.date.replace("-", "/")]
+    return ["2026/02/01"]
 
-    print(f"🧩 Starting Parsing for date: {target_date}")
 
-    for dtype in DATA_TYPES:
-        day_dir = RAW_BASE_DIR / dtype / target_date
+def write_parsed_partition(
+    dtype: str,
+    target_date: str,
+    chunks: list[dict],
+    fmt: str | None = None,
+    country: str | None = None,
+):
+    """
+    Merges the chunks of one day/category once and writes parsed_{dtype}
+    (parsed_{dtype}_{country} for a single-country run).
+    Returns the parsed frame, or None when there is nothing to write.
+    """
+    merged = merge_batches([chunk for chunk in chunks if chunk is not None])
+    if merged is None or not len(merged["value"]):
+        return None
 
-        if not day_dir.exists():
-            print(
-                f"⚠️ No raw data found for {dtype} on {target_date} em: {day_dir.absolute()}"
-            )
+    df = batch_to_frame(merged, dtype)
+    output_dir = PROCESSED_BASE_DIR / dtype / target_date
+    name = dataset_name("parsed", dtype, country)
+    output_path = write_dataset(df, output_dir, name, fmt)
+    print(f"✅ Saved {len(df)} rows to {output_path.absolute()}")
+    return df
+
+
+def main():
+    args = parse_args()
+    days = target_days(args)
+
+    print(f"🧩 Starting Parsing for: {days[0]} → {days[-1]} ({args.workers} worker(s))")
+
+    # Collect every file of every partition so the whole range shares one pool
+    dtypes = [args.category] if args.category else DATA_TYPES
+
+    jobs = defaultdict(list)  # (dtype, day) -> list of xml files
+    for target_date in days:
+        for dtype in dtypes:
+            day_dir = RAW_BASE_DIR / dtype / target_date
+
+            if not day_dir.exists():
+                print(
+                    f"⚠️ No raw data found for {dtype} on {target_date} em: {day_dir.absolute()}"
+                )
+                continue
+
+            jobs[(dtype, target_date)] = list_raw_documents(day_dir, args.country)
+
+    # Skip partitions whose raw files are unchanged since the last parse
+    params = {"version": STAGE_VERSION, "format": args.format}
+    tracking = {}  # (dtype, day) -> (manifest, step, input fingerprints)
+    for key in list(jobs):
+        dtype, target_date = key
+        manifest = PartitionManifest(PROCESSED_BASE_DIR / dtype / target_date)
+        step = f"parse:{dataset_name('parsed', dtype, args.country)}"
+        fingerprints = manifest.fingerprints(jobs[key])
+        if not args.force and manifest.is_current(step, fingerprints, params):
+            print(f"⏭️ Unchanged, skipping {dtype} on {target_date}")
+            del jobs[key]
             continue
+        tracking[key] = (manifest, step, fingerprints)
+
+    def record_file(key, xml_file, chunk, seconds):
+        """One metrics unit per raw file (= per country)."""
+        unit = Measurement(
+            "parse",
+            date=key[1],
+            category=key[0],
+            country=raw_country(xml_file),
+        )
+        unit.phases["parse"] = seconds
+        unit.bytes = xml_file.stat().st_size
+        if chunk is None:
+            unit.status = "failed"
+        else:
+            unit.rows = len(chunk["value"])
+        metrics.add(unit, wall_seconds=seconds)
+
+    def finish_partition(key, chunks):
+        dtype, target_date = key
+        manifest, step, fingerprints = tracking[key]
+        name = dataset_name("parsed", dtype, args.country)
+        output_path = dataset_path(manifest.directory, name, args.format)
+
+        with metrics.measure(
+            "write", date=target_date, category=dtype, country=args.country
+        ) as unit:
+            df = write_parsed_partition(*key, chunks, args.format, args.country)
+            if df is not None:
+                unit.rows = len(df)
+                unit.bytes = output_path.stat().st_size
+        if any(chunk is None for chunk in chunks):
+            return  # A file failed to parse: leave the manifest so it is retried
+
+        outputs, rows = [], 0
+        if df is not None:
+            outputs = [output_path.name]
+            rows = len(df)
+        else:
+            # Nothing left to parse: drop the output of an earlier parse
+            output_path.unlink(missing_ok=True)
+        manifest.record(step, fingerprints, params, outputs, rows)
+
+    with StageRun(
+        "parse", date=args.date, category=args.category, country=args.country
+    ) as metrics:
+        if args.workers <= 1:
+            for key, xml_files in jobs.items():
+                chunks = []
+                for xml_file in xml_files:
+                    print(f"📄 Parsing {xml_file.name}")
+                    chunk, seconds = parse_file_timed(xml_file, key[0])
+                    record_file(key, xml_file, chunk, seconds)
+                    chunks.append(chunk)
+                finish_partition(key, chunks)
+            return
+
+        # Partitions without files get no futures: finish them right away,
+        # as the sequential mode does
+        for key, xml_files in jobs.items():
+            if not xml_files:
+                finish_partition(key, [])
 
-        all_day_records = []
-        for xml_file in day_dir.glob("*.xml"):
-            print(f"📄 Parsing {xml_file.name}")
-            all_day_records.extend(parse_xml_to_records(xml_file, dtype))
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(parse_file_timed, xml_file, key[0]): (key, index)
+                for key, xml_files in jobs.items()
+                for index, xml_file in enumerate(xml_files)
+            }
+            remaining = {key: len(xml_files) for key, xml_files in jobs.items()}
+            partition_chunks = defaultdict(dict)
 
-        if all_day_records:
-            df = pd.DataFrame(all_day_records)
-            output_dir = PROCESSED_BASE_DIR / dtype / target_date
-            output_dir.mkdir(parents=True, exist_ok=True)
+            for future in as_completed(futures):
+                key, index = futures[future]
+                chunk, seconds = future.result()
+                record_file(key, jobs[key][index], chunk, seconds)
+                partition_chunks[key][index] = chunk
+                remaining[key] -= 1
 
-            output_path = output_dir / f"parsed_{dtype}.csv"
-            df.to_csv(output_path, index=False)
-            print(f"✅ Saved {len(df)} rows to {output_path.absolute()}")
+                # Write each partition as soon as all of its files are parsed,
+                # keeping the file order of the sequential mode
+                if remaining[key] == 0:
+                    chunks = partition_chunks.pop(key)
+                    finish_partition(key, [chunks[i] for i in sorted(chunks)])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,324 @@
+"""
+Compact, time-partitioned schema for ENTSO-E facts.
+
+fact_generation / fact_prices are range-partitioned by month on
+interval_start. The repeated reference attributes live in small dimension
+tables (dim_country, dim_psr_type) keyed by SMALLINT ids, the resolution is
+stored as minutes and values use real / double precision instead of NUMERIC.
+Monthly partitions are created on demand by the loader.
+"""
+
+import pandas as pd
+
+from data.reference.registry import get_registry
+from processing.pg_copy import copy_frame
+from processing.resolve_timestamps import resolution_steps_ns
+
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS dim_country (
+        country_id SMALLINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        country CHAR(2) NOT NULL UNIQUE,
+        country_name VARCHAR(50),
+        bidding_zone VARCHAR(50)
+    );
+
+    CREATE TABLE IF NOT EXISTS dim_psr_type (
+        psr_type_id SMALLINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        psr_type VARCHAR(10) NOT NULL UNIQUE,
+        generation_type VARCHAR(100)
+    );
+
+    CREATE TABLE IF NOT EXISTS fact_generation (
+        country_id SMALLINT NOT NULL,
+        psr_type_id SMALLINT NOT NULL,
+        interval_start TIMESTAMPTZ NOT NULL,
+        resolution_minutes SMALLINT NOT NULL,
+        quantity_mw REAL,
+        revision SMALLINT NOT NULL DEFAULT 0,
+        ingested_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (country_id, psr_type_id, interval_start, resolution_minutes)
+    ) PARTITION BY RANGE (interval_start);
+
+    CREATE TABLE IF NOT EXISTS fact_prices (
+        country_id SMALLINT NOT NULL,
+        interval_start TIMESTAMPTZ NOT NULL,
+        resolution_minutes SMALLINT NOT NULL,
+        price_eur DOUBLE PRECISION,
+        revision SMALLINT NOT NULL DEFAULT 0,
+        ingested_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (country_id, interval_start, resolution_minutes)
+    ) PARTITION BY RANGE (interval_start);
+
+    -- Propagated to every monthly partition; match the rollup queries
+    CREATE INDEX IF NOT EXISTS idx_fact_generation_country_day
+        ON fact_generation (country_id, ((interval_start AT TIME ZONE 'UTC')::date));
+    CREATE INDEX IF NOT EXISTS idx_fact_generation_interval_start_brin
+        ON fact_generation USING BRIN (interval_start);
+    CREATE INDEX IF NOT EXISTS idx_fact_prices_country_day
+        ON fact_prices (country_id, ((interval_start AT TIME ZONE 'UTC')::date));
+    CREATE INDEX IF NOT EXISTS idx_fact_prices_interval_start_brin
+        ON fact_prices USING BRIN (interval_start);
+
+    -- Flat, human-readable views over the compact facts
+    CREATE OR REPLACE VIEW fact_generation_enriched AS
+    SELECT c.country, c.country_name, c.bidding_zone, p.psr_type, p.generation_type,
+           f.interval_start, f.resolution_minutes, f.quantity_mw, f.revision, f.ingested_at
+    FROM fact_generation f
+    JOIN dim_country c USING (country_id)
+    JOIN dim_psr_type p USING (psr_type_id);
+
+    CREATE OR REPLACE VIEW fact_prices_enriched AS
+    SELECT c.country, c.country_name, c.bidding_zone,
+           f.interval_start, f.resolution_minutes, f.price_eur, f.revision, f.ingested_at
+    FROM fact_prices f
+    JOIN dim_country c USING (country_id);
+"""
+
+# Per-category layout of the partitioned facts
+FACT_SCHEMAS = {
+    "generation": {
+        "table_name": "fact_generation",
+        "staging_sql": """
+            CREATE TEMP TABLE staging_fact_generation (
+                country CHAR(2),
+                psr_type VARCHAR(10),
+                generation_type VARCHAR(100),
+                interval_start TIMESTAMPTZ,
+                resolution_minutes SMALLINT,
+                quantity_mw REAL
+            ) ON COMMIT DROP;
+        """,
+        "staging_columns": [
+            "country",
+            "psr_type",
+            "generation_type",
+            "interval_start",
+            "resolution_minutes",
+            "quantity_mw",
+        ],
+        "key_columns": ["country_id", "psr_type_id", "interval_start", "resolution_minutes"],
+        "value_column": "quantity_mw",
+        "select_sql": """
+            SELECT c.country_id, p.psr_type_id, s.interval_start,
+                   s.resolution_minutes, s.quantity_mw
+            FROM staging_fact_generation s
+            JOIN dim_country c ON c.country = s.country
+            JOIN dim_psr_type p ON p.psr_type = s.psr_type
+        """,
+        "insert_columns": [
+            "country_id",
+            "psr_type_id",
+            "interval_start",
+            "resolution_minutes",
+            "quantity_mw",
+        ],
+    },
+    "prices": {
+        "table_name": "fact_prices",
+        "staging_sql": """
+            CREATE TEMP TABLE staging_fact_prices (
+                country CHAR(2),
+                interval_start TIMESTAMPTZ,
+                resolution_minutes SMALLINT,
+                price_eur DOUBLE PRECISION
+            ) ON COMMIT DROP;
+        """,
+        "staging_columns": [
+            "country",
+            "interval_start",
+            "resolution_minutes",
+            "price_eur",
+        ],
+        "key_columns": ["country_id", "interval_start", "resolution_minutes"],
+        "value_column": "price_eur",
+        "select_sql": """
+            SELECT c.country_id, s.interval_start, s.resolution_minutes, s.price_eur
+            FROM staging_fact_prices s
+            JOIN dim_country c ON c.country = s.country
+        """,
+        "insert_columns": ["country_id", "interval_start", "resolution_minutes", "price_eur"],
+    },
+}
+
+
+# -----------------------------
+# Schema & dimensions
+# -----------------------------
+def ensure_schema(cur):
+    """
+    Creates the partitioned parents and dimensions and seeds the dimensions.
+    Existing codes are updated and only missing ones inserted: an INSERT
+    draws an identity value for every candidate row, even one that ends in
+    a conflict, and the SMALLINT ids would run out.
+    """
+    cur.execute(SCHEMA_SQL)
+
+    registry = get_registry()
+    countries = [
+        (code, meta["country_name"], meta["bidding_zone"])
+        for code, meta in registry.countries.items()
+    ]
+    cur.executemany(
+        """
+        UPDATE dim_country SET country_name = %(name)s, bidding_zone = %(zone)s
+        WHERE country = %(code)s;
+        INSERT INTO dim_country (country, country_name, bidding_zone)
+        SELECT %(code)s, %(name)s, %(zone)s
+        WHERE NOT EXISTS (SELECT 1 FROM dim_country WHERE country = %(code)s)
+        ON CONFLICT (country) DO NOTHING;
+        """,
+        [{"code": code, "name": name, "zone": zone} for code, name, zone in countries],
+    )
+
+    cur.executemany(
+        """
+        UPDATE dim_psr_type SET generation_type = %(name)s WHERE psr_type = %(code)s;
+        INSERT INTO dim_psr_type (psr_type, generation_type)
+        SELECT %(code)s, %(name)s
+        WHERE NOT EXISTS (SELECT 1 FROM dim_psr_type WHERE psr_type = %(code)s)
+        ON CONFLICT (psr_type) DO NOTHING;
+        """,
+        [
+            {"code": code, "name": meta["generation_type"]}
+            for code, meta in registry.psr_types.items()
+        ],
+    )
+
+
+def schema_definition() -> str:
+    """
+    What ensure_schema() creates and seeds, as text: its migration checksum
+    changes (and the dimensions are re-seeded) when a reference file does.
+    """
+    registry = get_registry()
+    return SCHEMA_SQL + repr(sorted(registry.countries.items())) + repr(
+        sorted(registry.psr_types.items())
+    )
+
+
+def ensure_partitions(cur, table_name: str, interval_starts: pd.Series):
+    """
+    Creates the monthly partitions covering every timestamp in the frame.
+    Existing partitions are skipped without DDL; missing ones are created
+    under an advisory lock so concurrent loads of one table do not race.
+    """
+    months = (
+        interval_starts.dt.tz_convert("UTC").dt.tz_localize(None).dt.to_period("M").unique()
+    )
+    for month in sorted(months.dropna()):
+        lower = month.start_time
+        upper = (month + 1).start_time
+        partition = f"{table_name}_{lower:%Y_%m}"
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL;", (partition,))
+        if cur.fetchone()[0]:
+            continue
+        cur.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%s));", (f"partitions:{table_name}",)
+        )
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {partition}
+            PARTITION OF {table_name}
+            FOR VALUES FROM ('{lower:%Y-%m-%d} 00:00+00') TO ('{upper:%Y-%m-%d} 00:00+00');
+            """
+        )
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+def begin_load(cur, category: str, method: str = "copy"):
+    """
+    Prepares a load into the partitioned facts: creates the temporary staging
+    table that stage_frame() fills. The schema itself is created once by the
+    loader's migrations (ensure_schema).
+    method "copy" inserts new keys only; "revise" also updates changed values.
+    """
+    if method not in ("copy", "revise"):
+        raise ValueError(f"Load method '{method}' is not supported by the partitioned schema")
+
+    cur.execute(FACT_SCHEMAS[category]["staging_sql"])
+
+
+def stage_frame(cur, df: pd.DataFrame, category: str):
+    """COPYs one enriched frame (or chunk) into the staging table."""
+    fact = FACT_SCHEMAS[category]
+    table = fact["table_name"]
+    ensure_partitions(cur, table, df["interval_start"])
+
+    frame = df.copy()
+    frame["resolution_minutes"] = resolution_steps_ns(frame["resolution"]) // 60_000_000_000
+    copy_frame(cur, frame, f"staging_{table}", fact["staging_columns"])
+
+
+def finish_load(cur, category: str, method: str, total_rows: int) -> dict:
+    """Merges the staging table into the facts. Returns the row counts."""
+    fact = FACT_SCHEMAS[category]
+    table = fact["table_name"]
+    staging = f"staging_{table}"
+
+    # Codes missing from the reference files still get a dimension row.
+    # Only missing codes reach the INSERT, so loads do not use up identity values
+    cur.execute(
+        f"""
+        INSERT INTO dim_country (country)
+        SELECT DISTINCT s.country FROM {staging} s
+        WHERE NOT EXISTS (SELECT 1 FROM dim_country d WHERE d.country = s.country)
+        ON CONFLICT (country) DO NOTHING;
+        """
+    )
+    if category == "generation":
+        cur.execute(
+            f"""
+            INSERT INTO dim_psr_type (psr_type, generation_type)
+            SELECT DISTINCT ON (s.psr_type) s.psr_type, s.generation_type FROM {staging} s
+            WHERE NOT EXISTS (SELECT 1 FROM dim_psr_type d WHERE d.psr_type = s.psr_type)
+            ON CONFLICT (psr_type) DO NOTHING;
+            """
+        )
+
+    key = ", ".join(fact["key_columns"])
+    columns = ", ".join(fact["insert_columns"])
+    value = fact["value_column"]
+
+    if method == "copy":
+        conflict_action = "DO NOTHING"
+    else:
+        conflict_action = f"""DO UPDATE
+            SET {value} = EXCLUDED.{value}, revision = target.revision + 1
+            WHERE target.{value} IS DISTINCT FROM EXCLUDED.{value}"""
+
+    cur.execute(
+        f"""
+        WITH incoming AS (
+            SELECT DISTINCT ON ({key}) *
+            FROM ({fact['select_sql']}) resolved
+            ORDER BY {key}
+        ),
+        merged AS (
+            INSERT INTO {table} AS target ({columns})
+            SELECT {columns} FROM incoming
+            ON CONFLICT ({key}) {conflict_action}
+            -- xmax is not available on partitioned tables; updated rows
+            -- always carry revision >= 1
+            RETURNING (revision = 0) AS is_new
+        )
+        SELECT
+            COUNT(*) FILTER (WHERE is_new),
+            COUNT(*) FILTER (WHERE NOT is_new),
+            (SELECT COUNT(*) FROM incoming)
+        FROM merged;
+        """
+    )
+    new, changed, distinct_rows = cur.fetchone()
+
+    if method == "copy":
+        return {"inserted": new, "skipped": total_rows - new}
+    return {"new": new, "changed": changed, "unchanged": distinct_rows - new - changed}
+
+
+def load_frame(cur, df: pd.DataFrame, category: str, method: str = "copy") -> dict:
+    """Loads one enriched frame into the partitioned facts."""
+    begin_load(cur, category, method)
+    stage_frame(cur, df, category)
+    return finish_load(cur, category, method, len(df))
@@ -0,0 +1,40 @@
+"""
+Resolves ENTSO-E (start_time, resolution, position) triples into the real
+start timestamp of every interval:
+
+    interval_start = start_time + (position - 1) x resolution
+
+Each distinct start_time and resolution string is parsed once; the per-row
+work is plain NumPy integer arithmetic.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def resolution_steps_ns(resolutions: pd.Series) -> np.ndarray:
+    """Returns the step of every row in nanoseconds (PT15M, PT60M, P1D, ...)."""
+    codes, uniques = pd.factorize(resolutions)
+    steps = np.array([pd.Timedelta(value).value for value in uniques], dtype=np.int64)
+    return steps[codes]
+
+
+def parse_start_times(start_times: pd.Series) -> np.ndarray:
+    """Parses ISO-8601 period starts as UTC nanosecond epochs."""
+    codes, uniques = pd.factorize(start_times)
+    parsed = pd.to_datetime(pd.Series(uniques), utc=True)
+    return parsed.to_numpy(dtype="datetime64[ns]").view(np.int64)[codes]
+
+
+def add_interval_start(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds a timezone-aware (UTC) interval_start column to a parsed dataset."""
+    if df.empty:
+        df["interval_start"] = pd.Series(dtype="datetime64[ns, UTC]")
+        return df
+
+    offsets = (df["position"].to_numpy(dtype=np.int64) - 1) * resolution_steps_ns(
+        df["resolution"]
+    )
+    epochs = parse_start_times(df["start_time"]) + offsets
+    df["interval_start"] = pd.to_datetime(epochs, unit="ns", utc=True)
+    return df
@@ -0,0 +1,189 @@
+"""
+Pre-aggregated daily/hourly rollups for the analytics views.
+
+Each fact table is aggregated on its own (generation per country/day and
+country/day/hour, prices per country/day) before anything is joined, so the
+views in sql_queries/ join a handful of rows per country-day instead of the
+cross product of all generation and price points.
+
+The sources are the hourly tables (energy_*_hourly), which the loader fills
+for both schema modes. Every zone contributes one row per hour there, whatever
+its PT15M/PT30M/PT60M resolution, so generation sums are MWh and price
+averages are time-weighted and comparable across countries.
+
+The loader refreshes only the (country, day) pairs it has just written.
+Days are UTC calendar days of interval_start. Run this module directly to
+rebuild everything after a schema change or backfill.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+ROLLUP_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS rollup_daily_generation (
+        country CHAR(2) NOT NULL,
+        day DATE NOT NULL,
+        total_gen_mw NUMERIC,
+        total_solar_mw NUMERIC,
+        points INT NOT NULL,
+        refreshed_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (country, day)
+    );
+
+    CREATE TABLE IF NOT EXISTS rollup_hourly_generation (
+        country CHAR(2) NOT NULL,
+        day DATE NOT NULL,
+        hour_of_day SMALLINT NOT NULL,
+        total_gen_mw NUMERIC,
+        solar_mw NUMERIC,
+        points INT NOT NULL,
+        refreshed_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (country, day, hour_of_day)
+    );
+
+    CREATE TABLE IF NOT EXISTS rollup_daily_prices (
+        country CHAR(2) NOT NULL,
+        day DATE NOT NULL,
+        avg_price_eur NUMERIC,
+        min_price_eur NUMERIC,
+        max_price_eur NUMERIC,
+        points INT NOT NULL,
+        refreshed_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (country, day)
+    );
+"""
+
+# UTC calendar day of a point (immutable, so it can also back an index)
+DAY_EXPR = "(interval_start AT TIME ZONE 'UTC')::date"
+HOUR_EXPR = "EXTRACT(HOUR FROM interval_start AT TIME ZONE 'UTC')::smallint"
+# PSR type B16 = Solar; an equality test can use the loader's partial index
+SOLAR_FILTER = "psr_type = 'B16'"
+
+# Hourly source tables (see HOURLY_TABLE_SCHEMAS in the loader)
+SOURCES = {"generation": "energy_generation_hourly", "prices": "energy_prices_hourly"}
+
+# rollup table -> (source category, output columns, SELECT expressions, GROUP BY)
+# Summing hourly mean MW over a day gives MWh (total_gen_mw, total_solar_mw)
+ROLLUPS = {
+    "rollup_daily_generation": (
+        "generation",
+        "country, day, total_gen_mw, total_solar_mw, points",
+        f"""country, {DAY_EXPR},
+            SUM(quantity_mw),
+            SUM(quantity_mw) FILTER (WHERE {SOLAR_FILTER}),
+            SUM(points)""",
+        "1, 2",
+    ),
+    "rollup_hourly_generation": (
+        "generation",
+        "country, day, hour_of_day, total_gen_mw, solar_mw, points",
+        f"""country, {DAY_EXPR}, {HOUR_EXPR},
+            SUM(quantity_mw),
+            SUM(quantity_mw) FILTER (WHERE {SOLAR_FILTER}),
+            SUM(points)""",
+        "1, 2, 3",
+    ),
+    "rollup_daily_prices": (
+        "prices",
+        "country, day, avg_price_eur, min_price_eur, max_price_eur, points",
+        f"""country, {DAY_EXPR},
+            AVG(price_eur),
+            MIN(price_min_eur),
+            MAX(price_max_eur),
+            SUM(points)""",
+        "1, 2",
+    ),
+}
+
+
+def touched_days(df: pd.DataFrame) -> list[tuple[str, object]]:
+    """Distinct (country, UTC day) pairs present in a loaded frame."""
+    days = df["interval_start"].dt.tz_convert("UTC").dt.date
+    pairs = pd.DataFrame({"country": df["country"].astype(str), "day": days})
+    return list(pairs.drop_duplicates().itertuples(index=False, name=None))
+
+
+def refresh_rollups(cur, category: str, pairs):
+    """
+    Recomputes the rollups fed by one category for the given (country, day)
+    pairs. Pass pairs=None to rebuild every day. The rollup tables must
+    exist (ROLLUP_SCHEMA_SQL, applied by the loader's migrations).
+
+    Refreshes of one category are serialized with an advisory lock held until
+    commit, so parallel loads never delete and re-insert the same
+    (country, day) at the same time.
+    """
+    source = SOURCES[category]
+
+    if pairs is not None and not pairs:
+        return
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s));", (f"rollups:{category}",))
+
+    for table, (rollup_category, columns, select_list, group_by) in ROLLUPS.items():
+        if rollup_category != category:
+            continue
+
+        if pairs is None:
+            cur.execute(f"TRUNCATE {table};")
+            where, params = "", ()
+        else:
+            countries = [country for country, _ in pairs]
+            days = [day for _, day in pairs]
+            cur.execute(
+                f"""
+                DELETE FROM {table} r
+                USING unnest(%s::char(2)[], %s::date[]) AS t(country, day)
+                WHERE r.country = t.country AND r.day = t.day;
+                """,
+                (countries, days),
+            )
+            # The ANY() prefilters let PostgreSQL use the (country, day) index
+            where = f"""
+                WHERE country = ANY(%s::char(2)[])
+                  AND {DAY_EXPR} = ANY(%s::date[])
+                  AND (country, {DAY_EXPR}) IN (
+                      SELECT * FROM unnest(%s::char(2)[], %s::date[])
+                  )
+            """
+            params = (sorted(set(countries)), sorted(set(days)), countries, days)
+
+        cur.execute(
+            f"""
+            INSERT INTO {table} ({columns})
+            SELECT {select_list}
+            FROM {source}
+            {where}
+            GROUP BY {group_by};
+            """,
+            params,
+        )
+
+
+# -----------------------------
+# Manual rebuild
+# -----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the analytics rollups.")
+    parser.parse_args()
+
+    sys.path.append(str(PROJECT_ROOT))
+    from processing.db import connection, migrate
+    from processing.load_generation_to_postgres import schema_migrations
+
+    print("🔁 Rebuilding rollups from the hourly tables")
+    with connection() as conn:
+        migrate(conn, schema_migrations(None))
+        with conn.cursor() as cur:
+            for category in ["generation", "prices"]:
+                refresh_rollups(cur, category, None)
+        conn.commit()
+    print("✨ Rollups rebuilt.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Intraday runner: polls ENTSO-E for the generation actuals published since
+the last load and appends them within minutes, instead of waiting for the
+03:00 run that loads the previous day.
+
+Each poll, in one process:
+* reads ingest_watermarks (latest interval_start loaded per country and PSR
+  type, advanced by every load, daily or intraday);
+* requests per zone only the hours from its earliest watermark on, leaving
+  out series that stopped publishing so they cannot hold the window back
+  (intraday_windows / fetch_intraday in ingestion/fetch_entsoe_data.py);
+* parses just the Points from each series' watermark hour on, so the work
+  of a poll follows the new data rather than the length of the day;
+* enriches, resamples onto the hourly grid and loads through the bulk
+  loader. The default "revise" method updates the hour that was still
+  filling up at the previous poll, and makes repeated polls idempotent.
+The responses are archived under data/raw/intraday/; the daily pipeline
+still writes the canonical daily partitions and datasets.
+
+Usage:
+    python processing/run_intraday.py [--country FR] [--workers 4]
+"""
+
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from ingestion import fetch_entsoe_data as fetcher
+from ingestion.entsoe_client import RateLimiter, build_session
+from ingestion.raw_archive import RAW_FORMAT, RAW_FORMATS
+from processing.db import connection, migrate
+from processing.enrich_generation_data import enrich_frame
+from processing.instrumentation import StageRun
+from processing.load_generation_to_postgres import (
+    LOAD_METHODS,
+    load_frames_to_postgres,
+    read_watermarks,
+    schema_migrations,
+)
+from processing.normalize_resolution import DEFAULT_GRID, resample_frame
+from processing.parse_generation_xml import (
+    batch_to_frame,
+    merge_batches,
+    parse_document_to_chunk,
+)
+
+
+def window_start(period: str) -> datetime:
+    return datetime.strptime(period, "%Y%m%d%H%M").replace(tzinfo=timezone.utc)
+
+
+def series_since(starts: dict, country_code: str, default: datetime):
+    """since() for the parser: the first interval to keep per PSR type of one zone."""
+    return lambda psr_type: starts.get((country_code, psr_type), default)
+
+
+def parse_polled(documents: dict, category: str, windows: dict, starts: dict):
+    """
+    Parses the polled documents, keeping only the Points from each series'
+    start on (PSR types without a recent watermark: the zone's window start).
+    Returns the parsed frame, or None when nothing new was published.
+    """
+    chunks = []
+    for country_code, xml_text in sorted(documents.items()):
+        since = series_since(starts, country_code, window_start(windows[country_code][0]))
+        chunks.append(parse_document_to_chunk(xml_text, category, country_code, since))
+    merged = merge_batches([chunk for chunk in chunks if chunk is not None])
+    if merged is None or not len(merged["value"]):
+        return None
+    return batch_to_frame(merged, category)
+
+
+def poll_category(
+    config,
+    countries,
+    polled_at,
+    executor,
+    session,
+    limiter,
+    metrics,
+    method="revise",
+    schema_mode="flat",
+    raw_format=None,
+) -> int:
+    """One intraday poll of a category. Returns the number of rows loaded."""
+    category = config["folder"]
+
+    with connection() as conn:
+        migrate(conn, schema_migrations(schema_mode))
+        watermarks = read_watermarks(conn, category)
+    windows, starts = fetcher.intraday_windows(countries, watermarks, polled_at)
+
+    with metrics.measure("fetch", category=category) as unit:
+        documents, success = fetcher.fetch_intraday(
+            windows,
+            config,
+            executor,
+            session,
+            limiter,
+            polled_at,
+            countries=countries,
+            metrics=metrics,
+            raw_format=raw_format,
+        )
+        unit.extra["documents"] = len(documents)
+    if not success:
+        raise RuntimeError(f"No {category} document could be downloaded.")
+
+    with metrics.measure("parse", category=category) as unit:
+        parsed = parse_polled(documents, category, windows, starts)
+        unit.rows = 0 if parsed is None else len(parsed)
+    if parsed is None:
+        print(f"💤 No new {category} points since the last poll.")
+        return 0
+    print(f"🧩 Parsed {len(parsed)} new {category} points.")
+
+    with metrics.measure("enrich", category=category) as unit:
+        enriched = enrich_frame(parsed, category)
+        unit.rows = len(enriched)
+
+    with metrics.measure("normalize", category=category) as unit:
+        hourly = resample_frame(enriched, category, DEFAULT_GRID)
+        unit.rows = len(hourly)
+
+    with metrics.measure("load", category=category) as unit:
+        with connection() as conn:
+            load_frames_to_postgres(
+                conn,
+                [enriched],
+                category,
+                method,
+                schema_mode,
+                unit=unit,
+                hourly=[hourly],
+            )
+    return len(enriched)
+
+
+def run_intraday(
+    country: str | None = None,
+    workers: int = fetcher.MAX_WORKERS,
+    rpm: float = fetcher.REQUESTS_PER_MINUTE,
+    method: str = "revise",
+    schema_mode: str = "flat",
+    raw_format: str | None = None,
+    now: datetime | None = None,
+) -> dict:
+    """
+    Runs one intraday poll of every category marked intraday in DATA_CONFIG.
+    Raises on failure so Airflow marks the task as failed.
+    Returns the number of rows loaded per category.
+    """
+    fetcher.require_api_key()
+    polled_at = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    countries, configs = fetcher.select_targets(country)
+
+    print(f"🚀 Intraday poll at {polled_at:%Y-%m-%d %H:%M} UTC ({workers} fetch worker(s))")
+
+    session = build_session(workers)
+    limiter = RateLimiter(rpm)
+    rows = {}
+    with StageRun(
+        "intraday", primary_step="load", date=f"{polled_at:%Y-%m-%d}", country=country
+    ) as metrics:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            for config in configs:
+                if config["intraday"]:
+                    rows[config["folder"]] = poll_category(
+                        config,
+                        countries,
+                        polled_at,
+                        executor,
+                        session,
+                        limiter,
+                        metrics,
+                        method=method,
+                        schema_mode=schema_mode,
+                        raw_format=raw_format,
+                    )
+
+        stages = [m for m in metrics.measurements if m.step != "download"]
+        print(
+            "⏱️ Stage timings: "
+            + " | ".join(f"{m.step}={m.elapsed():.2f}s" for m in stages)
+        )
+    return rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Poll ENTSO-E for the data published since the last load and load it."
+    )
+    parser.add_argument("--country", help="Only poll this country code (e.g. FR)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=fetcher.MAX_WORKERS,
+        help="Number of concurrent API requests",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=fetcher.REQUESTS_PER_MINUTE,
+        help="Requests-per-minute budget shared by all workers",
+    )
+    parser.add_argument(
+        "--method",
+        choices=sorted(LOAD_METHODS),
+        default="revise",
+        help="revise (default) updates the partly published hour of the previous poll",
+    )
+    parser.add_argument("--schema", choices=["flat", "partitioned"], default="flat")
+    parser.add_argument(
+        "--raw-format",
+        choices=RAW_FORMATS,
+        default=RAW_FORMAT,
+        help="xml: plain files; zst: deduplicated zstd archive (.xml.zst)",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rows = run_intraday(
+        args.country,
+        workers=args.workers,
+        rpm=args.rpm,
+        method=args.method,
+        schema_mode=args.schema,
+        raw_format=args.raw_format,
+    )
+    print(f"\n✨ Intraday poll finished: {rows}")
+
+
+if __name__ == "__main__":
+    main()
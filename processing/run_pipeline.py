@@ -0,0 +1,274 @@
+"""
+Single-process runner for the daily ENTSO-E pipeline.
+Chains fetch → parse → enrich → normalize → load for one day inside one interpreter:
+the downloaded documents and the parsed/enriched DataFrames are handed from
+stage to stage in memory, so pandas, .env and the reference CSVs are loaded
+once per run. The raw XML and the parsed/enriched datasets are still written
+to data/ as durable checkpoints (reruns, debugging, the standalone scripts),
+but no stage reads back what the previous one has just written.
+"""
+
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from ingestion import fetch_entsoe_data as fetcher
+from ingestion.entsoe_client import RateLimiter, build_session
+from ingestion.response_cache import ResponseCache
+from processing.enrich_generation_data import enrich_frame
+from processing.instrumentation import StageRun
+from processing.db import run_parallel
+from processing.load_generation_to_postgres import (
+    DEFAULT_LOAD_METHOD,
+    LOAD_METHODS,
+    load_frame_to_postgres,
+)
+from processing.manifest import PartitionManifest
+from processing.normalize_resolution import (
+    DEFAULT_GRID,
+    GRIDS,
+    normalize_params,
+    normalize_step,
+    resample_frame,
+)
+from processing.parse_generation_xml import (
+    DATA_TYPES,
+    PROCESSED_BASE_DIR,
+    parse_document_to_chunk,
+    write_parsed_partition,
+)
+from processing.storage import (
+    PROCESSED_FORMAT,
+    SUPPORTED_FORMATS,
+    dataset_name,
+    dataset_path,
+    write_dataset,
+)
+
+
+# ======================================================
+# Stages
+# ======================================================
+def fetch_stage(
+    target_date: datetime,
+    workers: int,
+    rpm: float,
+    use_cache: bool,
+    metrics: StageRun | None = None,
+):
+    """Downloads the day's documents. Returns {category: {country_code: xml}}."""
+    fetcher.require_api_key()
+
+    session = build_session(workers)
+    limiter = RateLimiter(rpm)
+    cache = ResponseCache(fetcher.CACHE_DIR) if use_cache else None
+    documents = {}
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        success = fetcher.fetch_daily(
+            target_date,
+            executor,
+            session,
+            limiter,
+            cache,
+            collected=documents,
+            metrics=metrics,
+        )
+
+    if cache is not None:
+        print(f"🗄️ Response cache: {cache.summary()}")
+    if not success:
+        raise RuntimeError("At least one category failed to download completely.")
+    return documents
+
+
+def parse_stage(documents: dict, day: str, fmt: str | None) -> dict:
+    """Parses the in-memory documents. Returns {category: parsed frame}."""
+    parsed = {}
+    for dtype in DATA_TYPES:
+        # Same country order as the file-based parser (sorted file names)
+        chunks = [
+            parse_document_to_chunk(xml_text, dtype, country_code)
+            for country_code, xml_text in sorted(documents.get(dtype, {}).items())
+        ]
+        df = write_parsed_partition(dtype, day, chunks, fmt)
+        if df is not None:
+            parsed[dtype] = df
+    return parsed
+
+
+def enrich_stage(parsed: dict, day: str, fmt: str | None) -> dict:
+    """Enriches the parsed frames. Returns {category: enriched frame}."""
+    enriched = {}
+    for category, df in parsed.items():
+        enriched_df = enrich_frame(df, category)
+        output_path = write_dataset(
+            enriched_df, PROCESSED_BASE_DIR / category / day, f"enriched_{category}", fmt
+        )
+        print(f"✅ Saved enriched {category} to: {output_path.absolute()}")
+        enriched[category] = enriched_df
+    return enriched
+
+
+def normalize_stage(enriched: dict, day: str, fmt: str | None) -> dict:
+    """
+    Resamples the enriched frames onto the hourly grid. Returns {category: frame}.
+    Recorded in the partition manifest like the standalone normalize stage,
+    so a later load_generation_to_postgres.py run accepts the hourly files.
+    """
+    hourly = {}
+    for category, df in enriched.items():
+        hourly_df = resample_frame(df, category, DEFAULT_GRID)
+        day_dir = PROCESSED_BASE_DIR / category / day
+        output_path = write_dataset(
+            hourly_df, day_dir, dataset_name(GRIDS[DEFAULT_GRID], category), fmt
+        )
+        print(f"✅ Saved hourly {category} to: {output_path.absolute()}")
+
+        manifest = PartitionManifest(day_dir)
+        manifest.record(
+            normalize_step(category),
+            manifest.fingerprints([dataset_path(day_dir, f"enriched_{category}", fmt)]),
+            normalize_params(fmt, [DEFAULT_GRID]),
+            [output_path.name],
+            len(hourly_df),
+        )
+        hourly[category] = hourly_df
+    return hourly
+
+
+def load_stage(enriched: dict, hourly: dict, method: str, schema_mode: str):
+    """
+    Loads the enriched frames and their hourly series into PostgreSQL, the
+    categories in parallel on separate pooled connections. Raises the first
+    failure after every category has finished.
+    """
+    jobs = {
+        category: partial(
+            load_frame_to_postgres,
+            df=df,
+            category=category,
+            method=method,
+            schema_mode=schema_mode,
+            hourly=hourly[category],
+        )
+        for category, df in enriched.items()
+    }
+    _, errors = run_parallel(jobs, len(jobs))
+    for category, error in errors.items():
+        raise RuntimeError(f"Loading {category} failed: {error}") from error
+
+
+# ======================================================
+# Runner
+# ======================================================
+def run_pipeline(
+    target_date: str | None = None,
+    workers: int = fetcher.MAX_WORKERS,
+    rpm: float = fetcher.REQUESTS_PER_MINUTE,
+    use_cache: bool = True,
+    method: str = DEFAULT_LOAD_METHOD,
+    schema_mode: str = "flat",
+    fmt: str | None = None,
+) -> dict:
+    """
+    Runs the whole pipeline for one day (YYYY-MM-DD, default yesterday).
+    Raises on failure so Airflow marks the task as failed.
+    Returns the number of enriched rows per category.
+    """
+    if target_date:
+        day_dt = datetime.strptime(target_date, "%Y-%m-%d")
+    else:
+        day_dt = datetime.now() - timedelta(days=1)
+    day = day_dt.strftime("%Y/%m/%d")
+    fmt = fmt or PROCESSED_FORMAT
+
+    print(f"🚀 In-process pipeline for {day} ({workers} fetch worker(s), {fmt})")
+
+    # One metrics unit per stage, plus the per-country downloads
+    with StageRun("pipeline", primary_step="load", date=target_date) as metrics:
+        with metrics.measure("fetch", date=day) as unit:
+            documents = fetch_stage(day_dt, workers, rpm, use_cache, metrics)
+            unit.extra["documents"] = sum(len(docs) for docs in documents.values())
+
+        with metrics.measure("parse", date=day) as unit:
+            parsed = parse_stage(documents, day, fmt)
+            unit.rows = sum(len(df) for df in parsed.values())
+
+        with metrics.measure("enrich", date=day) as unit:
+            enriched = enrich_stage(parsed, day, fmt)
+            unit.rows = sum(len(df) for df in enriched.values())
+
+        with metrics.measure("normalize", date=day) as unit:
+            hourly = normalize_stage(enriched, day, fmt)
+            unit.rows = sum(len(df) for df in hourly.values())
+
+        with metrics.measure("load", date=day) as unit:
+            load_stage(enriched, hourly, method, schema_mode)
+            unit.rows = sum(len(df) for df in enriched.values())
+
+        stages = [m for m in metrics.measurements if m.step != "download"]
+        print(
+            "⏱️ Stage timings: "
+            + " | ".join(f"{m.step}={m.elapsed():.2f}s" for m in stages)
+        )
+    return {category: len(df) for category, df in enriched.items()}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run fetch → parse → enrich → normalize → load in a single process."
+    )
+    parser.add_argument("date", nargs="?", help="Target date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=fetcher.MAX_WORKERS,
+        help="Number of concurrent API requests",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=fetcher.REQUESTS_PER_MINUTE,
+        help="Requests-per-minute budget shared by all workers",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the local response cache and always call the API",
+    )
+    parser.add_argument(
+        "--method", choices=sorted(LOAD_METHODS), default=DEFAULT_LOAD_METHOD
+    )
+    parser.add_argument("--schema", choices=["flat", "partitioned"], default="flat")
+    parser.add_argument(
+        "--format",
+        choices=SUPPORTED_FORMATS,
+        default=PROCESSED_FORMAT,
+        help="Format of the parsed/enriched checkpoints",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rows = run_pipeline(
+        args.date,
+        workers=args.workers,
+        rpm=args.rpm,
+        use_cache=not args.no_cache,
+        method=args.method,
+        schema_mode=args.schema,
+        fmt=args.format,
+    )
+    print(f"\n✨ Pipeline finished: {rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Storage helpers for the data/processed layer.
+Datasets are written either as CSV (default) or as typed, columnar Parquet:
+timestamps stay timestamps, values are float64, positions int32, and the
+repeated reference attributes are dictionary-encoded categoricals.
+The format is chosen with PROCESSED_FORMAT (csv | parquet) in .env and can be
+overridden per stage with --format. Readers accept either format, so stages
+can be switched one at a time.
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(PROJECT_ROOT / ".env")
+
+SUPPORTED_FORMATS = ("csv", "parquet")
+PROCESSED_FORMAT = os.getenv("PROCESSED_FORMAT", "csv").lower()
+
+# Low-cardinality text columns stored as dictionary-encoded categoricals
+CATEGORICAL_COLUMNS = [
+    "country",
+    "country_name",
+    "type",
+    "bidding_zone",
+    "psr_type",
+    "generation_type",
+    "resolution",
+    "source_resolution",
+]
+TIMESTAMP_COLUMNS = ["start_time", "interval_start"]
+FLOAT_COLUMNS = [
+    "value",
+    "quantity_mw",
+    "price_eur",
+    "price_min_eur",
+    "price_max_eur",
+    "coverage",
+]
+INTEGER_COLUMNS = ["position", "points"]
+
+
+def resolve_format(fmt: str | None = None) -> str:
+    fmt = (fmt or PROCESSED_FORMAT).lower()
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported processed format: {fmt}")
+    return fmt
+
+
+def dataset_path(directory: Path, name: str, fmt: str | None = None) -> Path:
+    """Path of a dataset such as parsed_generation or enriched_prices."""
+    return Path(directory) / f"{name}.{resolve_format(fmt)}"
+
+
+def dataset_name(stage: str, category: str, country: str | None = None) -> str:
+    """
+    Dataset name inside a day partition: parsed_generation, or
+    parsed_generation_FR for the per-country files of the mapped DAG.
+    """
+    name = f"{stage}_{category}"
+    return f"{name}_{country}" if country else name
+
+
+def locate_dataset(directory: Path, name: str, fmt: str | None = None) -> Path:
+    """
+    Finds an existing dataset, preferring the configured format and falling
+    back to the other one. Returns the preferred path if neither exists.
+    """
+    preferred = dataset_path(directory, name, fmt)
+    if preferred.exists():
+        return preferred
+    for other in SUPPORTED_FORMATS:
+        candidate = dataset_path(directory, name, other)
+        if candidate.exists():
+            return candidate
+    return preferred
+
+
+def locate_country_datasets(
+    directory: Path, stage: str, category: str, fmt: str | None = None
+) -> list[Path]:
+    """Per-country datasets ({stage}_{category}_{CC}) of a partition, one per country."""
+    prefix = dataset_name(stage, category) + "_"
+    countries = sorted(
+        {
+            path.stem[len(prefix) :]
+            for path in Path(directory).glob(f"{prefix}*")
+            if path.suffix.lstrip(".") in SUPPORTED_FORMATS
+        }
+    )
+    return [
+        locate_dataset(directory, dataset_name(stage, category, country), fmt)
+        for country in countries
+    ]
+
+
+def to_storage_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Applies the typed layout used for Parquet datasets."""
+    df = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in TIMESTAMP_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], utc=True)
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("float64")
+    for col in INTEGER_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("int32")
+    return df
+
+
+def write_dataset(
+    df: pd.DataFrame, directory: Path, name: str, fmt: str | None = None
+) -> Path:
+    """Writes a dataset into its category/date partition directory."""
+    path = dataset_path(directory, name, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if path.suffix == ".parquet":
+        to_storage_types(df).to_parquet(path, index=False, engine="pyarrow")
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def read_dataset(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """Reads a CSV or Parquet dataset, optionally only some of its columns."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns, engine="pyarrow")
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_dataset(path: Path, chunksize: int, columns: list[str] | None = None):
+    """Yields a CSV or Parquet dataset as frames of at most chunksize rows."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+class DatasetWriter:
+    """
+    Writes a dataset chunk by chunk. Rows go to a hidden temporary file that
+    replaces the dataset on close(), so readers never see a partial file.
+
+        with DatasetWriter(directory, "enriched_generation", "parquet") as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, directory: Path, name: str, fmt: str | None = None):
+        self.path = dataset_path(directory, name, fmt)
+        self.tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self.rows = 0
+        self._parquet_writer = None
+
+    def write(self, df: pd.DataFrame):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.path.suffix == ".parquet":
+            table = pa.Table.from_pandas(to_storage_types(df), preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.tmp_path, table.schema)
+            else:
+                # Chunks may differ in dictionary/pandas metadata only
+                table = table.cast(self._parquet_writer.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(
+                self.tmp_path,
+                mode="w" if self.rows == 0 else "a",
+                header=self.rows == 0,
+                index=False,
+            )
+        self.rows += len(df)
+
+    def close(self) -> Path | None:
+        """Moves the finished file into place. Returns None if nothing was written."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if not self.tmp_path.exists():
+            return None
+        os.replace(self.tmp_path, self.path)
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        self.tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,12 @@
+-- One-off backfill for rows loaded before interval_start existed.
+-- ENTSO-E resolutions are ISO-8601 durations (PT15M, PT60M, ...), which
+-- PostgreSQL casts directly to INTERVAL. The loader's schema migration
+-- (interval_key_sql in processing/load_generation_to_postgres.py) runs the
+-- same backfill before moving the unique keys onto interval_start.
+UPDATE energy_generation
+SET interval_start = start_time + (position - 1) * resolution::interval
+WHERE interval_start IS NULL;
+
+UPDATE energy_prices
+SET interval_start = start_time + (position - 1) * resolution::interval
+WHERE interval_start IS NULL;
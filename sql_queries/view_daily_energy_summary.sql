@@ -1,15 +1,16 @@
+-- Generation and prices are aggregated separately (rollup_* tables, refreshed
+-- by the loader) and joined one row per country-day, so totals are no longer
+-- multiplied by the number of price points.
 CREATE OR REPLACE VIEW daily_energy_summary AS
 SELECT 
     g.country,
-    DATE(g.start_time) as day,
-    ROUND(AVG(p.price_eur), 2) as avg_price_eur,
-    ROUND(SUM(g.quantity_mw) FILTER (WHERE g.generation_type ILIKE '%Solar%'), 2) as total_solar_mw,
-    ROUND(SUM(g.quantity_mw), 2) as total_gen_mw,
+    g.day,
+    ROUND(p.avg_price_eur, 2) as avg_price_eur,
+    ROUND(g.total_solar_mw, 2) as total_solar_mw,
+    ROUND(g.total_gen_mw, 2) as total_gen_mw,
     ROUND(
-        (SUM(g.quantity_mw) FILTER (WHERE g.generation_type ILIKE '%Solar%') / 
-        NULLIF(SUM(g.quantity_mw), 0)) * 100, 3
+        (g.total_solar_mw / NULLIF(g.total_gen_mw, 0)) * 100, 3
     ) as solar_percentage
-FROM energy_generation g
-INNER JOIN energy_prices p ON g.country = p.country 
-     AND DATE(g.start_time) = DATE(p.start_time)
-GROUP BY 1, 2;
\ No newline at end of file
+FROM rollup_daily_generation g
+INNER JOIN rollup_daily_prices p ON g.country = p.country 
+     AND g.day = p.day;
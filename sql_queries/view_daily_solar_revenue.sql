@@ -1,15 +1,15 @@
 CREATE OR REPLACE VIEW view_daily_solar_revenue AS
 WITH daily_stats AS (
+    -- One pre-aggregated row per side and country-day (see processing/rollups.py)
     SELECT 
         g.country,
-        DATE(g.start_time) as day,
-        AVG(p.price_eur) as avg_price_eur,
-        SUM(g.quantity_mw) FILTER (WHERE g.generation_type ILIKE '%Solar%') as total_solar_mw,
-        SUM(g.quantity_mw) as total_gen_mw
-    FROM energy_generation g
-    INNER JOIN energy_prices p ON g.country = p.country 
-         AND DATE(g.start_time) = DATE(p.start_time)
-    GROUP BY 1, 2
+        g.day,
+        p.avg_price_eur,
+        g.total_solar_mw,
+        g.total_gen_mw
+    FROM rollup_daily_generation g
+    INNER JOIN rollup_daily_prices p ON g.country = p.country 
+         AND g.day = p.day
 )
 SELECT 
     country,
@@ -18,4 +18,4 @@ SELECT
     ROUND(total_solar_mw, 2) as total_solar_mw,
     ROUND((total_solar_mw * avg_price_eur), 2) as estimated_solar_revenue_eur,
     ROUND((total_solar_mw / NULLIF(total_gen_mw, 0)) * 100, 3) as solar_percentage
-FROM daily_stats;
\ No newline at end of file
+FROM daily_stats;
@@ -3,21 +3,19 @@ WITH daily_prices AS (
     -- Calculamos a média diária primeiro para garantir que temos um preço para o dia
     SELECT 
         country, 
-        DATE(start_time) as price_day, 
-        AVG(price_eur) as day_avg_price
-    FROM energy_prices
-    GROUP BY 1, 2
+        day as price_day, 
+        avg_price_eur as day_avg_price
+    FROM rollup_daily_prices
 ),
 hourly_gen AS (
     -- Pegamos a geração horária
     SELECT 
         country,
-        DATE(start_time) as gen_day,
-        EXTRACT(HOUR FROM start_time) as hour_of_day,
-        SUM(quantity_mw) as solar_mw
-    FROM energy_generation
-    WHERE generation_type ILIKE '%Solar%'
-    GROUP BY 1, 2, 3
+        day as gen_day,
+        hour_of_day,
+        solar_mw
+    FROM rollup_hourly_generation
+    WHERE solar_mw IS NOT NULL
 )
 SELECT 
     g.country,
@@ -28,4 +26,4 @@ SELECT
     ROUND(g.solar_mw * p.day_avg_price, 2) as estimated_revenue_eur,
     RANK() OVER (PARTITION BY g.country, g.gen_day ORDER BY g.solar_mw DESC) as solar_peak_rank
 FROM hourly_gen g
-INNER JOIN daily_prices p ON g.country = p.country AND g.gen_day = p.price_day;
\ No newline at end of file
+INNER JOIN daily_prices p ON g.country = p.country AND g.gen_day = p.price_day;